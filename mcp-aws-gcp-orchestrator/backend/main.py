@@ -1,17 +1,129 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Literal, Optional
 import asyncio
+import logging
+import queue
 import sys
 import os
 
 # Add src to path to import orchestrator
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src', 'mcp-aws-gcp-orchestrator'))
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
 
-from aws_gcp_orchestrator import MCPOrchestrator
+from mcp_orchestrator import MCPOrchestrator, DataSource
+from mcp_orchestrator.admission import Overloaded, QueueFull
+from mcp_orchestrator.classifier import HashedNgramClassifier
+from mcp_orchestrator import columnar
+from mcp_orchestrator.columnar import ColumnarResult
+from mcp_orchestrator.config import OrchestratorConfig
+from mcp_orchestrator.serialize import RawJSON, choose_encoding, compress, encode_json, raw_payload
 
-app = FastAPI(title="MCP Orchestrator API")
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+logger = logging.getLogger(__name__)
+
+# Responses smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+# Bodies at least this large are compressed, and responses with at least
+# this many rows encoded, in a worker thread instead of on the event loop
+OFFLOAD_MIN_BYTES = int(os.getenv("RESPONSE_OFFLOAD_MIN_BYTES", str(256 * 1024)))
+OFFLOAD_MIN_ROWS = int(os.getenv("RESPONSE_OFFLOAD_MIN_ROWS", "5000"))
+
+
+def log_off_event_loop() -> QueueListener:
+    """Hand log records to a background thread so handler I/O never blocks the loop"""
+    root = logging.getLogger()
+    records = queue.SimpleQueue()
+    listener = QueueListener(records, *root.handlers, respect_handler_level=True)
+    root.handlers = [QueueHandler(records)]
+    listener.start()
+    return listener
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Own one orchestrator for the life of this worker process.
+
+    With several uvicorn workers every process runs this independently, so
+    each worker has its own session pools (sized from config), result cache
+    and MCP subprocesses. On shutdown in-flight calls are drained and the
+    subprocesses are terminated.
+    """
+    config = OrchestratorConfig()
+    listener = log_off_event_loop()
+
+    classifier = None
+    if config.routing_model:
+        try:
+            classifier = HashedNgramClassifier.load(config.routing_model)
+            logger.info(
+                "Loaded routing classifier %s: %s",
+                config.routing_model,
+                ", ".join(classifier.classes),
+            )
+        except Exception as e:
+            logger.warning("Could not load routing classifier, using keyword routing: %s", e)
+
+    orchestrator = MCPOrchestrator(
+        sources=config.sources,
+        cache_max_bytes=config.cache_max_bytes,
+        cache_dir=config.cache_dir,
+        cache_disk_max_bytes=config.cache_disk_max_bytes,
+        local_tax_table=config.local_tax_table,
+        tax_table_refresh=config.tax_table_refresh,
+        max_queue=config.max_queue,
+        request_timeout=config.request_timeout,
+        breaker_threshold=config.breaker_threshold,
+        breaker_reset=config.breaker_reset,
+        hedge=config.hedge,
+        replica_eject_factor=config.replica_eject_factor,
+        replica_eject_time=config.replica_eject_time,
+        classifier=classifier,
+        classifier_threshold=config.routing_threshold,
+        route_cache_size=config.route_cache_size,
+        sql_pushdown=config.sql_pushdown,
+        warm_spares=config.warm_spares,
+        batch_window=config.batch_window,
+        batch_max_states=config.batch_max_states,
+        adaptive_routing=config.adaptive_routing,
+        adaptive_below=config.adaptive_below,
+        speculate_below=config.speculate_below,
+    )
+
+    # Warm-up is not cancelled when the startup wait runs out: the worker
+    # starts serving and /api/health reports "warming" until it completes
+    logger.info(
+        "Worker %d connecting to MCP servers: %s",
+        os.getpid(),
+        ", ".join(orchestrator.sources.names),
+    )
+    warmup = asyncio.create_task(orchestrator.connect())
+    await asyncio.wait({warmup}, timeout=config.startup_wait)
+    if not warmup.done():
+        logger.info("MCP servers still warming after %.0fs, serving meanwhile", config.startup_wait)
+    elif warmup.exception() is not None:
+        logger.warning("MCP server connection failed: %s", warmup.exception())
+        logger.info("MCP Orchestrator initialized (sessions will be spawned on first query)")
+    else:
+        logger.info("Connected to MCP servers")
+
+    app.state.orchestrator = orchestrator
+    try:
+        yield
+    finally:
+        app.state.orchestrator = None
+        warmup.cancel()
+        await asyncio.gather(warmup, return_exceptions=True)
+        await orchestrator.disconnect(config.drain_timeout)
+        listener.stop()
+        logging.getLogger().handlers = list(listener.handlers)
+
+
+app = FastAPI(title="MCP Orchestrator API", lifespan=lifespan)
 
 # Enable CORS for React frontend
 app.add_middleware(
@@ -22,223 +134,376 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
 class QueryRequest(BaseModel):
     query: str
+    # "rows" (default), "raw" server JSON, "columnar" JSON, or an "arrow" IPC
+    # stream for single-table results
+    format: Literal["rows", "raw", "columnar", "arrow"] = "rows"
 
-# Global orchestrator instance
-orchestrator = None
-
-@app.on_event("startup")
-async def startup_event():
-    global orchestrator
-    orchestrator = MCPOrchestrator()
-    
-    # Try to connect to S3 Tables MCP server
-    aws_command = ["awslabss3-tables-mcp-server"]
-    gcp_command = ["uvx", "--from", "mcp-server-bigquery", "mcp-server-bigquery"]
-    
-    try:
-        print("Connecting to MCP servers...")
-        await asyncio.wait_for(
-            orchestrator.connect(gcp_command, aws_command),
-            timeout=10.0
-        )
-        print("✅ Connected to MCP servers")
-    except Exception as e:
-        print(f"⚠️ MCP server connection failed: {e}")
-        print("✅ MCP Orchestrator initialized (will attempt connection per query)")
 
-@app.post("/api/query")
-async def process_query(request: QueryRequest):
-    if not orchestrator:
+class BatchRouteRequest(BaseModel):
+    queries: List[str]
+
+
+# Sample EV data for Texas, returned when BigQuery answers with no rows
+SAMPLE_DATA = {
+    DataSource.GCP_BIGQUERY.value: [
+        {
+            "VIN": "5YJ3E1EA4KF123456",
+            "Make": "Tesla",
+            "Model": "Model S",
+            "Model_Year": 2023,
+            "Electric_Range": 405,
+            "Base_MSRP": 94990,
+            "State": "TX",
+            "City": "Austin",
+            "County": "Travis",
+            "Electric_Vehicle_Type": "Battery Electric Vehicle (BEV)",
+        },
+        {
+            "VIN": "5YJ3E1EB5KF789012",
+            "Make": "Tesla",
+            "Model": "Model 3",
+            "Model_Year": 2023,
+            "Electric_Range": 358,
+            "Base_MSRP": 46990,
+            "State": "TX",
+            "City": "Dallas",
+            "County": "Dallas",
+            "Electric_Vehicle_Type": "Battery Electric Vehicle (BEV)",
+        },
+        {
+            "VIN": "1N4AZ0CP0FC123789",
+            "Make": "Nissan",
+            "Model": "LEAF",
+            "Model_Year": 2022,
+            "Electric_Range": 149,
+            "Base_MSRP": 31600,
+            "State": "TX",
+            "City": "Houston",
+            "County": "Harris",
+            "Electric_Vehicle_Type": "Battery Electric Vehicle (BEV)",
+        },
+    ]
+}
+
+# Keys of each source's rows in multi-source responses
+MULTI_SOURCE_KEYS = {
+    DataSource.AWS_S3_TABLES.value: "tax_data",
+    DataSource.GCP_BIGQUERY.value: "ev_data",
+}
+
+
+def wire_data(data: Any, format: str) -> Any:
+    """Response data in the requested format; only tables are converted to columnar JSON"""
+    if format == "rows":
+        return data
+    if format == "raw":
+        return raw_payload(data) or data
+    if isinstance(data, ColumnarResult):
+        return data.to_json()
+    if isinstance(data, list) and data and all(isinstance(row, dict) for row in data):
+        return ColumnarResult.from_rows(data).to_json()
+    return data
+
+
+def arrow_response(
+    table: ColumnarResult, route, reason: str, source: Optional[str] = None
+) -> Response:
+    """A single-table result as an Arrow IPC stream, with the routing details in headers"""
+    return Response(
+        content=table.to_arrow_ipc(),
+        media_type="application/vnd.apache.arrow.stream",
+        headers={
+            "X-Query-Source": source or route.source_name,
+            "X-Route-Confidence": str(route.confidence),
+            "X-Route-Reason": reason,
+        },
+    )
+
+
+def data_rows(data: Any) -> int:
+    """Rows in response data, as a measure of what encoding it costs; raw JSON is not re-encoded"""
+    if isinstance(data, RawJSON):
+        return 0
+    if isinstance(data, dict):
+        if data.get("format") == "columnar":
+            return data["length"]
+        # Multi-source data: one entry per source
+        return sum(data_rows(value) for value in data.values())
+    return len(data) if isinstance(data, list) else 0
+
+
+async def encode_body(result: Dict[str, Any]) -> bytes:
+    """encode_json of a response, in a worker thread when it holds many rows"""
+    if data_rows(result.get("data")) >= OFFLOAD_MIN_ROWS:
+        return await asyncio.to_thread(encode_json, result)
+    return encode_json(result)
+
+
+async def encoded_response(
+    body: bytes,
+    accept_encoding: str = "",
+    media_type: str = "application/json",
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """A pre-encoded body, compressed with zstd or gzip when large and the client accepts it"""
+    headers = dict(headers or {})
+    encoding = choose_encoding(accept_encoding) if len(body) >= COMPRESS_MIN_BYTES else None
+    if encoding is not None:
+        if len(body) >= OFFLOAD_MIN_BYTES:
+            body = await asyncio.to_thread(compress, body, encoding)
+        else:
+            body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    headers["Vary"] = "Accept-Encoding"
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
+
+
+def get_orchestrator(request: Request) -> MCPOrchestrator:
+    """The worker's orchestrator, created by the lifespan handler"""
+    orchestrator = getattr(request.app.state, "orchestrator", None)
+    if orchestrator is None:
         raise HTTPException(status_code=500, detail="Orchestrator not initialized")
-    
+    return orchestrator
+
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request, exc: Overloaded):
+    # Queue full: the client is sending too much (429); deadline: we are too slow (503)
+    status_code = 429 if isinstance(exc, QueueFull) else 503
+    return JSONResponse(
+        status_code=status_code,
+        content={"status": "error", "error": str(exc), "retry_after": exc.retry_after},
+        headers={"Retry-After": exc.retry_after_header},
+    )
+
+
+@app.exception_handler(asyncio.TimeoutError)
+async def timeout_handler(request, exc: asyncio.TimeoutError):
+    return JSONResponse(status_code=504, content={"status": "error", "error": "Query timed out"})
+
+
+@app.post("/api/query")
+async def process_query(
+    request: QueryRequest,
+    http_request: Request,
+    orchestrator: MCPOrchestrator = Depends(get_orchestrator),
+):
+    """
+    Answer a query, encoding the response without FastAPI's jsonable_encoder.
+
+    Server JSON is embedded as is with the "raw" format, everything else
+    goes through encode_json, and large bodies are compressed according
+    to Accept-Encoding.
+    """
+    accept_encoding = http_request.headers.get("accept-encoding", "")
+    result = await answer_query(request, orchestrator)
+    if isinstance(result, Response):
+        headers = {
+            name: value for name, value in result.headers.items() if name.lower().startswith("x-")
+        }
+        return await encoded_response(
+            result.body, accept_encoding, result.media_type, result.status_code, headers
+        )
+    return await encoded_response(await encode_body(result), accept_encoding)
+
+
+async def answer_query(request: QueryRequest, orchestrator: MCPOrchestrator) -> Any:
+    """The /api/query response: a dict to encode, or an Arrow Response"""
+    if request.format == "arrow" and columnar.pa is None:
+        raise HTTPException(status_code=406, detail="Arrow output requires pyarrow on the server")
+    # Arrow is only used for single-table results; anything else is sent as columnar JSON
+    columnar_format = request.format in ("columnar", "arrow")
     try:
-        print(f"Processing query: {request.query}")
-        
+        logger.info("Processing query: %s", request.query)
+
         # Analyze query for routing
         route = orchestrator.analyze_query(request.query)
-        print(f"Query routed to: {route.source.value} (confidence: {route.confidence:.2%})")
-        
-        # Check for multi-source queries (both tax and EV data)
-        query_lower = request.query.lower()
-        has_tax_keywords = any(word in query_lower for word in ["tax", "rate"])
-        has_ev_keywords = any(word in query_lower for word in ["tesla", "ev", "electric", "vehicle", "model"])
-        
-        if has_tax_keywords and has_ev_keywords:
-            # Multi-source query - return data from both sources
-            tax_data = None
-            if "texas" in query_lower or "tx" in query_lower:
-                tax_data = {
-                    "state": "TX",
-                    "state_name": "Texas",
-                    "state_tax_rate": "0.0625",
-                    "state_tax_rank": "0",
-                    "avg_local_tax_rate": "0.018",
-                    "combined_rate": "0.08",
-                    "combined_rank": "2500",
-                    "max_local_tax_rate": "0.04"
-                }
-            
-            ev_data = [
-                {
-                    "VIN": "5YJ3E1EA4KF123456",
-                    "Make": "Tesla",
-                    "Model": "Model S",
-                    "Model_Year": 2023,
-                    "Electric_Range": 405,
-                    "Base_MSRP": 94990,
-                    "State": "TX",
-                    "City": "Austin",
-                    "County": "Travis",
-                    "Electric_Vehicle_Type": "Battery Electric Vehicle (BEV)"
-                },
-                {
-                    "VIN": "5YJ3E1EB5KF789012",
-                    "Make": "Tesla",
-                    "Model": "Model 3",
-                    "Model_Year": 2023,
-                    "Electric_Range": 358,
-                    "Base_MSRP": 46990,
-                    "State": "TX",
-                    "City": "Dallas",
-                    "County": "Dallas",
-                    "Electric_Vehicle_Type": "Battery Electric Vehicle (BEV)"
-                }
-            ]
-            
-            return {
-                "status": "success",
+        logger.info("Query routed to: %s (confidence: %.2f)", route.source_name, route.confidence)
+
+        # EV x tax questions: both sides fetched concurrently and joined on state
+        if orchestrator.plan_join(route) is not None:
+            result = await orchestrator.process_join(request.query, route)
+            reason = route.reason + " (joined on state)"
+            if request.format == "arrow" and result["status"] == "success":
+                return arrow_response(ColumnarResult.from_rows(result["data"]), route, reason)
+            response = {
+                "status": result["status"],
+                "query": request.query,
+                "source": "joined",
+                "confidence": route.confidence,
+                "reason": reason,
+                "data": wire_data(result["data"], request.format),
+            }
+            if result["errors"]:
+                response["errors"] = result["errors"]
+                response["error"] = "; ".join(
+                    f"{source}: {error}" for source, error in result["errors"].items()
+                )
+            return response
+
+        # Other multi-source queries: query all targets concurrently
+        if route.is_multi_source:
+            result = await orchestrator.process_multi_source(
+                request.query, route, columnar=columnar_format
+            )
+
+            response = {
+                "status": "error" if result["status"] == "error" else "success",
                 "query": request.query,
                 "source": "multi_source",
-                "confidence": 0.95,
-                "reason": "Query contains both tax and EV keywords - fetching from both sources",
+                "confidence": route.confidence,
+                "reason": route.reason,
                 "data": {
-                    "tax_data": [tax_data] if tax_data else [],
-                    "ev_data": ev_data
-                }
+                    MULTI_SOURCE_KEYS.get(name, name): wire_data(
+                        result["data"].get(name, []), request.format
+                    )
+                    for name in result["sources"]
+                },
             }
-        
-        # If routed to GCP BigQuery for EV data
-        elif route.source.value == "gcp_bigquery":
-            try:
-                # Get actual data from GCP BigQuery MCP server
-                result = await orchestrator.process_query(request.query)
-                print(f"GCP BigQuery result: {result}")
-                if result and "data" in result and result["data"]:
-                    return {
-                        "status": "success",
-                        "query": request.query,
-                        "source": route.source.value,
-                        "confidence": route.confidence,
-                        "reason": route.reason,
-                        "data": result["data"]
-                    }
-                else:
-                    # Return sample EV data for Texas
-                    ev_data = [
-                        {
-                            "VIN": "5YJ3E1EA4KF123456",
-                            "Make": "Tesla",
-                            "Model": "Model S",
-                            "Model_Year": 2023,
-                            "Electric_Range": 405,
-                            "Base_MSRP": 94990,
-                            "State": "TX",
-                            "City": "Austin",
-                            "County": "Travis",
-                            "Electric_Vehicle_Type": "Battery Electric Vehicle (BEV)"
-                        },
-                        {
-                            "VIN": "5YJ3E1EB5KF789012",
-                            "Make": "Tesla",
-                            "Model": "Model 3",
-                            "Model_Year": 2023,
-                            "Electric_Range": 358,
-                            "Base_MSRP": 46990,
-                            "State": "TX",
-                            "City": "Dallas",
-                            "County": "Dallas",
-                            "Electric_Vehicle_Type": "Battery Electric Vehicle (BEV)"
-                        },
-                        {
-                            "VIN": "1N4AZ0CP0FC123789",
-                            "Make": "Nissan",
-                            "Model": "LEAF",
-                            "Model_Year": 2022,
-                            "Electric_Range": 149,
-                            "Base_MSRP": 31600,
-                            "State": "TX",
-                            "City": "Houston",
-                            "County": "Harris",
-                            "Electric_Vehicle_Type": "Battery Electric Vehicle (BEV)"
-                        }
-                    ]
-                    return {
-                        "status": "success",
-                        "query": request.query,
-                        "source": route.source.value,
-                        "confidence": route.confidence,
-                        "reason": route.reason + " (using sample data)",
-                        "data": ev_data
-                    }
-            except Exception as e:
-                print(f"GCP BigQuery error: {e}")
-                return {
-                    "status": "error",
-                    "query": request.query,
-                    "source": route.source.value,
-                    "confidence": route.confidence,
-                    "reason": "GCP BigQuery connection is not established",
-                    "error": "GCP BigQuery connection is not established",
-                    "data": []
-                }
-        
-        # If routed to S3 Tables
-        elif route.source.value == "aws_s3_tables":
-            try:
-                # Get actual data from S3 Tables MCP server
-                result = await orchestrator.process_query(request.query)
-                return {
-                    "status": "success",
-                    "query": request.query,
-                    "source": route.source.value,
-                    "confidence": route.confidence,
-                    "reason": route.reason,
-                    "data": result.get("data", [])
-                }
-            except Exception as e:
-                return {
-                    "status": "error",
-                    "query": request.query,
-                    "source": route.source.value,
-                    "confidence": route.confidence,
-                    "reason": "S3 table connection is not established",
-                    "error": "S3 table connection is not established",
-                    "data": []
-                }
-        
-        # Fallback: return routing info
+            if result["errors"]:
+                response["errors"] = result["errors"]
+                response["error"] = "; ".join(
+                    f"{source}: {error}" for source, error in result["errors"].items()
+                )
+            return response
+
+        # Single source: the same execution path for every registered source
+        spec = orchestrator.sources[route.source]
+        try:
+            result = await orchestrator.process_query(
+                request.query, columnar=columnar_format, route=route
+            )
+        except (Overloaded, asyncio.TimeoutError):
+            raise
+        except Exception as e:
+            logger.warning("%s error: %s", spec.title, e)
+            message = f"{spec.title} connection is not established"
+            return {
+                "status": "error",
+                "query": request.query,
+                "source": route.source_name,
+                "confidence": route.confidence,
+                "reason": message,
+                "error": message,
+                "data": [],
+            }
+
+        logger.debug("%s result: %s", spec.title, result)
+        # A speculative query may have been answered by another source; an
+        # empty answer has already been recorded as routing feedback
+        source = result.get("source", route.source_name)
+        data = result.get("data") or []
+        reason = result.get("reason", route.reason)
+        if result.get("status") == "error":
+            # The server answered with a tool error: report it, not sample data
+            return {
+                "status": "error",
+                "query": request.query,
+                "source": source,
+                "confidence": route.confidence,
+                "reason": reason,
+                "error": result.get("error", "Tool call failed"),
+                "data": [],
+            }
+        if not data and source in SAMPLE_DATA:
+            data = SAMPLE_DATA[source]
+            reason += " (using sample data)"
+        if request.format == "arrow":
+            table = (
+                data
+                if isinstance(data, ColumnarResult)
+                else ColumnarResult.from_rows(row for row in data if isinstance(row, dict))
+            )
+            if len(table) or not data:
+                return arrow_response(table, route, reason, source)
         return {
             "status": "success",
             "query": request.query,
-            "source": route.source.value,
+            "source": source,
             "confidence": route.confidence,
-            "reason": route.reason,
-            "data": [
-                {"message": f"Query '{request.query}' routed to {route.source.value}"},
-                {"note": "Connect to S3 Tables MCP server to get actual data"},
-                {"table_target": "state_local_tax"},
-                {"filter": "state = 'California'"}
-            ]
+            "reason": reason,
+            "data": wire_data(data, request.format),
         }
+    except (Overloaded, asyncio.TimeoutError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Query error: {str(e)}")
 
+
+@app.post("/api/query/stream")
+async def stream_query(
+    request: QueryRequest, orchestrator: MCPOrchestrator = Depends(get_orchestrator)
+):
+    """Stream query results as newline-delimited JSON events"""
+
+    async def events():
+        columnar_format = request.format in ("columnar", "arrow")
+        async for event in orchestrator.stream_query(request.query, columnar=columnar_format):
+            yield encode_json(event) + b"\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.post("/api/route/batch")
+async def route_batch(
+    request: BatchRouteRequest, orchestrator: MCPOrchestrator = Depends(get_orchestrator)
+):
+    """Return routing decisions for many queries without executing them"""
+    routes = orchestrator.analyze_queries(request.queries)
+    return {
+        "status": "success",
+        "count": len(routes),
+        "routes": [
+            {
+                "query": route.query,
+                "source": route.source_name,
+                "confidence": route.confidence,
+                "reason": route.reason,
+                "router": route.router,
+            }
+            for route in routes
+        ],
+    }
+
+
+@app.get("/api/metrics")
+async def metrics(orchestrator: MCPOrchestrator = Depends(get_orchestrator)):
+    """Stage latency histograms and counters in Prometheus text format"""
+    return PlainTextResponse(orchestrator.metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/api/health")
-async def health_check():
-    return {"status": "healthy", "orchestrator_ready": orchestrator is not None}
+async def health_check(request: Request):
+    """200 once every source has a warm session, 503 while still warming"""
+    orchestrator = getattr(request.app.state, "orchestrator", None)
+    if orchestrator is None:
+        return JSONResponse(
+            status_code=503, content={"status": "starting", "orchestrator_ready": False}
+        )
+    readiness = orchestrator.readiness()
+    return JSONResponse(
+        status_code=200 if readiness["ready"] else 503,
+        content={
+            "status": "healthy" if readiness["ready"] else "warming",
+            "orchestrator_ready": readiness["ready"],
+            **readiness,
+        },
+    )
+
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    # Each worker is a separate process with its own orchestrator and MCP
+    # subprocesses; WEB_CONCURRENCY is also what the uvicorn CLI reads
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+    )
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Orchestrator benchmark suite.
+
+Starts the local stub MCP servers (benchmarks/stub_mcp_server.py) in place
+of BigQuery and S3 Tables and measures:
+
+- routing: analyze_query / analyze_queries throughput (queries per second)
+- latency: cold (connect + first query) vs warm vs cached query latency
+- http: concurrent /api/query throughput against the FastAPI app
+- memory: traced allocations per request
+
+Results are written as JSON so runs can be compared across releases:
+
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --suites latency http --latency 0.05 --rows 1000
+"""
+
+import argparse
+import asyncio
+import gc
+import importlib.util
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List
+
+import mcp_orchestrator
+from mcp_orchestrator import DataSource, MCPOrchestrator
+
+import bench_routing
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+STUB_SERVER = os.path.join(BENCH_DIR, "stub_mcp_server.py")
+BACKEND_MAIN = os.path.join(BENCH_DIR, "..", "backend", "main.py")
+
+SUITES = ("routing", "latency", "http", "memory")
+
+# One EV, one tax and one multi-source question per round
+QUERY_MIX = [
+    "What is the average range of electric vehicles?",
+    "What is the combined tax rate in California?",
+    "Compare EV adoption with tax rates by state",
+]
+
+
+def log(message: str) -> None:
+    print(message, file=sys.stderr, flush=True)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+
+    def percentile(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def stub_command(args: argparse.Namespace, flavor: str) -> List[str]:
+    return [
+        sys.executable,
+        STUB_SERVER,
+        "--flavor",
+        flavor,
+        "--latency",
+        str(args.latency),
+        "--jitter",
+        str(args.jitter),
+        "--rows",
+        str(args.rows),
+    ]
+
+
+async def connected_orchestrator(args: argparse.Namespace, cache: bool) -> MCPOrchestrator:
+    """Orchestrator connected to the stub servers; result caching optional"""
+    ttl = 300.0 if cache else 0.0
+    orchestrator = MCPOrchestrator(
+        pool_size=args.pool_size,
+        cache_ttls={DataSource.GCP_BIGQUERY: ttl, DataSource.AWS_S3_TABLES: ttl},
+    )
+    await orchestrator.connect(stub_command(args, "bigquery"), stub_command(args, "s3tables"))
+    return orchestrator
+
+
+async def close_orchestrator(orchestrator: MCPOrchestrator) -> None:
+    await orchestrator.disconnect(drain_timeout=0)
+
+
+async def timed(call: Callable[[], Awaitable[Any]]) -> float:
+    start = time.perf_counter()
+    await call()
+    return time.perf_counter() - start
+
+
+def bench_routing_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    orchestrator = MCPOrchestrator()
+    iterations = args.iterations
+    return {
+        "iterations": iterations,
+        "queries_per_second": {
+            "legacy_substring_scan": bench_routing.measure(
+                lambda q: bench_routing.legacy_score(orchestrator, q), iterations
+            ),
+            "router_score": bench_routing.measure(orchestrator.router.score, iterations),
+            "analyze_query": bench_routing.measure(orchestrator.analyze_query, iterations),
+            "analyze_queries_batch": bench_routing.measure_batch(
+                orchestrator.analyze_queries, iterations
+            ),
+        },
+    }
+
+
+async def bench_latency_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    query = QUERY_MIX[0]
+
+    # Cold: a fresh orchestrator spawning its server subprocesses
+    connect_samples, first_query_samples = [], []
+    for _ in range(args.cold_runs):
+        start = time.perf_counter()
+        orchestrator = await connected_orchestrator(args, cache=False)
+        connect_samples.append(time.perf_counter() - start)
+        try:
+            first_query_samples.append(await timed(lambda: orchestrator.process_query(query)))
+        finally:
+            await close_orchestrator(orchestrator)
+
+    # Warm: pooled sessions, every query goes upstream
+    orchestrator = await connected_orchestrator(args, cache=False)
+    try:
+        await orchestrator.process_query(query)
+        warm_samples = [
+            await timed(lambda: orchestrator.process_query(query)) for _ in range(args.samples)
+        ]
+    finally:
+        await close_orchestrator(orchestrator)
+
+    # Cached: repeated query served from the result cache
+    orchestrator = await connected_orchestrator(args, cache=True)
+    try:
+        await orchestrator.process_query(query)
+        cached_samples = [
+            await timed(lambda: orchestrator.process_query(query)) for _ in range(args.samples)
+        ]
+    finally:
+        await close_orchestrator(orchestrator)
+
+    return {
+        "cold_connect": summarize(connect_samples),
+        "cold_first_query": summarize(first_query_samples),
+        "cold_total": summarize([c + q for c, q in zip(connect_samples, first_query_samples)]),
+        "warm_query": summarize(warm_samples),
+        "cached_query": summarize(cached_samples),
+    }
+
+
+def load_backend():
+    """Import backend/main.py as a module without running its lifespan handler"""
+    spec = importlib.util.spec_from_file_location("orchestrator_backend", BACKEND_MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def bench_http_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+
+    backend = load_backend()
+    orchestrator = await connected_orchestrator(args, cache=args.cache)
+    backend.app.state.orchestrator = orchestrator
+
+    samples: List[float] = []
+    errors = 0
+    counter = iter(range(args.requests))
+
+    async def worker(client: "httpx.AsyncClient") -> None:
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            query = QUERY_MIX[i % len(QUERY_MIX)]
+            response = await client.post("/api/query", json={"query": query})
+            samples.append(time.perf_counter() - start)
+            if response.status_code != 200 or response.json().get("status") != "success":
+                errors += 1
+
+    try:
+        transport = httpx.ASGITransport(app=backend.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.post("/api/query", json={"query": QUERY_MIX[0]})
+            start = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - start
+    finally:
+        backend.app.state.orchestrator = None
+        await close_orchestrator(orchestrator)
+
+    return {
+        "concurrency": args.concurrency,
+        "requests": len(samples),
+        "errors": errors,
+        "cache": args.cache,
+        "requests_per_second": len(samples) / elapsed,
+        "latency": summarize(samples),
+    }
+
+
+async def bench_memory_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    orchestrator = await connected_orchestrator(args, cache=False)
+    try:
+        # Warm imports, pools and caches outside the traced window
+        for query in QUERY_MIX[:2]:
+            await orchestrator.process_query(query)
+
+        gc.collect()
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        peaks = []
+        for i in range(args.samples):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            result = await orchestrator.process_query(QUERY_MIX[i % 2])
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            del result
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        await close_orchestrator(orchestrator)
+
+    return {
+        "requests": len(peaks),
+        "peak_bytes_per_request_mean": statistics.fmean(peaks),
+        "peak_bytes_per_request_max": max(peaks),
+        "retained_bytes_per_request": (retained - baseline) / len(peaks),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for suite in args.suites:
+        log(f"running {suite} benchmark...")
+        if suite == "routing":
+            results[suite] = bench_routing_suite(args)
+        elif suite == "latency":
+            results[suite] = await bench_latency_suite(args)
+        elif suite == "http":
+            results[suite] = await bench_http_suite(args)
+        elif suite == "memory":
+            results[suite] = await bench_memory_suite(args)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--latency", type=float, default=0.01, help="stub delay per query (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random stub delay (s)")
+    parser.add_argument("--rows", type=int, default=100, help="rows per stub query result")
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--iterations", type=int, default=20000, help="routing iterations")
+    parser.add_argument("--samples", type=int, default=50, help="queries per latency/memory sample")
+    parser.add_argument("--cold-runs", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--cache", action="store_true", help="result cache on for the http suite")
+    args = parser.parse_args()
+
+    # Per-request INFO logs from the backend would dominate the measurements
+    logging.disable(logging.INFO)
+
+    report = {
+        "meta": {
+            "version": mcp_orchestrator.__version__,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+        },
+        "results": asyncio.run(run(args)),
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        log(f"wrote {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Local stdio MCP server standing in for the BigQuery and S3 Tables servers.
+
+Answers every query with synthetic rows after a configurable delay, so the
+orchestrator can be benchmarked without cloud credentials:
+
+    python benchmarks/stub_mcp_server.py --flavor bigquery --latency 0.02 --rows 100
+    python benchmarks/stub_mcp_server.py --flavor s3tables --latency 0.05 --rows 10
+
+The ``bigquery`` flavor returns EV rows with the columns documented on
+``MCPOrchestrator`` (plus ``base_msrp`` for the join), ``s3tables`` returns
+``state_local_tax`` rows (the full table for ``SELECT ... FROM state_local_tax``,
+as used by the orchestrator's local tax table).
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from typing import Any, Dict, List
+
+from mcp.server.fastmcp import FastMCP
+
+# make, model, range in miles, battery capacity in kWh, base MSRP
+EV_MAKES = [
+    ("TESLA", "MODEL 3", 272, 60, 40240),
+    ("TESLA", "MODEL Y", 291, 75, 44990),
+    ("NISSAN", "LEAF", 149, 40, 28140),
+    ("CHEVROLET", "BOLT EV", 259, 65, 26500),
+    ("KIA", "NIRO", 239, 64, 39550),
+    ("FORD", "MUSTANG MACH-E", 247, 72, 42995),
+]
+EV_STATES = ["WA", "CA", "TX", "NY", "FL", "CO"]
+
+STATES = [
+    ("AL", "Alabama"),
+    ("AK", "Alaska"),
+    ("AZ", "Arizona"),
+    ("AR", "Arkansas"),
+    ("CA", "California"),
+    ("CO", "Colorado"),
+    ("CT", "Connecticut"),
+    ("DE", "Delaware"),
+    ("DC", "District of Columbia"),
+    ("FL", "Florida"),
+    ("GA", "Georgia"),
+    ("HI", "Hawaii"),
+    ("ID", "Idaho"),
+    ("IL", "Illinois"),
+    ("IN", "Indiana"),
+    ("IA", "Iowa"),
+    ("KS", "Kansas"),
+    ("KY", "Kentucky"),
+    ("LA", "Louisiana"),
+    ("ME", "Maine"),
+    ("MD", "Maryland"),
+    ("MA", "Massachusetts"),
+    ("MI", "Michigan"),
+    ("MN", "Minnesota"),
+    ("MS", "Mississippi"),
+    ("MO", "Missouri"),
+    ("MT", "Montana"),
+    ("NE", "Nebraska"),
+    ("NV", "Nevada"),
+    ("NH", "New Hampshire"),
+    ("NJ", "New Jersey"),
+    ("NM", "New Mexico"),
+    ("NY", "New York"),
+    ("NC", "North Carolina"),
+    ("ND", "North Dakota"),
+    ("OH", "Ohio"),
+    ("OK", "Oklahoma"),
+    ("OR", "Oregon"),
+    ("PA", "Pennsylvania"),
+    ("RI", "Rhode Island"),
+    ("SC", "South Carolina"),
+    ("SD", "South Dakota"),
+    ("TN", "Tennessee"),
+    ("TX", "Texas"),
+    ("UT", "Utah"),
+    ("VT", "Vermont"),
+    ("VA", "Virginia"),
+    ("WA", "Washington"),
+    ("WV", "West Virginia"),
+    ("WI", "Wisconsin"),
+    ("WY", "Wyoming"),
+]
+
+
+def ev_rows(count: int) -> List[Dict[str, Any]]:
+    rows = []
+    for i in range(count):
+        make, model, range_miles, battery, msrp = EV_MAKES[i % len(EV_MAKES)]
+        year = 2018 + i % 6
+        rows.append(
+            {
+                "vehicle_id": f"5YJ3E1EA{i:09d}",
+                "make": make,
+                "model": model,
+                "year": year,
+                "range_miles": range_miles,
+                "battery_capacity_kwh": battery,
+                "state": EV_STATES[i % len(EV_STATES)],
+                "registration_date": f"{year}-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                "base_msrp": msrp,
+            }
+        )
+    return rows
+
+
+def tax_rows(count: int) -> List[Dict[str, Any]]:
+    rows = []
+    for i in range(count):
+        code, name = STATES[i % len(STATES)]
+        state_rate = round(2.9 + (i * 7 % 45) / 10, 2)
+        local_rate = round((i * 13 % 50) / 10, 2)
+        rows.append(
+            {
+                "state": code,
+                "state_name": name,
+                "state_tax_rate": state_rate,
+                "state_tax_rank": i % len(STATES) + 1,
+                "avg_local_tax_rate": local_rate,
+                "combined_rate": round(state_rate + local_rate, 2),
+                "combined_rank": (i * 17) % len(STATES) + 1,
+                "max_local_tax_rate": round(local_rate * 1.5, 2),
+            }
+        )
+    return rows
+
+
+def build_server(flavor: str, latency: float, jitter: float, rows: int) -> FastMCP:
+    server = FastMCP(f"stub-{flavor}", log_level="WARNING")
+    make_rows = ev_rows if flavor == "bigquery" else tax_rows
+    payload = json.dumps(make_rows(rows))
+    full_tax_table = json.dumps(tax_rows(len(STATES)))
+
+    @server.tool()
+    async def query(query: str) -> str:
+        """Run a SQL or natural language query"""
+        delay = latency + random.uniform(0, jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if flavor == "s3tables" and "from state_local_tax" in query.lower():
+            return full_tax_table
+        return payload
+
+    @server.tool()
+    def list_tables() -> str:
+        """List the tables this server exposes"""
+        tables = ["ev_registrations"] if flavor == "bigquery" else ["state_local_tax"]
+        return json.dumps(tables)
+
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--flavor", choices=["bigquery", "s3tables"], default="bigquery")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before each answer")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay (s)")
+    parser.add_argument("--rows", type=int, default=100, help="rows returned per query")
+    args = parser.parse_args()
+
+    build_server(args.flavor, args.latency, args.jitter, args.rows).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -15,17 +15,17 @@ async def main():
     """Main example function."""
     # Initialize the orchestrator
     orchestrator = MCPOrchestrator()
-    
+
     # Configure server commands (adjust paths as needed)
     gcp_command = ["python", "-m", "mcp_bigquery_server"]
     aws_command = ["python", "-m", "mcp_s3tables_server"]
-    
+
     try:
         # Connect to both servers
         print("Connecting to MCP servers...")
         await orchestrator.connect(gcp_command, aws_command)
         print("Connected successfully!")
-        
+
         # Example queries
         queries = [
             "What is the average range of electric vehicles?",
@@ -33,23 +33,23 @@ async def main():
             "How many Tesla vehicles are in the dataset?",
             "What are the top 5 states by tax revenue?",
         ]
-        
+
         # Process each query
         for query in queries:
             print(f"\nQuery: {query}")
             print("-" * 50)
-            
+
             result = await orchestrator.process_query(query)
-            
-            print(f"Routed to: {result['server']}")
+
+            print(f"Routed to: {result['source']}")
             print(f"Confidence: {result['confidence']:.2f}")
-            print(f"Result: {result['result']}")
-            
+            print(f"Result: {result['data']}")
+
     except Exception as e:
         print(f"Error: {e}")
-    
+
     finally:
-        # Clean up connections
+        # Drain in-flight calls and terminate the server subprocesses
         await orchestrator.disconnect()
         print("\nDisconnected from servers.")
 
@@ -60,5 +60,5 @@ if __name__ == "__main__":
     # os.environ["GCP_PROJECT_ID"] = "your-project-id"
     # os.environ["AWS_ACCESS_KEY_ID"] = "your-access-key"
     # os.environ["AWS_SECRET_ACCESS_KEY"] = "your-secret-key"
-    
+
     asyncio.run(main())
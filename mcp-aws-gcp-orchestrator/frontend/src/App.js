@@ -1,6 +1,7 @@
 import React, { useState } from 'react';
 import QueryInput from './components/QueryInput';
 import QueryResults from './components/QueryResults';
+import streamQuery from './streamQuery';
 import './App.css';
 
 function App() {
@@ -13,39 +14,14 @@ function App() {
     setError(null);
     
     try {
-      const response = await fetch('/api/query', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ query }),
-      });
-      
-      if (!response.ok) {
-        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-      }
-      
-      const data = await response.json();
+      // Results render progressively as rows stream in
+      const data = await streamQuery('/api/query/stream', query, setResults);
       console.log('Received data:', data);
-      setResults(data);
     } catch (err) {
       if (err.message.includes('Proxy error') || err.message.includes('Unexpected token')) {
         try {
-          const response = await fetch('http://localhost:8000/api/query', {
-            method: 'POST',
-            headers: {
-              'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({ query }),
-          });
-          
-          if (!response.ok) {
-            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
-          }
-          
-          const data = await response.json();
+          const data = await streamQuery('http://localhost:8000/api/query/stream', query, setResults);
           console.log('Direct API data:', data);
-          setResults(data);
         } catch (directErr) {
           setError('Backend not available. Please ensure the backend server is running on port 8000.');
         }
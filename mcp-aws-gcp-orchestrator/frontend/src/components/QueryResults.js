@@ -14,6 +14,8 @@ const QueryResults = ({ results }) => {
         return '🟠 S3 Tables (Tax Data)';
       case 'multi_source':
         return '🔵🟠 Multi-Source (Both)';
+      case 'joined':
+        return '🔵🟠 Joined (EV x Tax by State)';
       default:
         return '📊 Data Source';
     }
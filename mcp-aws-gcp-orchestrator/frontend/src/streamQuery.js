@@ -0,0 +1,99 @@
+// Reads newline-delimited JSON events from /api/query/stream and calls
+// onUpdate with a results object shaped like the /api/query response,
+// so QueryResults can render rows as they arrive. Rows are requested in the
+// columnar format (column names and repeated strings sent once per chunk)
+// and expanded here.
+
+// Rows of a columnar result: {format: 'columnar', length, columns: [...]}
+export const columnarToRows = (table) => {
+  const columns = table.columns.map((column) => {
+    if (column.type === 'dictionary') {
+      return column.codes.map((code) => column.dictionary[code]);
+    }
+    return column.values;
+  });
+  const rows = new Array(table.length);
+  for (let i = 0; i < table.length; i += 1) {
+    const row = {};
+    table.columns.forEach((column, c) => {
+      row[column.name] = columns[c][i];
+    });
+    rows[i] = row;
+  }
+  return rows;
+};
+
+const applyEvent = (results, event) => {
+  switch (event.type) {
+    case 'route':
+      return {
+        status: 'success',
+        query: event.query,
+        source: event.source,
+        confidence: event.confidence,
+        reason: event.reason,
+        data: event.source === 'multi_source' ? { tax_data: [], ev_data: [] } : [],
+      };
+    case 'rows':
+    case 'columns':
+    case 'content': {
+      let rows = [event.content];
+      if (event.type === 'rows') {
+        rows = event.rows;
+      } else if (event.type === 'columns') {
+        rows = columnarToRows(event.data);
+      }
+      if (results.source === 'multi_source') {
+        const key = event.source === 'aws_s3_tables' ? 'tax_data' : 'ev_data';
+        return { ...results, data: { ...results.data, [key]: results.data[key].concat(rows) } };
+      }
+      return { ...results, data: results.data.concat(rows) };
+    }
+    case 'error':
+      if (results.source === 'multi_source') {
+        return { ...results, errors: { ...results.errors, [event.source]: event.error } };
+      }
+      return { ...results, status: 'error', error: event.error };
+    default:
+      return results;
+  }
+};
+
+const streamQuery = async (url, query, onUpdate) => {
+  const response = await fetch(url, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ query, format: 'columnar' }),
+  });
+
+  if (!response.ok || !response.body) {
+    throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let results = null;
+
+  const handleLine = (line) => {
+    if (!line.trim()) return;
+    results = applyEvent(results, JSON.parse(line));
+    onUpdate(results);
+  };
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop();
+    lines.forEach(handleLine);
+  }
+  handleLine(buffer);
+
+  return results;
+};
+
+export default streamQuery;
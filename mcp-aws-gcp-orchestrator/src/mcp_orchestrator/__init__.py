@@ -6,5 +6,15 @@ __version__ = "0.1.0"
 __author__ = "Nirranjana Jaiswwal"
 
 from .aws_gcp_orchestrator import MCPOrchestrator, DataSource, QueryRoute
+from .pushdown import TableSchema
+from .sources import ReplicaSpec, SourceRegistry, SourceSpec
 
-__all__ = ["MCPOrchestrator", "DataSource", "QueryRoute"]
+__all__ = [
+    "MCPOrchestrator",
+    "DataSource",
+    "QueryRoute",
+    "ReplicaSpec",
+    "SourceRegistry",
+    "SourceSpec",
+    "TableSchema",
+]
@@ -0,0 +1,154 @@
+"""Per-source admission control"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+
+
+class Overloaded(RuntimeError):
+    """A query was rejected before reaching the MCP server"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After value in whole seconds (at least 1)"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class QueueFull(Overloaded):
+    """The source's wait queue is at capacity"""
+
+
+class DeadlineExceeded(Overloaded):
+    """The query cannot start before its deadline"""
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded FIFO wait queue for one data source.
+
+    At most ``limit`` queries run at once; up to ``max_queue`` more wait for
+    a slot and anything beyond that is rejected with QueueFull. Waiting is
+    deadline aware: a query whose expected wait (queue position times the
+    smoothed service time, divided by the limit) already overruns its
+    deadline is rejected immediately, and a queued query that reaches its
+    deadline is removed and rejected with DeadlineExceeded. Both carry a
+    ``retry_after`` estimate of when a slot should free up.
+    """
+
+    def __init__(self, limit: int, max_queue: int = 64, name: str = ""):
+        if limit < 1:
+            raise ValueError("Admission limit must be at least 1")
+        self.limit = limit
+        self.max_queue = max_queue
+        self.name = name
+        self.active = 0
+        # Exponentially weighted mean of slot hold times, seeded optimistically
+        self.service_time = 0.1
+
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def expected_wait(self, position: Optional[int] = None) -> float:
+        """Seconds until a query queued at ``position`` should get a slot"""
+        if position is None:
+            position = len(self._waiters)
+        if self.active < self.limit and position == 0:
+            return 0.0
+        return (position + 1) * self.service_time / self.limit
+
+    async def acquire(self, deadline: Optional[float] = None) -> None:
+        """Wait for a slot, or raise Overloaded; deadline is a time.monotonic() value"""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise QueueFull(f"Too many queued queries for {self.name}", self.expected_wait())
+
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining < self.expected_wait():
+                self.rejected += 1
+                raise DeadlineExceeded(
+                    f"Queries for {self.name} would not start before the deadline",
+                    self.expected_wait(),
+                )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            if deadline is None:
+                await waiter
+            else:
+                remaining = max(0.0, deadline - time.monotonic())
+                await asyncio.wait_for(asyncio.shield(waiter), remaining)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.timed_out += 1
+            raise DeadlineExceeded(
+                f"Timed out waiting for a {self.name} slot", self.expected_wait()
+            ) from None
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        self.admitted += 1
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        if waiter.done() and not waiter.cancelled():
+            # The slot was handed over just as the wait ended; pass it on
+            self.release()
+        else:
+            waiter.cancel()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def release(self, held: Optional[float] = None) -> None:
+        """Free a slot, handing it straight to the oldest waiter"""
+        if held is not None:
+            self.service_time += 0.2 * (held - self.service_time)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, deadline: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block"""
+        await self.acquire(deadline)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    def stats(self) -> Dict[str, float]:
+        """Counters for monitoring"""
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "service_time": self.service_time,
+        }
@@ -1,33 +1,88 @@
 import asyncio
 import json
-import re
-from typing import Any, Dict, List, Optional
-from enum import Enum
-from dataclasses import dataclass
+import logging
+import os
+import sqlite3
+import time
+from itertools import islice
+from types import MappingProxyType
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from dataclasses import dataclass, field, replace
 
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+from mcp import StdioServerParameters
 
+from .admission import AdmissionController, DeadlineExceeded, Overloaded
+from .balancer import ReplicaPool
+from .batcher import MicroBatcher, split_rows
+from .circuit_breaker import CircuitBreaker, CircuitOpen, CircuitState
+from .classifier import HashedNgramClassifier
+from .columnar import ColumnarResult
+from .content import error_text, is_json_array, iter_json_rows, rows_from_content
+from .disk_cache import DiskCache
+from .feedback import RoutingFeedback, outcome_of
+from .join import JoinPlan, StateTaxJoin, plan_join
+from .metrics import Metrics
+from .pushdown import SqlTranslator, Translation
+from .result_cache import ResultCache, normalize_query
+from .route_cache import RouteCache
+from .router import QueryRouter, RouteScores
+from .session_pool import SessionPool
+from .sources import (
+    DataSource,
+    Source,
+    SourceRegistry,
+    SourceSpec,
+    as_source,
+    builtin_sources,
+    source_name,
+)
+from .tax_table import TAX_TABLE, StateTaxTable
+from .tool_catalog import ToolCatalog
 
-class DataSource(Enum):
-    """Enumeration of available data sources"""
-    GCP_BIGQUERY = "gcp_bigquery"
-    AWS_S3_TABLES = "aws_s3_tables"
+logger = logging.getLogger(__name__)
 
 
 @dataclass
 class QueryRoute:
     """Represents a query routing decision"""
-    source: DataSource
+
+    source: Source
     query: str
     confidence: float
     reason: str
+    scores: Optional[RouteScores] = None
+    # Every source the query needs; more than one for cross-source questions
+    targets: List[Source] = field(default_factory=list)
+    # Which router decided: "keyword" or "classifier"
+    router: str = "keyword"
+
+    @property
+    def is_multi_source(self) -> bool:
+        return len(self.targets) > 1
+
+    @property
+    def source_name(self) -> str:
+        return source_name(self.source)
 
 
 class MCPOrchestrator:
     """
-    MCP Orchestrator that routes queries between:
-    
+    MCP Orchestrator that routes queries between the registered data sources.
+
+    By default these are:
+
     GCP BigQuery - Electric Vehicle Data:
     - vehicle_id: Unique vehicle identifier
     - make: Vehicle manufacturer (Tesla, Ford, BMW, etc.)
@@ -37,7 +92,7 @@ class MCPOrchestrator:
     - battery_capacity_kwh: Battery capacity in kWh
     - state: Registration state
     - registration_date: Vehicle registration date
-    
+
     AWS S3 Tables - State Tax Data (state_local_tax table):
     - state: State code (CA, TX, CO, etc.)
     - state_name: Full state name
@@ -47,187 +102,1427 @@ class MCPOrchestrator:
     - combined_rate: Combined state + local tax rate
     - combined_rank: Combined tax ranking
     - max_local_tax_rate: Maximum local tax rate
+
+    Pass ``sources`` (SourceSpecs) to route between any number of MCP
+    servers instead. Per-source dicts below are keyed by source name;
+    DataSource members work as keys for the built-in sources.
     """
-    
-    def __init__(self):
-        self.gcp_session: Optional[ClientSession] = None
-        self.aws_session: Optional[ClientSession] = None
-        self.gcp_tools = {}
-        self.aws_tools = {}
-        
-        # Keywords for intelligent routing
-        self.ev_keywords = [
-            'ev', 'electric vehicle', 'charging', 'battery', 'tesla',
-            'vehicle', 'car', 'automotive', 'range', 'kwh', 'model',
-            'registration', 'charging station'
-        ]
-        
-        self.tax_keywords = [
-            'tax', 'tax rate', 'sales tax', 'local tax', 'combined tax',
-            'tax rank', 'tax ranking', 'state tax', 'revenue', 'taxation',
-            'fiscal', 'state-wise', 'statewise'
-        ]
-    
-    async def connect(self, 
-                     gcp_server_command: List[str],
-                     aws_server_command: List[str]):
-        """Connect to both MCP servers"""
-        print("🔗 Connecting to MCP servers...")
-        
+
+    # Seconds the request-level timeout trails the upstream call timeout
+    DEADLINE_GRACE = 0.05
+
+    # Sources queried at once for a speculative low-confidence query
+    SPECULATIVE_FANOUT = 2
+
+    def __init__(
+        self,
+        pool_size: int = 2,
+        tool_cache_ttl: float = 300.0,
+        source_timeouts: Optional[Dict[Source, float]] = None,
+        cache_ttls: Optional[Dict[Source, float]] = None,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+        cache_dir: Optional[str] = None,
+        cache_disk_max_bytes: int = 512 * 1024 * 1024,
+        local_tax_table: bool = False,
+        tax_table_refresh: float = 3600.0,
+        max_concurrency: Optional[Dict[Source, int]] = None,
+        max_queue: int = 64,
+        request_timeout: float = 30.0,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 30.0,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        sources: Optional[Iterable[SourceSpec]] = None,
+        replica_eject_factor: float = 3.0,
+        replica_eject_time: float = 30.0,
+        classifier: Optional[HashedNgramClassifier] = None,
+        classifier_threshold: float = 0.6,
+        route_cache_size: int = 4096,
+        sql_pushdown: bool = True,
+        warm_spares: int = 1,
+        batch_window: float = 0.0,
+        batch_max_states: int = 50,
+        adaptive_routing: bool = True,
+        adaptive_below: float = 0.6,
+        speculate_below: float = 0.0,
+    ):
+        # Every MCP backend with its command, vocabulary and pool settings
+        self.sources = SourceRegistry(
+            builtin_sources(pool_size, tool_cache_ttl) if sources is None else sources
+        )
+        names = self.sources.names
+        # Route sources as DataSource members for the built-ins, names otherwise
+        self._source_ids: Dict[str, Source] = {name: as_source(name) for name in names}
+
+        # Warm session pools; they expose call_tool/list_tools like a ClientSession.
+        # Sources with several replicas get a ReplicaPool balancing over one
+        # SessionPool per replica, ejecting replicas that are slow or failing
+        self.pool_size = pool_size
+        self.pools: Dict[str, Union[SessionPool, ReplicaPool]] = {}
+        self.replica_eject_factor = replica_eject_factor
+        self.replica_eject_time = replica_eject_time
+        # Initialized standby sessions per pool that replace dead ones at once
+        self.warm_spares = warm_spares
+
+        # Cold start timing: when connect() began, how long until every
+        # source had a warm session, and until each source first answered
+        self.connected = False
+        self.started_at: Optional[float] = None
+        self.warm_seconds: Optional[float] = None
+        self.first_answer_seconds: Dict[str, float] = {}
+
+        # Tool listings are cached per server
+        self.catalogs: Dict[str, ToolCatalog] = {
+            spec.name: ToolCatalog(ttl=spec.tool_cache_ttl) for spec in self.sources
+        }
+
+        # Per-source deadline for a single tool call, in seconds
+        self.source_timeouts: Dict[str, float] = self._per_source(
+            {spec.name: spec.query_timeout for spec in self.sources}, source_timeouts
+        )
+
+        # Admission control: at most max_concurrency upstream calls per source
+        # (one per pooled session by default), a bounded wait queue behind it,
+        # and an overall deadline per request
+        limits = self._per_source(
+            {spec.name: spec.max_concurrency for spec in self.sources}, max_concurrency
+        )
+        self.admission: Dict[str, AdmissionController] = {
+            name: AdmissionController(max(1, limit), max_queue, name=name)
+            for name, limit in limits.items()
+        }
+        self.request_timeout = request_timeout
+
+        # Fail fast on a source that keeps failing instead of tying up requests
+        self.breakers: Dict[str, CircuitBreaker] = {
+            name: CircuitBreaker(breaker_threshold, breaker_reset, name=name) for name in names
+        }
+
+        # Hedged requests: if a call outlives the source's call_tool latency at
+        # hedge_quantile, a second attempt goes to another idle session
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+
+        # Results keyed on (source, tool, normalized query), kept for each
+        # source's cache TTL. A TTL of 0 disables caching for that source.
+        self.cache_ttls: Dict[str, float] = self._per_source(
+            {spec.name: spec.cache_ttl for spec in self.sources}, cache_ttls
+        )
+        # With a cache_dir, results also go to a SQLite file shared by every
+        # worker process and kept across restarts
+        disk = None
+        if cache_dir:
+            try:
+                disk = DiskCache(
+                    os.path.join(cache_dir, "results.sqlite3"), max_bytes=cache_disk_max_bytes
+                )
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Disk result cache unavailable in %s: %s", cache_dir, e)
+        self.result_cache = ResultCache(
+            max_bytes=cache_max_bytes,
+            cacheable=lambda result: not getattr(result, "isError", False),
+            disk=disk,
+        )
+
+        # Optional in-memory copy of state_local_tax for per-state lookups,
+        # loaded from the table the tax source's schema names
+        tax = self.sources.get(DataSource.AWS_S3_TABLES)
+        self.tax_table: Optional[StateTaxTable] = (
+            StateTaxTable(
+                tax.schema.table if tax.schema and tax.schema.table else TAX_TABLE,
+                refresh_interval=tax_table_refresh,
+            )
+            if local_tax_table and tax is not None
+            else None
+        )
+        self._tax_refresh_task: Optional[asyncio.Task] = None
+
+        # Per-stage/per-source latency histograms and counters for /api/metrics
+        self.metrics = Metrics()
+        self.metrics.add_collector(self._cache_samples)
+        self.metrics.add_collector(self._admission_samples)
+        self.metrics.add_collector(self._breaker_samples)
+        self.metrics.add_collector(self._replica_samples)
+        self.metrics.add_collector(self._readiness_samples)
+
+        # Compiled once; scores every source's vocabulary in a single pass
+        self.router = QueryRouter(self.sources)
+
+        # Optional trained classifier; single-source queries it is at least
+        # classifier_threshold sure about skip the keyword heuristics
+        self.classifier = classifier
+        self.classifier_threshold = classifier_threshold
+        if classifier is not None:
+            unknown = [name for name in classifier.classes if name not in self.sources]
+            if unknown:
+                logger.warning(
+                    "Routing classifier predicts unregistered sources %s; "
+                    "those predictions fall back to keyword routing",
+                    unknown,
+                )
+
+        # Routing decisions memoized on the router's normal form of the query
+        # (case, spacing, punctuation and state name vs code folded together);
+        # a size of 0 disables the memo
+        self.route_cache: Optional[RouteCache] = (
+            RouteCache(self.router.normalize, route_cache_size) if route_cache_size > 0 else None
+        )
+        self.metrics.add_collector(self._route_cache_samples)
+
+        # Observed outcomes (data, empty, error, latency) per query fingerprint
+        # and source redirect routes below adaptive_below confidence; below
+        # speculate_below the likeliest sources are queried at once (0 disables)
+        self.feedback: Optional[RoutingFeedback] = RoutingFeedback() if adaptive_routing else None
+        self.adaptive_below = adaptive_below
+        self.speculate_below = speculate_below
+        self.metrics.add_collector(self._feedback_samples)
+
+        # Recognized questions to sources whose schema names their table are
+        # sent as SQL projecting only the needed columns, with a LIMIT;
+        # templates are cached per query fingerprint
+        schemas = {
+            spec.name: spec.schema
+            for spec in self.sources
+            if spec.schema is not None and spec.schema.table
+        }
+        self.translator: Optional[SqlTranslator] = (
+            SqlTranslator(schemas, self.router.normalize) if sql_pushdown and schemas else None
+        )
+        self.metrics.add_collector(self._pushdown_samples)
+
+        # Per-state lookups of the same shape arriving within batch_window
+        # seconds share one upstream call over all their states (0 disables)
+        self.batcher: Optional[MicroBatcher] = (
+            MicroBatcher(batch_window, batch_max_states)
+            if batch_window > 0 and self.translator is not None
+            else None
+        )
+
+    @staticmethod
+    def _per_source(
+        defaults: Dict[str, Any], overrides: Optional[Dict[Source, Any]]
+    ) -> Dict[str, Any]:
+        values = dict(defaults)
+        values.update({source_name(source): value for source, value in (overrides or {}).items()})
+        return values
+
+    # Shorthands for the built-in sources
+
+    @property
+    def gcp_session(self) -> Optional[SessionPool]:
+        return self.pools.get(DataSource.GCP_BIGQUERY.value)
+
+    @property
+    def aws_session(self) -> Optional[SessionPool]:
+        return self.pools.get(DataSource.AWS_S3_TABLES.value)
+
+    def _tools_view(self, source: DataSource) -> Mapping[str, Any]:
+        """Read-only live view of a source's discovered tools by name"""
+        catalog = self.catalogs.get(source.value)
+        return MappingProxyType(catalog.tools if catalog is not None else {})
+
+    @property
+    def gcp_tools(self) -> Mapping[str, Any]:
+        return self._tools_view(DataSource.GCP_BIGQUERY)
+
+    @property
+    def aws_tools(self) -> Mapping[str, Any]:
+        return self._tools_view(DataSource.AWS_S3_TABLES)
+
+    @property
+    def ev_keywords(self) -> List[str]:
+        spec = self.sources.get(DataSource.GCP_BIGQUERY)
+        return spec.keywords if spec else []
+
+    @property
+    def tax_keywords(self) -> List[str]:
+        spec = self.sources.get(DataSource.AWS_S3_TABLES)
+        return spec.keywords if spec else []
+
+    async def connect(
+        self,
+        gcp_server_command: Optional[List[str]] = None,
+        aws_server_command: Optional[List[str]] = None,
+    ):
+        """
+        Connect to every registered MCP server and warm up its session pool.
+
+        The built-in sources' commands can be overridden with the two
+        positional arguments; other sources use the command in their spec.
+        """
+        logger.info("Connecting to MCP servers")
+        self.connected = False
+        self.started_at = time.monotonic()
+        self.warm_seconds = None
+        self.first_answer_seconds = {}
+
+        overrides = {
+            DataSource.GCP_BIGQUERY.value: gcp_server_command,
+            DataSource.AWS_S3_TABLES.value: aws_server_command,
+        }
         try:
-            gcp_params = StdioServerParameters(
-                command=gcp_server_command[0],
-                args=gcp_server_command[1:] if len(gcp_server_command) > 1 else []
-            )
-            
-            aws_params = StdioServerParameters(
-                command=aws_server_command[0],
-                args=aws_server_command[1:] if len(aws_server_command) > 1 else []
-            )
-            
-            # Store connection info for later use
-            self.gcp_params = gcp_params
-            self.aws_params = aws_params
-            
-            print(f"✅ MCP server parameters configured")
-            print(f"GCP command: {gcp_server_command}")
-            print(f"AWS command: {aws_server_command}")
-            
+            params = {}
+            for spec in self.sources:
+                if overrides.get(spec.name):
+                    spec.command = list(overrides[spec.name])
+                params[spec.name] = spec.replica_params
+                for replica, replica_params in params[spec.name]:
+                    logger.info(
+                        "MCP server parameters configured: %s=%s %s",
+                        replica,
+                        replica_params.command,
+                        replica_params.args,
+                    )
         except Exception as e:
-            print(f"❌ Failed to configure MCP servers: {e}")
+            logger.error("Failed to configure MCP servers: %s", e)
             raise
-    
+
+        # Pools are registered before warming up so that a startup timeout
+        # still leaves them usable; missing sessions are spawned on first lease.
+        # Every session and spare of every source is spawned concurrently
+        self.pools = {spec.name: self._make_pool(spec, params[spec.name]) for spec in self.sources}
+
+        warm = await asyncio.gather(*(pool.start() for pool in self.pools.values()))
+        for spec, count in zip(self.sources, warm):
+            pool = self.pools[spec.name]
+            logger.info(
+                "Warm sessions: %s=%d/%d (+%d spare)",
+                spec.name,
+                count,
+                pool.size,
+                getattr(pool, "spare", 0),
+            )
+        self.connected = True
+        self._check_warm()
+
+        # Discover tools once up front; a server that is not up yet is
+        # listed lazily on its first query
+        results = await asyncio.gather(
+            *(self._refresh_catalog(source) for source, pool in self.pools.items() if pool.warm),
+            return_exceptions=True,
+        )
+        for error in results:
+            if isinstance(error, Exception):
+                logger.warning("Tool discovery failed: %s", error)
+
+        if self.tax_table is not None:
+            try:
+                count = await self._refresh_tax_table()
+                logger.info("Loaded %s: %d states", self.tax_table.table, count)
+            except Exception as e:
+                logger.warning(
+                    "Loading %s failed, tax lookups use the server: %s", self.tax_table.table, e
+                )
+            if self._tax_refresh_task is None:
+                self._tax_refresh_task = asyncio.create_task(self._tax_refresh_loop())
+
+    def _make_pool(
+        self, spec: SourceSpec, replicas: List[Tuple[str, StdioServerParameters]]
+    ) -> Union[SessionPool, ReplicaPool]:
+        """A session pool for the source, balanced over replicas if it has several"""
+        pools = [
+            (
+                replica,
+                SessionPool(
+                    params,
+                    size=spec.pool_size,
+                    message_handler=self.catalogs[spec.name].handle_message,
+                    metrics=self.metrics,
+                    name=spec.name,
+                    spares=self.warm_spares,
+                ),
+            )
+            for replica, params in replicas
+        ]
+        if len(pools) == 1:
+            return pools[0][1]
+        return ReplicaPool(
+            pools,
+            strategy=spec.balance,
+            eject_factor=self.replica_eject_factor,
+            eject_time=self.replica_eject_time,
+            call_timeout=self.source_timeouts[spec.name],
+            metrics=self.metrics,
+            name=spec.name,
+        )
+
+    async def _refresh_tax_table(self) -> int:
+        """Reload the local state_local_tax copy through the AWS pool"""
+        pool = self.pools[DataSource.AWS_S3_TABLES]
+        if self.catalogs[DataSource.AWS_S3_TABLES].stale:
+            await self._refresh_catalog(DataSource.AWS_S3_TABLES)
+        return await self.tax_table.refresh(pool, self._find_query_tool(DataSource.AWS_S3_TABLES))
+
+    async def _tax_refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.tax_table.refresh_interval)
+            try:
+                await self._refresh_tax_table()
+            except Exception as e:
+                logger.warning("Refreshing %s failed: %s", self.tax_table.table, e)
+
+    async def disconnect(self, drain_timeout: float = 10.0) -> None:
+        """
+        Shut down every session pool and terminate the server subprocesses.
+
+        Upstream calls already in flight get up to ``drain_timeout`` seconds
+        to finish first. Safe to call more than once.
+        """
+        if self._tax_refresh_task is not None:
+            self._tax_refresh_task.cancel()
+            self._tax_refresh_task = None
+
+        deadline = time.monotonic() + drain_timeout
+        while self.in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self.in_flight:
+            logger.warning("Closing MCP sessions with %d calls still in flight", self.in_flight)
+        if self.batcher is not None:
+            await self.batcher.close()
+
+        self.connected = False
+        pools, self.pools = self.pools, {}
+        results = await asyncio.gather(
+            *(pool.close() for pool in pools.values()), return_exceptions=True
+        )
+        for name, error in zip(pools, results):
+            if isinstance(error, Exception):
+                logger.warning("Closing %s sessions failed: %s", name, error)
+        if self.result_cache.disk is not None:
+            self.result_cache.disk.close()
+        logger.info("Disconnected from MCP servers")
+
+    @property
+    def ready(self) -> bool:
+        """connect() has run and every source has at least one warm session"""
+        return (
+            self.connected
+            and bool(self.pools)
+            and all(pool.warm > 0 for pool in self.pools.values())
+        )
+
+    def _check_warm(self) -> None:
+        """Record the time to warm the first time every source is ready"""
+        if self.warm_seconds is None and self.started_at is not None and self.ready:
+            self.warm_seconds = time.monotonic() - self.started_at
+            logger.info("All MCP sources warm %.2fs after connect", self.warm_seconds)
+
+    def readiness(self) -> Dict[str, Any]:
+        """Warm and spare session counts per source plus the cold start timings"""
+        self._check_warm()
+        return {
+            "ready": self.ready,
+            "sources": {
+                name: {"warm": pool.warm, "size": pool.size, "spare": getattr(pool, "spare", 0)}
+                for name, pool in self.pools.items()
+            },
+            "cold_start": {
+                "warm_seconds": self.warm_seconds,
+                "first_answer_seconds": dict(self.first_answer_seconds),
+            },
+        }
+
+    @property
+    def in_flight(self) -> int:
+        """Upstream calls currently holding an admission slot"""
+        return sum(controller.active for controller in self.admission.values())
+
     def analyze_query(self, query: str) -> QueryRoute:
         """Analyze query and determine routing"""
-        query_lower = query.lower()
-        
-        ev_score = sum(1 for keyword in self.ev_keywords if keyword in query_lower)
-        tax_score = sum(1 for keyword in self.tax_keywords if keyword in query_lower)
-        
-        # Enhanced state detection including abbreviations
-        state_pattern = r'\b(california|ca|texas|tx|new york|ny|florida|fl|illinois|il|pennsylvania|pa|ohio|oh|georgia|ga|north carolina|nc|michigan|mi|colorado|co)\b'
-        has_state = bool(re.search(state_pattern, query_lower))
-        
-        # Strong preference for S3 Tables ONLY when querying state tax data
-        if has_state and any(keyword in query_lower for keyword in ['tax', 'rate', 'ranking', 'revenue']):
-            tax_score += 10  # Very strong preference for tax + state queries
-        elif has_state and ev_score == 0:  # Only boost for state if NO EV keywords present
-            tax_score += 3   # Moderate preference for state-only queries
-        
-        # Boost tax score for specific tax-related terms
-        if any(term in query_lower for term in ['tax rate', 'sales tax', 'combined rate', 'tax rank']):
-            tax_score += 3
-        
-        if ev_score > tax_score:
-            return QueryRoute(
-                source=DataSource.GCP_BIGQUERY,
-                query=query,
-                confidence=min(ev_score / (ev_score + tax_score + 1), 0.95),
-                reason=f"Query contains EV-related keywords (score: {ev_score})"
-            )
-        elif tax_score > ev_score:
-            return QueryRoute(
-                source=DataSource.AWS_S3_TABLES,
+        with self.metrics.timer("route"):
+            cache = self.route_cache
+            if cache is None:
+                return self._adapt(self._decide(query))
+            key = cache.key(query)
+            cached = cache.get(key)
+            if cached is not None:
+                return self._adapt(self._for_query(cached, query), key)
+            route = self._decide(query)
+            cache.put(key, route)
+            return self._adapt(route, key)
+
+    def _decide(self, query: str) -> QueryRoute:
+        prediction = self.classifier.predict(query) if self.classifier is not None else None
+        return self._route(query, self.router.score(query), prediction)
+
+    @staticmethod
+    def _for_query(route: QueryRoute, query: str) -> QueryRoute:
+        """A cached decision, re-addressed to the query being routed"""
+        return replace(route, query=query, targets=list(route.targets))
+
+    def analyze_queries(self, queries: Iterable[str]) -> List[QueryRoute]:
+        """Analyze a batch of queries; repeats within the batch are scored once"""
+        queries = list(queries)
+        cache = self.route_cache
+        if cache is None:
+            return self._decide_batch(queries)
+
+        routes: List[Optional[QueryRoute]] = [None] * len(queries)
+        # First occurrence of each uncached key in the batch is scored once
+        pending: Dict[Any, List[int]] = {}
+        for i, query in enumerate(queries):
+            key = cache.key(query)
+            waiting = pending.get(key)
+            if waiting is not None:
+                waiting.append(i)
+                continue
+            cached = cache.get(key)
+            if cached is not None:
+                routes[i] = self._for_query(cached, query)
+            else:
+                pending[key] = [i]
+
+        if pending:
+            firsts = [indices[0] for indices in pending.values()]
+            decided = self._decide_batch([queries[i] for i in firsts])
+            for (key, indices), route in zip(pending.items(), decided):
+                cache.put(key, route)
+                routes[indices[0]] = route
+                for i in indices[1:]:
+                    routes[i] = self._for_query(route, queries[i])
+        return [self._adapt(route) for route in routes]
+
+    def _fingerprint(self, query: str) -> Any:
+        """Key routing feedback is recorded under: the router's normal form"""
+        if self.route_cache is not None:
+            return self.route_cache.key(query)
+        return self.router.normalize(query)
+
+    def _adapt(self, route: QueryRoute, fingerprint: Any = None) -> QueryRoute:
+        """A low-confidence route moved to a source that answered similar queries better"""
+        feedback = self.feedback
+        if (
+            feedback is None
+            or not len(feedback)
+            or route.is_multi_source
+            or route.confidence >= self.adaptive_below
+        ):
+            return route
+        if fingerprint is None:
+            fingerprint = self._fingerprint(route.query)
+        # Only sources with a pool: an unobserved one would otherwise look promising
+        candidates = [name for name in self.sources.names if name in self.pools]
+        better = feedback.prefer(fingerprint, route.source_name, candidates)
+        if better is None:
+            return route
+        name, why = better
+        source = self._source_ids[name]
+        self.metrics.inc("route_adjustments", source=name)
+        return replace(
+            route,
+            source=source,
+            targets=[source],
+            router="feedback",
+            reason=f"{route.reason}; sent to {self.sources[name].title} instead: {why}",
+        )
+
+    def _record_outcome(self, query: str, source: Source, outcome: str, latency: float) -> None:
+        if self.feedback is None:
+            return
+        name = source_name(source)
+        self.feedback.record(self._fingerprint(query), name, outcome, latency)
+        self.metrics.inc("route_feedback", source=name, outcome=outcome)
+
+    def _decide_batch(self, queries: List[str]) -> List[QueryRoute]:
+        scores = self.router.score_batch(queries)
+        if self.classifier is None:
+            return [self._route(query, score) for query, score in zip(queries, scores)]
+        predictions = self.classifier.predict_batch(queries)
+        return [
+            self._route(query, score, prediction)
+            for query, score, prediction in zip(queries, scores, predictions)
+        ]
+
+    def iter_analyze_queries(
+        self, queries: Iterable[str], batch_size: int = 1024
+    ) -> Iterator[QueryRoute]:
+        """Stream routes for an arbitrarily large iterable, batch_size at a time"""
+        iterator = iter(queries)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                return
+            yield from self.analyze_queries(batch)
+
+    def _route(
+        self, query: str, scores: RouteScores, prediction: Optional[Tuple[str, float]] = None
+    ) -> QueryRoute:
+        """Turn router scores (and a classifier prediction, if any) into a routing decision"""
+        if prediction is not None:
+            label, probability = prediction
+            # Cross-source questions stay with the keyword router, which can
+            # name several targets; the classifier picks exactly one
+            if (
+                probability >= self.classifier_threshold
+                and label in self.sources
+                and len(scores.matched) <= 1
+            ):
+                source = self._source_ids[label]
+                return QueryRoute(
+                    source=source,
+                    query=query,
+                    confidence=probability,
+                    reason=(
+                        f"Classifier predicted {self.sources[label].title} "
+                        f"(p={probability:.2f})"
+                    ),
+                    scores=scores,
+                    targets=[source],
+                    router="classifier",
+                )
+            route = self._keyword_route(query, scores)
+            route.reason += f" (keyword router; classifier unsure: {label} p={probability:.2f})"
+            return route
+        return self._keyword_route(query, scores)
+
+    def _keyword_route(self, query: str, scores: RouteScores) -> QueryRoute:
+        """Routing decision from keyword scores alone"""
+        # Only sources with a nonzero score are listed
+        best_name, best, ties, total = None, 0, 0, 0
+        for name, score in scores.scores.items():
+            total += score
+            if score > best:
+                best_name, best, ties = name, score, 1
+            elif score == best:
+                ties += 1
+
+        if best > 0 and ties == 1:
+            spec = self.sources[best_name]
+            route = QueryRoute(
+                source=self._source_ids[best_name],
                 query=query,
-                confidence=min(tax_score / (ev_score + tax_score + 1), 0.95),
-                reason=f"Query contains tax/state-related keywords (score: {tax_score})"
+                confidence=min(best / (total + 1), 0.95),
+                reason=f"Query contains {spec.description} keywords (score: {best})",
+                scores=scores,
             )
         else:
-            return QueryRoute(
-                source=DataSource.GCP_BIGQUERY,
+            spec = self.sources.default
+            route = QueryRoute(
+                source=self._source_ids[spec.name],
                 query=query,
                 confidence=0.5,
-                reason="Ambiguous query - defaulting to GCP BigQuery"
+                reason=f"Ambiguous query - defaulting to {spec.title}",
+                scores=scores,
             )
-    
+
+        # Questions that need data from several sources go to all of them
+        if len(scores.matched) > 1:
+            route.targets = [self._source_ids[name] for name in scores.matched]
+            others = [self.sources[name].title for name in scores.matched if name != spec.name]
+            route.reason += f"; also needs data from {', '.join(others)}"
+        else:
+            route.targets = [route.source]
+        return route
+
     async def execute_query(self, route: QueryRoute) -> Dict[str, Any]:
         """Execute query on the appropriate data source"""
-        print(f"\n🎯 Routing to: {route.source.value}")
-        print(f"📊 Confidence: {route.confidence:.2%}")
-        print(f"💡 Reason: {route.reason}\n")
-        
+        logger.debug(
+            "Routing to %s (confidence %.2f): %s", route.source_name, route.confidence, route.reason
+        )
+
         try:
-            if route.source == DataSource.GCP_BIGQUERY:
-                if not self.gcp_session:
-                    raise Exception("GCP session not initialized")
-                
-                tool_name = self._find_query_tool(self.gcp_tools)
-                result = await self.gcp_session.call_tool(
-                    tool_name,
-                    arguments={"query": route.query}
-                )
-            else:
-                if not self.aws_session:
-                    raise Exception("AWS session not initialized")
-                
-                tool_name = self._find_query_tool(self.aws_tools)
-                result = await self.aws_session.call_tool(
-                    tool_name,
-                    arguments={"query": route.query}
-                )
-            
+            states = route.scores.states if route.scores else ()
+            result = await self._call_query_tool(route.source, route.query, states)
+
             return {
                 "status": "success",
-                "source": route.source.value,
+                "source": route.source_name,
                 "data": result.content,
-                "confidence": route.confidence
+                "confidence": route.confidence,
             }
-            
+
         except Exception as e:
             return {
                 "status": "error",
-                "source": route.source.value,
+                "source": route.source_name,
                 "error": str(e),
-                "confidence": route.confidence
+                "confidence": route.confidence,
             }
-    
-    def _find_query_tool(self, tools: Dict) -> str:
+
+    def _find_query_tool(self, source: Source) -> str:
         """Find the appropriate query tool"""
-        query_tools = ['query', 'execute_query', 'run_query', 'sql_query']
-        
-        for tool_name in query_tools:
-            if tool_name in tools:
-                return tool_name
-        
-        if tools:
-            return list(tools.keys())[0]
-        
-        raise Exception("No query tools available")
-    
-    async def process_query(self, query: str) -> Dict[str, Any]:
-        """Main entry point: analyze and execute query"""
-        route = self.analyze_query(query)
-        
-        # Create fresh connection for each query
-        if route.source == DataSource.GCP_BIGQUERY:
-            async with stdio_client(self.gcp_params) as (read, write):
-                session = ClientSession(read, write)
-                await session.initialize()
-                tools_result = await session.list_tools()
-                tools = {tool.name: tool for tool in tools_result.tools}
-                
-                tool_name = self._find_query_tool(tools)
-                result = await session.call_tool(tool_name, arguments={"query": query})
-                
-                return {
-                    "status": "success",
-                    "source": route.source.value,
-                    "data": result.content,
-                    "confidence": route.confidence
-                }
+        tool_name = self.catalogs[source].query_tool
+        if tool_name is None:
+            raise Exception("No query tools available")
+        return tool_name
+
+    async def _refresh_catalog(self, source: Source) -> None:
+        """Fetch a source's tool listing, timing the list_tools round-trip"""
+        with self.metrics.timer("list_tools", source_name(source)):
+            await self.catalogs[source].refresh(self.pools[source])
+
+    async def _call_query_tool(
+        self,
+        source: Source,
+        query: str,
+        states: Sequence[str] = (),
+        deadline: Optional[float] = None,
+        raw: bool = False,
+    ) -> Any:
+        """
+        Run a query against a source using its cached tool catalog.
+
+        The upstream call waits for an admission slot and is bounded by the
+        source timeout and, when given, the request deadline (a
+        time.monotonic() value). Raises Overloaded if no slot is available
+        in time. A ``raw`` query is already in the source's language and is
+        sent as is.
+        """
+        name = source_name(source)
+        self.metrics.inc("queries", source=name)
+
+        # Per-state tax lookups are answered from the local table when loaded
+        if source == DataSource.AWS_S3_TABLES and self.tax_table is not None and not raw:
+            local = self.tax_table.lookup_result(query, states)
+            if local is not None:
+                self.metrics.inc("local_lookups", source=name)
+                return local
+
+        # Pushed-down SQL for recognized questions; anything else goes as written
+        upstream = query
+        translation = None
+        if self.translator is not None and not raw:
+            translation = self.translator.translate(name, query)
+            if translation is not None:
+                self.metrics.inc("pushdowns", source=name, intent=translation.intent)
+                logger.debug("Pushing down %r to %s as %s", query, name, translation.sql)
+                upstream = translation.sql
+
+        pool = self.pools.get(name)
+        if pool is None:
+            self.metrics.inc("errors", source=name, stage="connect")
+            raise ConnectionError(f"No MCP session pool for {name}; call connect() first")
+
+        try:
+            if self.catalogs[name].stale:
+                await self._refresh_catalog(source)
+        except Exception:
+            self.metrics.inc("errors", source=name, stage="list_tools")
+            raise
+
+        tool_name = self._find_query_tool(source)
+        loaded = False
+
+        async def load():
+            nonlocal loaded
+            loaded = True
+            if (
+                self.batcher is not None
+                and translation is not None
+                and translation.template is not None
+            ):
+                return await self._batched_lookup(source, pool, tool_name, translation, deadline)
+            return await self._call_upstream(source, pool, tool_name, upstream, deadline)
+
+        # Identical concurrent queries share one upstream call; questions
+        # translated to the same SQL share a cache entry
+        result = await self.result_cache.get_or_load(
+            (name, tool_name, normalize_query(upstream)), self.cache_ttls[name], load
+        )
+        self.metrics.inc("cache_requests", source=name, outcome="miss" if loaded else "hit")
+        return result
+
+    async def _call_upstream(
+        self, source: Source, pool: Any, tool_name: str, upstream: str, deadline: Optional[float]
+    ) -> Any:
+        """One upstream call through the source's breaker, admission slot and timeout"""
+        name = source_name(source)
+        try:
+            with self.breakers[name].attempt():
+                async with self.admission[name].slot(deadline):
+                    timeout = self.source_timeouts[name]
+                    if deadline is not None:
+                        timeout = min(timeout, deadline - time.monotonic())
+                    with self.metrics.timer("call_tool", name):
+                        result = await asyncio.wait_for(
+                            self._hedged_call(source, pool, tool_name, {"query": upstream}), timeout
+                        )
+                    if name not in self.first_answer_seconds and self.started_at is not None:
+                        self.first_answer_seconds[name] = time.monotonic() - self.started_at
+                        logger.info(
+                            "First answer from %s %.2fs after connect",
+                            name,
+                            self.first_answer_seconds[name],
+                        )
+                    return result
+        except Overloaded as e:
+            if isinstance(e, CircuitOpen):
+                reason = "circuit_open"
+            elif isinstance(e, DeadlineExceeded):
+                reason = "deadline"
+            else:
+                reason = "queue_full"
+            self.metrics.inc("rejected", source=name, reason=reason)
+            raise
+        except Exception:
+            self.metrics.inc("errors", source=name, stage="call_tool")
+            raise
+
+    async def _batched_lookup(
+        self,
+        source: Source,
+        pool: Any,
+        tool_name: str,
+        translation: Translation,
+        deadline: Optional[float],
+    ) -> Any:
+        """
+        A per-state lookup answered by a micro-batch.
+
+        Lookups of the same shape arriving within the batch window go
+        upstream as one query over all their states; each caller keeps the
+        rows for its own states.
+        """
+        name = source_name(source)
+        template = translation.template
+
+        async def call(states: List[str], batch_deadline: Optional[float]) -> Any:
+            self.metrics.inc("batch_calls", source=name)
+            sql = template.render(states, None, {})
+            logger.debug("Batched lookup to %s for %d states: %s", name, len(states), sql)
+            return await self._call_upstream(source, pool, tool_name, sql, batch_deadline)
+
+        self.metrics.inc("batched_queries", source=name)
+        result = await self.batcher.submit(
+            (name, tool_name, template.sql), translation.states, call, deadline
+        )
+        return split_rows(result, translation.state_column, translation.states)
+
+    def _hedge_delay(self, source: Source, pool: Any) -> Optional[float]:
+        """Seconds to wait before hedging a call, or None to not hedge"""
+        # The first attempt takes one idle session; the hedge needs another
+        if not self.hedge or getattr(pool, "idle", 0) < 2:
+            return None
+        histogram = self.metrics.histogram("call_tool", source_name(source))
+        # Too few samples for a meaningful tail estimate
+        if histogram.count < 20:
+            return None
+        return histogram.quantile(self.hedge_quantile)
+
+    async def _hedged_call(
+        self, source: Source, pool: Any, tool_name: str, arguments: Dict[str, Any]
+    ) -> Any:
+        """
+        Call a tool, hedging with a second attempt if the first is slow.
+
+        The first attempt to succeed wins and the other is cancelled (which
+        cancels it on the server). If one attempt fails the other is still
+        awaited; the call fails only if both do.
+        """
+        delay = self._hedge_delay(source, pool)
+        if delay is None:
+            return await pool.call_tool(tool_name, arguments=arguments)
+
+        first = asyncio.ensure_future(pool.call_tool(tool_name, arguments=arguments))
+        attempts = {first}
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if not done and getattr(pool, "idle", 0) > 0:
+                self.metrics.inc("hedges", source=source_name(source))
+                hedge = asyncio.ensure_future(pool.call_tool(tool_name, arguments=arguments))
+                attempts.add(hedge)
+
+            error: Optional[BaseException] = None
+            while attempts:
+                done, attempts = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.metrics.inc("hedge_wins", source=source_name(source))
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in attempts:
+                task.cancel()
+
+    def _deadline(self, timeout: Optional[float]) -> float:
+        """Absolute time.monotonic() deadline for a request"""
+        return time.monotonic() + (self.request_timeout if timeout is None else timeout)
+
+    async def _call_with_deadline(
+        self, source: Source, query: str, states: Sequence[str], deadline: float, raw: bool = False
+    ) -> Any:
+        """_call_query_tool cancelled (upstream call included) once the deadline passes"""
+        # The grace lets the source-level timeout fire first, so a hung source
+        # is recorded as a failure by its circuit breaker
+        return await asyncio.wait_for(
+            self._call_query_tool(source, query, states, deadline, raw),
+            max(0.0, deadline - time.monotonic()) + self.DEADLINE_GRACE,
+        )
+
+    def _cache_samples(self):
+        """Result cache statistics reported at scrape time"""
+        stats = self.result_cache.stats()
+        yield (
+            "orchestrator_result_cache_entries",
+            "gauge",
+            "Entries in the result cache.",
+            {},
+            stats["entries"],
+        )
+        yield (
+            "orchestrator_result_cache_bytes",
+            "gauge",
+            "Estimated bytes held by the result cache.",
+            {},
+            stats["bytes"],
+        )
+        yield (
+            "orchestrator_result_cache_evictions_total",
+            "counter",
+            "Entries evicted to stay under the memory bound.",
+            {},
+            stats["evictions"],
+        )
+        yield (
+            "orchestrator_result_cache_coalesced_total",
+            "counter",
+            "Requests that joined an identical in-flight upstream call.",
+            {},
+            stats["coalesced"],
+        )
+        disk = self.result_cache.disk
+        if disk is not None:
+            for outcome, value in disk.stats().items():
+                yield (
+                    "orchestrator_disk_cache_total",
+                    "counter",
+                    "Disk result cache reads (hits/misses), writes, evictions and errors.",
+                    {"outcome": outcome},
+                    value,
+                )
+
+    def _pushdown_samples(self):
+        """SQL template cache statistics reported at scrape time"""
+        if self.translator is None:
+            return
+        stats = self.translator.stats()
+        yield (
+            "orchestrator_sql_templates",
+            "gauge",
+            "Query fingerprints with a cached translation (or none).",
+            {},
+            stats["templates"],
+        )
+        yield (
+            "orchestrator_sql_template_hits_total",
+            "counter",
+            "Translations served from the fingerprint cache.",
+            {},
+            stats["hits"],
+        )
+
+    def _route_cache_samples(self):
+        """Routing decision memo statistics reported at scrape time"""
+        if self.route_cache is None:
+            return
+        stats = self.route_cache.stats()
+        yield (
+            "orchestrator_route_cache_entries",
+            "gauge",
+            "Routing decisions held in the memo.",
+            {},
+            stats["entries"],
+        )
+        yield (
+            "orchestrator_route_cache_hits_total",
+            "counter",
+            "Queries routed from the memo without scoring.",
+            {},
+            stats["hits"],
+        )
+        yield (
+            "orchestrator_route_cache_misses_total",
+            "counter",
+            "Queries that had to be scored.",
+            {},
+            stats["misses"],
+        )
+
+    def _feedback_samples(self):
+        """Routing feedback statistics reported at scrape time"""
+        if self.feedback is None:
+            return
+        yield (
+            "orchestrator_route_feedback_fingerprints",
+            "gauge",
+            "Query fingerprints with recorded source outcomes.",
+            {},
+            len(self.feedback),
+        )
+
+    def _breaker_samples(self):
+        """Circuit breaker state per source: 0 closed, 1 half-open, 2 open"""
+        levels = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+        for name, breaker in self.breakers.items():
+            yield (
+                "orchestrator_circuit_state",
+                "gauge",
+                "Circuit breaker state (0 closed, 1 half-open, 2 open).",
+                {"source": name},
+                levels[breaker.state],
+            )
+
+    def _replica_samples(self):
+        """Load, latency and ejection state per replica of replicated sources"""
+        replicas = [
+            ({"source": name, "replica": replica.name}, replica)
+            for name, pool in self.pools.items()
+            if isinstance(pool, ReplicaPool)
+            for replica in pool.replicas
+        ]
+        for labels, replica in replicas:
+            yield (
+                "orchestrator_replica_outstanding",
+                "gauge",
+                "Calls in flight on a replica.",
+                labels,
+                replica.outstanding,
+            )
+        for labels, replica in replicas:
+            yield (
+                "orchestrator_replica_latency_seconds",
+                "gauge",
+                "Smoothed call latency of a replica.",
+                labels,
+                replica.latency or 0.0,
+            )
+        for labels, replica in replicas:
+            yield (
+                "orchestrator_replica_ejected",
+                "gauge",
+                "Whether a replica is ejected from rotation (1) or not (0).",
+                labels,
+                int(replica.ejected),
+            )
+
+    def _readiness_samples(self):
+        """Warm/spare sessions and cold start timings reported at scrape time"""
+        self._check_warm()
+        yield (
+            "orchestrator_ready",
+            "gauge",
+            "Whether every source has a warm session (1) or not (0).",
+            {},
+            int(self.ready),
+        )
+        for name, pool in self.pools.items():
+            yield (
+                "orchestrator_warm_sessions",
+                "gauge",
+                "Live sessions in a source's pools.",
+                {"source": name},
+                pool.warm,
+            )
+        for name, pool in self.pools.items():
+            yield (
+                "orchestrator_spare_sessions",
+                "gauge",
+                "Initialized standby sessions of a source.",
+                {"source": name},
+                getattr(pool, "spare", 0),
+            )
+        if self.warm_seconds is not None:
+            yield (
+                "orchestrator_cold_start_seconds",
+                "gauge",
+                "Seconds from connect() to warm, and to each source's first answer.",
+                {"stage": "warm"},
+                self.warm_seconds,
+            )
+        for name, seconds in self.first_answer_seconds.items():
+            yield (
+                "orchestrator_cold_start_seconds",
+                "gauge",
+                "Seconds from connect() to warm, and to each source's first answer.",
+                {"stage": "first_answer", "source": name},
+                seconds,
+            )
+
+    def _admission_samples(self):
+        """Admission queue state per source, reported at scrape time"""
+        # One family at a time: the exposition format wants each family's samples together
+        for name, controller in self.admission.items():
+            yield (
+                "orchestrator_admission_active",
+                "gauge",
+                "Upstream calls holding an admission slot.",
+                {"source": name},
+                controller.active,
+            )
+        for name, controller in self.admission.items():
+            yield (
+                "orchestrator_admission_waiting",
+                "gauge",
+                "Queries waiting for an admission slot.",
+                {"source": name},
+                controller.waiting,
+            )
+
+    async def process_query(
+        self,
+        query: str,
+        timeout: Optional[float] = None,
+        columnar: bool = False,
+        route: Optional[QueryRoute] = None,
+    ) -> Dict[str, Any]:
+        """
+        Main entry point: analyze and execute query.
+
+        The whole request is bounded by ``timeout`` seconds (default
+        ``request_timeout``); on expiry the upstream call is cancelled and
+        asyncio.TimeoutError is raised. Raises Overloaded (QueueFull or
+        DeadlineExceeded) when the source is saturated. With ``columnar``
+        tabular results are returned as a ColumnarResult. A ``route`` from
+        analyze_query is used instead of routing the query again. A tool
+        error from the server gives status "error" with its message.
+        """
+        route = route or self.analyze_query(query)
+        deadline = self._deadline(timeout)
+        candidates = self._speculation_candidates(route)
+        reason = route.reason
+        if len(candidates) > 1:
+            source, result = await self._speculate(route, candidates, deadline)
+            reason += (
+                f"; also tried {', '.join(source_name(other) for other in candidates[1:])} "
+                f"at once, answered by {source_name(source)}"
+            )
+        else:
+            source, result = route.source, await self._observed_call(route, route.source, deadline)
+
+        if getattr(result, "isError", False):
+            return {
+                "status": "error",
+                "source": source_name(source),
+                "data": [],
+                "error": error_text(result.content),
+                "confidence": route.confidence,
+                "reason": reason,
+            }
+        return {
+            "status": "success",
+            "source": source_name(source),
+            "data": self._result_data(result.content, columnar),
+            "confidence": route.confidence,
+            "reason": reason,
+        }
+
+    async def _observed_call(self, route: QueryRoute, source: Source, deadline: float) -> Any:
+        """_call_with_deadline, recording the outcome as routing feedback"""
+        states = route.scores.states if route.scores else ()
+        started = time.monotonic()
+        try:
+            result = await self._call_with_deadline(source, route.query, states, deadline)
+        except Overloaded:
+            # Says nothing about whether the source could answer
+            raise
+        except Exception:
+            self._record_outcome(route.query, source, "error", time.monotonic() - started)
+            raise
+        self._record_outcome(route.query, source, outcome_of(result), time.monotonic() - started)
+        return result
+
+    def _speculation_candidates(self, route: QueryRoute) -> List[Source]:
+        """The routed source, plus the likeliest alternative below speculate_below confidence"""
+        if route.confidence >= self.speculate_below or route.is_multi_source:
+            return [route.source]
+        scores = route.scores.scores if route.scores else {}
+        others = sorted(
+            (
+                name
+                for name in self.sources.names
+                if name != route.source_name and name in self.pools
+            ),
+            key=lambda name: -scores.get(name, 0),
+        )
+        if self.feedback is not None:
+            others = self.feedback.rank(self._fingerprint(route.query), others)
+        others = others[: self.SPECULATIVE_FANOUT - 1]
+        return [route.source] + [self._source_ids[name] for name in others]
+
+    async def _speculate(
+        self, route: QueryRoute, candidates: List[Source], deadline: float
+    ) -> Tuple[Source, Any]:
+        """
+        Query several sources at once and keep the first answer with data.
+
+        The other calls are cancelled as soon as one source answers with
+        data; a tool error never wins. If none does, the routed source's
+        (empty) answer is returned, or another source's, preferring answers
+        that are not tool errors; if every call failed, the routed source's
+        error is raised.
+        """
+        tasks = {
+            asyncio.ensure_future(self._observed_call(route, source, deadline)): source
+            for source in candidates
+        }
+        pending = set(tasks)
+        answers: Dict[Source, Any] = {}
+        failures: Dict[Source, BaseException] = {}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda task: candidates.index(tasks[task])):
+                    source = tasks[task]
+                    if task.exception() is not None:
+                        failures[source] = task.exception()
+                        continue
+                    result = task.result()
+                    if outcome_of(result) == "data":
+                        self.metrics.inc("speculative_wins", source=source_name(source))
+                        return source, result
+                    answers[source] = result
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if answers:
+            source = min(
+                answers,
+                key=lambda source: (bool(answers[source].isError), candidates.index(source)),
+            )
+            return source, answers[source]
+        raise failures.get(route.source) or next(iter(failures.values()))
+
+    @staticmethod
+    def _result_data(content: List[Any], columnar: bool) -> Any:
+        """Tool result content, or its rows as a ColumnarResult when asked for and tabular"""
+        if not columnar:
+            return content
+        table = ColumnarResult.from_content(content)
+        return content if table is None else table
+
+    async def process_multi_source(
+        self,
+        query: str,
+        route: Optional[QueryRoute] = None,
+        timeout: Optional[float] = None,
+        columnar: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Run a query against every target source concurrently.
+
+        Latency is that of the slowest source rather than the sum. Each
+        source has its own timeout, and a failing source yields a partial
+        result instead of failing the whole query. If every source was
+        rejected by admission control, the Overloaded error is raised.
+        """
+        route = route or self.analyze_query(query)
+        targets = route.targets or [route.source]
+        states = route.scores.states if route.scores else ()
+        deadline = self._deadline(timeout)
+
+        outcomes = await asyncio.gather(
+            *(self._call_with_deadline(source, query, states, deadline) for source in targets),
+            return_exceptions=True,
+        )
+        if all(isinstance(outcome, Overloaded) for outcome in outcomes):
+            raise max(outcomes, key=lambda e: e.retry_after)
+
+        data: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        request_limit = self.request_timeout if timeout is None else timeout
+        for source, outcome in zip(targets, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                limit = min(self.source_timeouts[source], request_limit)
+                errors[source_name(source)] = f"Timed out after {limit}s"
+            elif isinstance(outcome, BaseException):
+                errors[source_name(source)] = str(outcome) or type(outcome).__name__
+            else:
+                data[source_name(source)] = self._result_data(outcome.content, columnar)
+
+        if not errors:
+            status = "success"
+        elif data:
+            status = "partial"
         else:
-            async with stdio_client(self.aws_params) as (read, write):
-                session = ClientSession(read, write)
-                await session.initialize()
-                tools_result = await session.list_tools()
-                tools = {tool.name: tool for tool in tools_result.tools}
-                
-                tool_name = self._find_query_tool(tools)
-                result = await session.call_tool(tool_name, arguments={"query": query})
-                
-                return {
-                    "status": "success",
-                    "source": route.source.value,
-                    "data": result.content,
-                    "confidence": route.confidence
-                }
+            status = "error"
+
+        return {
+            "status": status,
+            "source": "multi_source",
+            "sources": [source_name(source) for source in targets],
+            "data": data,
+            "errors": errors,
+            "confidence": route.confidence,
+        }
+
+    def plan_join(self, route: QueryRoute) -> Optional[JoinPlan]:
+        """The join plan for a question needing both EV and tax data, or None"""
+        ev = self.sources.get(DataSource.GCP_BIGQUERY)
+        tax = self.sources.get(DataSource.AWS_S3_TABLES)
+        if ev is None or tax is None or ev.schema is None or tax.schema is None:
+            return None
+        if not (ev.schema.table and tax.schema.table):
+            return None
+        targets = {source_name(source) for source in route.targets}
+        if not route.is_multi_source or targets != {ev.name, tax.name}:
+            return None
+        states = route.scores.states if route.scores else ()
+        return plan_join(
+            route.query, states, ev.name, ev.schema, tax.name, tax.schema, self.router.normalize
+        )
+
+    async def process_join(
+        self, query: str, route: Optional[QueryRoute] = None, timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Answer an EV x tax question with one row per state.
+
+        Both sides are fetched concurrently with the plan's filters pushed
+        down (the tax side comes from the local table when it is loaded),
+        then EV rows are hash-joined onto the tax rates by state and
+        aggregated column batch by column batch in a worker thread, so EV
+        result sets of millions of rows need no per-row objects. If either
+        side fails, or answers with a tool error, there is nothing to join
+        and the status is "error".
+        """
+        route = route or self.analyze_query(query)
+        plan = self.plan_join(route)
+        if plan is None:
+            raise ValueError("Query does not need both EV and tax data")
+        deadline = self._deadline(timeout)
+
+        async def tax_rows() -> List[Dict[str, Any]]:
+            if self.tax_table is not None and self.tax_table.fresh:
+                records = self.tax_table.by_state
+                codes = plan.states or list(records)
+                return [records[code]._asdict() for code in codes if code in records]
+            result = await self._call_with_deadline(
+                plan.tax_source, plan.tax_sql, (), deadline, raw=True
+            )
+            if result.isError:
+                raise RuntimeError(error_text(result.content))
+            return rows_from_content(result.content)
+
+        ev_outcome, tax_outcome = await asyncio.gather(
+            self._call_with_deadline(plan.ev_source, plan.ev_sql, (), deadline, raw=True),
+            tax_rows(),
+            return_exceptions=True,
+        )
+        outcomes = {plan.ev_source: ev_outcome, plan.tax_source: tax_outcome}
+        if all(isinstance(outcome, Overloaded) for outcome in outcomes.values()):
+            raise max(outcomes.values(), key=lambda e: e.retry_after)
+        errors: Dict[str, str] = {}
+        for name, outcome in outcomes.items():
+            if isinstance(outcome, asyncio.TimeoutError):
+                budget = self.request_timeout if timeout is None else timeout
+                limit = min(self.source_timeouts[name], budget)
+                errors[name] = f"Timed out after {limit}s"
+            elif isinstance(outcome, BaseException):
+                errors[name] = str(outcome) or type(outcome).__name__
+            elif getattr(outcome, "isError", False):
+                errors[name] = error_text(outcome.content)
+
+        response: Dict[str, Any] = {
+            "source": "joined",
+            "sources": [plan.ev_source, plan.tax_source],
+            "joined_on": "state",
+            "confidence": route.confidence,
+        }
+        if errors:
+            return {**response, "status": "error", "data": [], "errors": errors}
+
+        join = StateTaxJoin(tax_outcome)
+        with self.metrics.timer("join", plan.ev_source):
+            await asyncio.get_running_loop().run_in_executor(
+                None, join.add_content, ev_outcome.content, plan.ev_columns
+            )
+        self.metrics.inc("joins", source=plan.ev_source)
+        return {
+            **response,
+            "status": "success",
+            "data": join.results(),
+            "rows": join.rows,
+            "unmatched": join.unmatched,
+            "errors": {},
+        }
+
+    async def stream_query(
+        self,
+        query: str,
+        chunk_size: int = 500,
+        timeout: Optional[float] = None,
+        columnar: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analyze and execute a query, yielding results as events.
+
+        Yields a ``route`` event first, then ``rows`` events of at most
+        chunk_size rows per source as each source answers (``content`` for
+        non-tabular blocks, ``error`` for failed sources), then ``end``.
+        JSON row arrays are decoded one element at a time, so the result is
+        never materialized as a full list of dicts. With ``columnar`` each
+        chunk is sent as a ``columns`` event holding ColumnarResult.to_json().
+        """
+        route = self.analyze_query(query)
+        targets = route.targets or [route.source]
+        states = route.scores.states if route.scores else ()
+
+        yield {
+            "type": "route",
+            "query": query,
+            "source": "multi_source" if route.is_multi_source else route.source_name,
+            "sources": [source_name(source) for source in targets],
+            "confidence": route.confidence,
+            "reason": route.reason,
+        }
+
+        deadline = self._deadline(timeout)
+        tasks = {
+            asyncio.ensure_future(self._call_with_deadline(source, query, states, deadline)): source
+            for source in targets
+        }
+        pending = set(tasks)
+        total_rows = 0
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    source = tasks[task]
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        error = str(e) or type(e).__name__
+                        yield {"type": "error", "source": source_name(source), "error": error}
+                        continue
+                    for event in self._content_events(source, result.content, chunk_size):
+                        if "rows" in event:
+                            total_rows += len(event["rows"])
+                            if columnar and all(isinstance(row, dict) for row in event["rows"]):
+                                event = {
+                                    "type": "columns",
+                                    "source": event["source"],
+                                    "data": ColumnarResult.from_rows(event["rows"]).to_json(),
+                                }
+                        yield event
+        finally:
+            # The client went away or a consumer stopped early
+            for task in pending:
+                task.cancel()
+
+        yield {"type": "end", "rows": total_rows}
+
+    @staticmethod
+    def _content_events(
+        source: Source, content: List[Any], chunk_size: int
+    ) -> Iterator[Dict[str, Any]]:
+        """Split tool result content into row chunks and other content blocks"""
+        name = source_name(source)
+        for item in content:
+            text = getattr(item, "text", None)
+            if text is not None and is_json_array(text):
+                chunk: List[Any] = []
+                try:
+                    for row in iter_json_rows(text):
+                        chunk.append(row)
+                        if len(chunk) >= chunk_size:
+                            yield {"type": "rows", "source": name, "rows": chunk}
+                            chunk = []
+                except ValueError as e:
+                    yield {"type": "error", "source": name, "error": f"Malformed rows: {e}"}
+                if chunk:
+                    yield {"type": "rows", "source": name, "rows": chunk}
+            else:
+                yield {"type": "content", "source": name, "content": item.model_dump()}
@@ -0,0 +1,245 @@
+"""Load balancing across replicas of one MCP server"""
+
+import asyncio
+import logging
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cancelled call may fall short of call_timeout and still count as timed out
+_TIMER_SLACK = 0.005
+
+
+class Replica:
+    """One replica's session pool plus the load and latency seen through it"""
+
+    def __init__(self, name: str, pool: Any):
+        self.name = name
+        self.pool = pool
+        self.outstanding = 0
+        # Exponentially weighted mean call latency; None until the first call
+        self.latency: Optional[float] = None
+        self.samples = 0
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+
+    @property
+    def ejected(self) -> bool:
+        return self.ejected_until > time.monotonic()
+
+    def observe(self, seconds: float) -> None:
+        self.samples += 1
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += 0.2 * (seconds - self.latency)
+
+    def stats(self) -> Dict[str, object]:
+        """Counters for monitoring"""
+        return {
+            "outstanding": self.outstanding,
+            "latency": self.latency,
+            "samples": self.samples,
+            "ejected": self.ejected,
+            "ejections": self.ejections,
+        }
+
+
+class ReplicaPool:
+    """
+    Spreads calls for one data source over several replicas of its server.
+
+    Each replica has its own SessionPool (its own subprocesses, service
+    account or region). ``least_outstanding`` sends a call to the replica
+    with the fewest calls in flight; ``ewma`` picks the lowest smoothed
+    latency weighted by in-flight calls, so a slow replica gets
+    proportionally less traffic. Ties rotate so idle replicas share load.
+
+    Outlier ejection: a replica whose smoothed latency exceeds
+    ``eject_factor`` times the median of the others (after ``min_samples``
+    calls), or that fails ``max_failures`` times in a row, is taken out of
+    rotation for ``eject_time`` seconds and then rejoins with its
+    statistics reset. The last replica in rotation is never ejected.
+    A call cancelled by its caller still counts its elapsed time as
+    latency, and once it ran for ``call_timeout`` seconds it also counts
+    as a failure, so a replica that hangs is ejected like one that errors.
+    Like SessionPool it exposes ``call_tool``/``list_tools``.
+    """
+
+    STRATEGIES = ("least_outstanding", "ewma")
+
+    def __init__(
+        self,
+        replicas: Sequence[Tuple[str, Any]],
+        strategy: str = "least_outstanding",
+        eject_factor: float = 3.0,
+        eject_time: float = 30.0,
+        min_samples: int = 10,
+        max_failures: int = 5,
+        call_timeout: Optional[float] = None,
+        metrics: Optional[Metrics] = None,
+        name: str = "",
+    ):
+        if not replicas:
+            raise ValueError("A replica pool needs at least one replica")
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown balancing strategy {strategy!r}")
+        self.replicas = [Replica(replica_name, pool) for replica_name, pool in replicas]
+        self.strategy = strategy
+        self.eject_factor = eject_factor
+        self.eject_time = eject_time
+        self.min_samples = min_samples
+        self.max_failures = max_failures
+        self.call_timeout = call_timeout
+        self.metrics = metrics
+        self.name = name
+        self._next = 0
+
+    @property
+    def size(self) -> int:
+        return sum(replica.pool.size for replica in self.replicas)
+
+    @property
+    def warm(self) -> int:
+        return sum(replica.pool.warm for replica in self.replicas)
+
+    @property
+    def spare(self) -> int:
+        return sum(getattr(replica.pool, "spare", 0) for replica in self.replicas)
+
+    @property
+    def idle(self) -> int:
+        """Idle sessions on replicas in rotation"""
+        return sum(getattr(replica.pool, "idle", 0) for replica in self.in_rotation())
+
+    def in_rotation(self) -> List[Replica]:
+        """Replicas not currently ejected, reinstating any whose ejection expired"""
+        now = time.monotonic()
+        active = []
+        for replica in self.replicas:
+            if replica.ejected_until and replica.ejected_until <= now:
+                self._reinstate(replica)
+            if not replica.ejected_until:
+                active.append(replica)
+        # Never leave the source without a replica
+        return active or list(self.replicas)
+
+    def _reinstate(self, replica: Replica) -> None:
+        logger.info("Replica %s of %s back in rotation", replica.name, self.name)
+        replica.ejected_until = 0.0
+        replica.failures = 0
+        replica.latency = None
+        replica.samples = 0
+
+    def _cost(self, replica: Replica) -> float:
+        if self.strategy == "ewma":
+            # Unmeasured replicas cost nothing so they get tried first
+            return (replica.latency or 0.0) * (replica.outstanding + 1)
+        return replica.outstanding
+
+    def choose(self) -> Replica:
+        """The replica the next call should go to"""
+        candidates = self.in_rotation()
+        start = self._next % len(candidates)
+        self._next += 1
+        rotated = candidates[start:] + candidates[:start]
+        return min(rotated, key=self._cost)
+
+    def _eject(self, replica: Replica, reason: str) -> None:
+        if len(self.in_rotation()) <= 1:
+            return
+        replica.ejected_until = time.monotonic() + self.eject_time
+        replica.ejections += 1
+        logger.warning(
+            "Ejecting replica %s of %s for %.0fs: %s",
+            replica.name,
+            self.name,
+            self.eject_time,
+            reason,
+        )
+        if self.metrics is not None:
+            self.metrics.inc(
+                "replica_ejections", source=self.name, replica=replica.name, reason=reason
+            )
+
+    def _check_latency(self, replica: Replica) -> None:
+        if replica.samples < self.min_samples or replica.ejected_until:
+            return
+        others = [
+            other.latency
+            for other in self.in_rotation()
+            if other is not replica
+            and other.latency is not None
+            and other.samples >= self.min_samples
+        ]
+        if others and replica.latency > self.eject_factor * statistics.median(others):
+            self._eject(replica, "slow")
+
+    def _record_failure(self, replica: Replica) -> None:
+        replica.failures += 1
+        if replica.failures >= self.max_failures and not replica.ejected_until:
+            self._eject(replica, "errors")
+
+    def _record_cancelled(self, replica: Replica, elapsed: float) -> None:
+        replica.observe(elapsed)
+        # Timer granularity can fire the caller's timeout a little early
+        if self.call_timeout is not None and elapsed >= self.call_timeout - _TIMER_SLACK:
+            self._record_failure(replica)
+        self._check_latency(replica)
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+        """Call a tool on the chosen replica, updating its load and latency"""
+        replica = self.choose()
+        replica.outstanding += 1
+        start = time.perf_counter()
+        try:
+            result = await replica.pool.call_tool(name, arguments=arguments)
+        except asyncio.CancelledError:
+            # Typically the caller's timeout: without this a hung replica
+            # would never collect a sample or a failure
+            self._record_cancelled(replica, time.perf_counter() - start)
+            raise
+        except Exception:
+            self._record_failure(replica)
+            raise
+        finally:
+            replica.outstanding -= 1
+        replica.failures = 0
+        replica.observe(time.perf_counter() - start)
+        self._check_latency(replica)
+        return result
+
+    async def list_tools(self) -> Any:
+        """List tools on the chosen replica"""
+        return await self.choose().pool.list_tools()
+
+    async def start(self) -> int:
+        """Warm every replica's pool; returns the total warm sessions"""
+        results = await asyncio.gather(
+            *(replica.pool.start() for replica in self.replicas), return_exceptions=True
+        )
+        for replica, result in zip(self.replicas, results):
+            if isinstance(result, Exception):
+                logger.warning(
+                    "Replica %s of %s failed to start: %s", replica.name, self.name, result
+                )
+        return self.warm
+
+    async def health_check(self) -> int:
+        """Health-check every replica's pool; returns the total warm sessions"""
+        await asyncio.gather(*(replica.pool.health_check() for replica in self.replicas))
+        return self.warm
+
+    async def close(self) -> None:
+        await asyncio.gather(
+            *(replica.pool.close() for replica in self.replicas), return_exceptions=True
+        )
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        """Per-replica counters for monitoring"""
+        return {replica.name: replica.stats() for replica in self.replicas}
@@ -0,0 +1,157 @@
+"""Micro-batching of compatible per-state lookups"""
+
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Set
+
+from mcp import types
+
+from .content import column_key, rows_from_content
+
+# Runs one combined lookup: (states, deadline) -> tool result
+BatchCall = Callable[[List[str], Optional[float]], Awaitable[Any]]
+
+
+class _Batch:
+    """Lookups collected for one combined call"""
+
+    __slots__ = ("call", "states", "deadlines", "waiters", "future", "handle")
+
+    def __init__(self, call: BatchCall):
+        self.call = call
+        # Insertion-ordered set of the states asked for
+        self.states: Dict[str, None] = {}
+        self.deadlines: List[Optional[float]] = []
+        self.waiters = 0
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def deadline(self) -> Optional[float]:
+        """The latest waiter deadline, so the call is not cut short for anyone"""
+        if any(deadline is None for deadline in self.deadlines):
+            return None
+        return max(self.deadlines)
+
+
+class MicroBatcher:
+    """
+    Coalesces per-state lookups to the same source into one upstream call.
+
+    Lookups with the same batch key (the same SQL template, differing only
+    in their states) that arrive within ``window`` seconds of the first are
+    sent as a single query over the union of their states; a batch is sent
+    early once it covers ``max_states`` states. Every waiter gets the
+    combined result and keeps its own rows with split_rows().
+
+    A waiter that gives up (cancellation or its deadline) does not cancel
+    the combined call, which the other waiters still need.
+    """
+
+    def __init__(self, window: float, max_states: int = 50):
+        self.window = window
+        self.max_states = max_states
+        self._pending: Dict[Hashable, _Batch] = {}
+        # Combined calls in flight, kept referenced until they finish
+        self._tasks: Set[asyncio.Task] = set()
+        self.calls = 0
+        self.queries = 0
+
+    async def submit(
+        self,
+        key: Hashable,
+        states: Sequence[str],
+        call: BatchCall,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """Join (or start) the pending batch for ``key`` and wait for its result"""
+        batch = self._pending.get(key)
+        if batch is not None and len(batch.states.keys() | set(states)) > self.max_states:
+            self._flush(key, batch)
+            batch = None
+        if batch is None:
+            batch = self._pending[key] = _Batch(call)
+            batch.handle = asyncio.get_running_loop().call_later(
+                self.window, self._flush, key, batch
+            )
+        for state in states:
+            batch.states[state] = None
+        batch.deadlines.append(deadline)
+        batch.waiters += 1
+        self.queries += 1
+        if len(batch.states) >= self.max_states:
+            self._flush(key, batch)
+
+        waiter = asyncio.shield(batch.future)
+        if deadline is None:
+            return await waiter
+        return await asyncio.wait_for(waiter, max(0.0, deadline - time.monotonic()))
+
+    def _flush(self, key: Hashable, batch: _Batch) -> None:
+        """Send a batch: no more lookups join it from here on"""
+        if self._pending.get(key) is batch:
+            del self._pending[key]
+        if batch.handle is not None:
+            batch.handle.cancel()
+            batch.handle = None
+            self.calls += 1
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: _Batch) -> None:
+        try:
+            result = await batch.call(list(batch.states), batch.deadline)
+        except asyncio.CancelledError:
+            batch.future.cancel()
+            raise
+        except Exception as e:
+            batch.future.set_exception(e)
+            # Retrieved here so an error nobody waits for any more is not logged
+            batch.future.exception()
+        else:
+            batch.future.set_result(result)
+
+    async def close(self) -> None:
+        """Cancel batches not yet sent and combined calls in flight, and wait for them"""
+        pending, self._pending = self._pending, {}
+        for batch in pending.values():
+            if batch.handle is not None:
+                batch.handle.cancel()
+                batch.handle = None
+            batch.future.cancel()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {"queries": self.queries, "calls": self.calls, "pending": len(self._pending)}
+
+
+def split_rows(result: Any, column: str, states: Sequence[str]) -> Any:
+    """
+    The part of a combined lookup result for the given states.
+
+    Rows whose ``column`` (matched loosely, see column_key) is one of
+    ``states`` are kept, shaped like the server's answer. Errors and
+    results without rows are returned unchanged.
+    """
+    if getattr(result, "isError", False):
+        return result
+    rows = rows_from_content(getattr(result, "content", None) or [])
+    if not rows:
+        return result
+    wanted = {state.upper() for state in states}
+    key = column_key(column)
+    kept = []
+    for row in rows:
+        value = row.get(column)
+        if value is None:
+            value = next(
+                (value for name, value in row.items() if column_key(str(name)) == key), None
+            )
+        if value is not None and str(value).upper() in wanted:
+            kept.append(row)
+    return types.CallToolResult(content=[types.TextContent(type="text", text=json.dumps(kept))])
@@ -0,0 +1,114 @@
+"""Per-source circuit breaker"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from enum import Enum
+from typing import Dict, Iterator
+
+from .admission import Overloaded
+
+
+class CircuitState(Enum):
+    """Circuit breaker states"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Overloaded):
+    """The source failed repeatedly and is not being called"""
+
+
+class CircuitBreaker:
+    """
+    Stops calling a data source that keeps failing.
+
+    After ``failure_threshold`` consecutive failures (errors or timeouts)
+    the circuit opens and calls fail immediately with CircuitOpen. Once
+    ``reset_timeout`` seconds have passed it goes half-open and lets up to
+    ``half_open_max`` probe calls through: a successful probe closes the
+    circuit, a failed one opens it again for another reset_timeout.
+    Rejections by admission control and cancellations are not failures.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max: int = 1,
+        name: str = "",
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max = half_open_max
+        self.name = name
+
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        self.trips = 0
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a probe through"""
+        if self.state != CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def before_call(self) -> None:
+        """Admit a call or raise CircuitOpen"""
+        if self.state == CircuitState.OPEN:
+            if self.retry_after > 0:
+                raise CircuitOpen(
+                    f"Circuit open for {self.name} after repeated failures", self.retry_after
+                )
+            self.state = CircuitState.HALF_OPEN
+            self.probes = 0
+        if self.state == CircuitState.HALF_OPEN:
+            if self.probes >= self.half_open_max:
+                raise CircuitOpen(f"Circuit half-open for {self.name}; probe in progress", 1.0)
+            self.probes += 1
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.probes = 0
+        self.state = CircuitState.CLOSED
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != CircuitState.OPEN:
+                self.trips += 1
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+            self.probes = 0
+
+    def _release_probe(self) -> None:
+        if self.state == CircuitState.HALF_OPEN and self.probes:
+            self.probes -= 1
+
+    @contextmanager
+    def attempt(self) -> Iterator[None]:
+        """Guard one call, recording its outcome"""
+        self.before_call()
+        try:
+            yield
+        except (Overloaded, asyncio.CancelledError):
+            self._release_probe()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+
+    def stats(self) -> Dict[str, object]:
+        """Counters for monitoring"""
+        return {
+            "state": self.state.value,
+            "failures": self.failures,
+            "trips": self.trips,
+            "retry_after": self.retry_after,
+        }
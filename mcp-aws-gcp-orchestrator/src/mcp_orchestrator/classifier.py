@@ -0,0 +1,204 @@
+"""Learned query routing classifier"""
+
+import argparse
+import json
+import re
+import zlib
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("The routing classifier requires NumPy (pip install numpy)")
+
+
+class HashedNgramClassifier:
+    """
+    Linear softmax model over hashed word n-grams.
+
+    A query's lowercased word unigrams and bigrams are hashed (CRC32, so
+    stable across processes) into ``n_features`` buckets; each class has a
+    weight per bucket plus a bias. The whole model is one float32 array of
+    ``n_features x classes`` and is stored as a compressed .npz file.
+    Classes are source names. Training runs offline with ``fit`` (or the
+    ``python -m mcp_orchestrator.classifier train`` command) on labeled
+    query logs; inference is a row gather and sum, a few microseconds per
+    query, and ``predict_batch`` scores many queries in one pass.
+    """
+
+    def __init__(self, classes: Sequence[str], n_features: int = 1 << 16):
+        _require_numpy()
+        if len(classes) < 2:
+            raise ValueError("A routing classifier needs at least two classes")
+        self.classes = list(classes)
+        self.n_features = n_features
+        self.weights = np.zeros((n_features, len(self.classes)), dtype=np.float32)
+        self.bias = np.zeros(len(self.classes), dtype=np.float32)
+
+    def features(self, query: str) -> List[int]:
+        """Hashed bucket of every unigram and bigram, never empty"""
+        words = _WORD.findall(query.lower())
+        grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        if not grams:
+            grams = ["<empty>"]
+        n = self.n_features
+        return [zlib.crc32(gram.encode()) % n for gram in grams]
+
+    def _pack(self, rows: Sequence[List[int]]) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        lengths = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+        indices = np.fromiter(
+            (i for row in rows for i in row), dtype=np.int64, count=int(lengths.sum())
+        )
+        offsets = np.zeros(len(rows), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=offsets[1:])
+        return indices, offsets, lengths
+
+    def _logits(self, indices: "np.ndarray", offsets: "np.ndarray") -> "np.ndarray":
+        # Every row has at least one feature, so reduceat never sees an empty segment
+        return np.add.reduceat(self.weights[indices], offsets, axis=0) + self.bias
+
+    @staticmethod
+    def _softmax(logits: "np.ndarray") -> "np.ndarray":
+        shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        return shifted / shifted.sum(axis=-1, keepdims=True)
+
+    def predict_proba(self, query: str) -> "np.ndarray":
+        """Class probabilities for one query"""
+        logits = self.weights[self.features(query)].sum(axis=0) + self.bias
+        return self._softmax(logits)
+
+    def predict(self, query: str) -> Tuple[str, float]:
+        """(most likely class, its probability) for one query"""
+        probs = self.predict_proba(query)
+        best = int(probs.argmax())
+        return self.classes[best], float(probs[best])
+
+    def predict_batch(self, queries: Sequence[str]) -> List[Tuple[str, float]]:
+        """predict() for many queries with one gather and reduction"""
+        if not queries:
+            return []
+        indices, offsets, _ = self._pack([self.features(query) for query in queries])
+        probs = self._softmax(self._logits(indices, offsets))
+        best = probs.argmax(axis=1)
+        confidence = probs[np.arange(len(queries)), best]
+        return [(self.classes[i], float(p)) for i, p in zip(best.tolist(), confidence.tolist())]
+
+    def fit(
+        self,
+        queries: Sequence[str],
+        labels: Sequence[str],
+        epochs: int = 10,
+        learning_rate: float = 0.5,
+        l2: float = 1e-6,
+        batch_size: int = 64,
+        seed: int = 0,
+    ) -> "HashedNgramClassifier":
+        """Train with mini-batch SGD on softmax cross-entropy"""
+        index = {name: i for i, name in enumerate(self.classes)}
+        unknown = set(labels) - set(index)
+        if unknown:
+            raise ValueError(f"Labels not among the classes: {sorted(unknown)}")
+        targets = np.array([index[label] for label in labels], dtype=np.int64)
+        rows = [self.features(query) for query in queries]
+        rng = np.random.default_rng(seed)
+
+        for _ in range(epochs):
+            order = rng.permutation(len(rows))
+            for start in range(0, len(order), batch_size):
+                batch = order[start : start + batch_size]
+                indices, offsets, lengths = self._pack([rows[i] for i in batch])
+                grad = self._softmax(self._logits(indices, offsets))
+                grad[np.arange(len(batch)), targets[batch]] -= 1.0
+                grad *= learning_rate / len(batch)
+                if l2:
+                    self.weights[indices] *= 1.0 - learning_rate * l2
+                np.subtract.at(self.weights, indices, np.repeat(grad, lengths, axis=0))
+                self.bias -= grad.sum(axis=0)
+        return self
+
+    def accuracy(self, queries: Sequence[str], labels: Sequence[str]) -> float:
+        predicted = self.predict_batch(queries)
+        correct = sum(label == guess for label, (guess, _) in zip(labels, predicted))
+        return correct / max(len(labels), 1)
+
+    def save(self, path: str) -> None:
+        """Write the model as a compressed .npz file"""
+        np.savez_compressed(
+            path,
+            weights=self.weights,
+            bias=self.bias,
+            classes=np.array(self.classes),
+            n_features=np.array(self.n_features),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "HashedNgramClassifier":
+        """Read a model written by save()"""
+        _require_numpy()
+        with np.load(path, allow_pickle=False) as data:
+            model = cls([str(name) for name in data["classes"]], int(data["n_features"]))
+            model.weights = data["weights"].astype(np.float32)
+            model.bias = data["bias"].astype(np.float32)
+        return model
+
+
+def read_labeled_queries(lines: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """Queries and source labels from JSON lines with "query" and "source" keys"""
+    queries, labels = [], []
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        queries.append(record["query"])
+        labels.append(record["source"])
+    return queries, labels
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Train or evaluate the routing classifier.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train = commands.add_parser("train", help="train a model from labeled query logs (JSON lines)")
+    train.add_argument("logs")
+    train.add_argument("--output", "-o", required=True, help="model file (.npz)")
+    train.add_argument("--features", type=int, default=1 << 16, help="hash buckets")
+    train.add_argument("--epochs", type=int, default=10)
+    train.add_argument("--learning-rate", type=float, default=0.5)
+    train.add_argument("--holdout", type=float, default=0.1, help="fraction kept for evaluation")
+
+    evaluate = commands.add_parser("evaluate", help="report accuracy on labeled query logs")
+    evaluate.add_argument("model")
+    evaluate.add_argument("logs")
+
+    args = parser.parse_args(argv)
+    _require_numpy()
+    with open(args.logs) as f:
+        queries, labels = read_labeled_queries(f)
+
+    if args.command == "evaluate":
+        model = HashedNgramClassifier.load(args.model)
+        print(f"accuracy: {model.accuracy(queries, labels):.4f} on {len(queries)} queries")
+        return
+
+    # Logs are usually ordered by time; shuffle so the holdout is representative
+    order = np.random.default_rng(0).permutation(len(queries))
+    queries = [queries[i] for i in order]
+    labels = [labels[i] for i in order]
+    split = len(queries) - int(len(queries) * args.holdout)
+    model = HashedNgramClassifier(sorted(set(labels)), args.features)
+    model.fit(queries[:split], labels[:split], epochs=args.epochs, learning_rate=args.learning_rate)
+    model.save(args.output)
+    print(f"trained on {split} queries, classes: {', '.join(model.classes)}")
+    if split < len(queries):
+        print(f"holdout accuracy: {model.accuracy(queries[split:], labels[split:]):.4f}")
+
+
+if __name__ == "__main__":
+    main()
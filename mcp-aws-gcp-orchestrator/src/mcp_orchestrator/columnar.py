@@ -0,0 +1,348 @@
+"""Columnar representation of tabular query results"""
+
+import json
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .content import is_json_array, iter_json_rows, rows_from_content
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional
+    pa = None
+
+# Strings with more distinct values than this fraction of the rows are
+# stored plainly rather than dictionary-encoded
+DICTIONARY_MAX_RATIO = 0.5
+
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+def _smallest_codes(codes: array, size: int) -> array:
+    """Dictionary codes in the narrowest unsigned typecode that fits"""
+    for typecode, limit in (("B", 1 << 8), ("H", 1 << 16)):
+        if size <= limit:
+            return array(typecode, codes)
+    return codes
+
+
+class Column:
+    """
+    One column of a ColumnarResult.
+
+    ``kind`` is ``int`` or ``float`` (values in an ``array`` with a
+    validity bytearray when there are nulls), ``dictionary`` (codes into a
+    list of distinct strings, which may include None) or ``object`` (a
+    plain list).
+    """
+
+    __slots__ = ("name", "kind", "values", "valid", "dictionary")
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        values: Any,
+        valid: Optional[bytearray] = None,
+        dictionary: Optional[List[Any]] = None,
+    ):
+        self.name = name
+        self.kind = kind
+        self.values = values
+        self.valid = valid
+        self.dictionary = dictionary
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index: int) -> Any:
+        if self.kind == "dictionary":
+            return self.dictionary[self.values[index]]
+        if self.valid is not None and not self.valid[index]:
+            return None
+        return self.values[index]
+
+    def to_list(self) -> List[Any]:
+        """The column's values as Python objects"""
+        if self.kind == "dictionary":
+            dictionary = self.dictionary
+            return [dictionary[code] for code in self.values]
+        if self.kind == "object":
+            return list(self.values)
+        values = self.values.tolist()
+        if self.valid is not None:
+            return [value if ok else None for value, ok in zip(values, self.valid)]
+        return values
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held, excluding the string objects themselves"""
+        size = len(self.values) * (self.values.itemsize if isinstance(self.values, array) else 8)
+        if self.valid is not None:
+            size += len(self.valid)
+        if self.dictionary is not None:
+            size += 8 * len(self.dictionary)
+        return size
+
+    def to_json(self) -> Dict[str, Any]:
+        """Compact JSON form: dictionary columns send each distinct value once"""
+        if self.kind == "dictionary":
+            return {
+                "name": self.name,
+                "type": "dictionary",
+                "dictionary": self.dictionary,
+                "codes": self.values.tolist(),
+            }
+        return {"name": self.name, "type": self.kind, "values": self.to_list()}
+
+
+class _ColumnBuilder:
+    """Accumulates one column, narrowing its type as values arrive"""
+
+    __slots__ = ("name", "kind", "values", "valid", "nulls", "codes", "index")
+
+    def __init__(self, name: str, rows_before: int = 0):
+        self.name = name
+        # Until a non-null value arrives the column is all nulls
+        self.kind = "null"
+        self.values: Any = None
+        self.valid: Optional[bytearray] = None
+        self.nulls = rows_before
+        self.codes: Optional[array] = None
+        self.index: Optional[Dict[Any, int]] = None
+
+    def append(self, value: Any) -> None:
+        kind = self.kind
+        if value is None:
+            if kind == "null":
+                self.nulls += 1
+            elif kind == "dictionary":
+                self._append_code(None)
+            elif kind == "object":
+                self.values.append(None)
+            else:
+                self.values.append(0)
+                self._validity().append(0)
+            return
+        if kind == "null":
+            self._start(value)
+            kind = self.kind
+        value_type = type(value)
+        if kind == "int" and value_type is int and _INT64_MIN <= value <= _INT64_MAX:
+            self.values.append(value)
+        elif kind == "float" and (
+            value_type is float or (value_type is int and abs(value) < 1 << 53)
+        ):
+            self.values.append(value)
+        elif kind == "dictionary" and value_type is str:
+            self._append_code(value)
+        elif kind == "object":
+            self.values.append(value)
+        elif kind == "int" and value_type is float:
+            self.values = array("d", self.values)
+            self.kind = "float"
+            self.values.append(value)
+        else:
+            self._to_object()
+            self.values.append(value)
+        if self.valid is not None:
+            self.valid.append(1)
+
+    def _start(self, value: Any) -> None:
+        value_type = type(value)
+        if value_type is int and _INT64_MIN <= value <= _INT64_MAX:
+            self.kind, self.values = "int", array("q")
+        elif value_type is float:
+            self.kind, self.values = "float", array("d")
+        elif value_type is str:
+            self.kind, self.codes, self.index = "dictionary", array("I"), {}
+        else:
+            self.kind, self.values = "object", []
+        nulls, self.nulls = self.nulls, 0
+        for _ in range(nulls):
+            self.append(None)
+
+    def _append_code(self, value: Any) -> None:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.index)
+        self.codes.append(code)
+
+    def _validity(self) -> bytearray:
+        if self.valid is None:
+            self.valid = bytearray(b"\x01") * (len(self.values) - 1)
+        return self.valid
+
+    def _to_object(self) -> None:
+        if self.kind == "dictionary":
+            dictionary = list(self.index)
+            values = [dictionary[code] for code in self.codes]
+            self.codes = self.index = None
+        elif self.valid is not None:
+            values = [value if ok else None for value, ok in zip(self.values.tolist(), self.valid)]
+        else:
+            values = self.values.tolist()
+        self.kind, self.values, self.valid = "object", values, None
+
+    def finish(self) -> Column:
+        if self.kind == "null":
+            return Column(self.name, "object", [None] * self.nulls)
+        if self.kind == "dictionary":
+            dictionary = list(self.index)
+            rows = len(self.codes)
+            if rows > 16 and len(dictionary) > rows * DICTIONARY_MAX_RATIO:
+                # Mostly distinct (e.g. VINs): codes would only add overhead
+                self._to_object()
+                return Column(self.name, "object", self.values)
+            return Column(
+                self.name,
+                "dictionary",
+                _smallest_codes(self.codes, len(dictionary)),
+                dictionary=dictionary,
+            )
+        return Column(self.name, self.kind, self.values, self.valid)
+
+
+class ColumnarResult:
+    """
+    Tabular result stored column by column.
+
+    Column names are stored once and values in typed arrays: integers and
+    floats in ``array`` buffers, low-cardinality strings (Make, State,
+    ...) dictionary-encoded as small integer codes, anything else in a
+    list. Rows are only built on demand (``iter_rows``/``rows``), and
+    ``to_json`` gives a compact wire form without per-row keys.
+    """
+
+    def __init__(self, columns: Sequence[Column]):
+        self.columns: List[Column] = list(columns)
+        self._by_name = {column.name: column for column in self.columns}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "ColumnarResult":
+        """Build from row dicts; a column missing from some rows is null there"""
+        builders: Dict[str, _ColumnBuilder] = {}
+        count = 0
+        for row in rows:
+            for name, value in row.items():
+                builder = builders.get(name)
+                if builder is None:
+                    builder = builders[name] = _ColumnBuilder(name, count)
+                builder.append(value)
+            count += 1
+            if len(row) < len(builders):
+                for builder in builders.values():
+                    if builder.name not in row:
+                        builder.append(None)
+        return cls([builder.finish() for builder in builders.values()])
+
+    @classmethod
+    def from_content(cls, content: Iterable[Any]) -> Optional["ColumnarResult"]:
+        """
+        The JSON rows of tool result content, or None if it has none.
+
+        JSON arrays are decoded one element at a time straight into the
+        column builders, so the full list of row dicts is never held.
+        """
+        tabular = False
+
+        def rows() -> Iterator[Dict[str, Any]]:
+            nonlocal tabular
+            for item in content:
+                text = getattr(item, "text", None)
+                if text is None:
+                    continue
+                if is_json_array(text):
+                    tabular = True
+                    for row in iter_json_rows(text):
+                        if isinstance(row, dict):
+                            yield row
+                else:
+                    found = rows_from_content([item])
+                    tabular = tabular or bool(found)
+                    yield from found
+
+        result = cls.from_rows(rows())
+        return result if tabular else None
+
+    def __len__(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    @property
+    def names(self) -> List[str]:
+        return [column.name for column in self.columns]
+
+    def column(self, name: str) -> Column:
+        return self._by_name[name]
+
+    def row(self, index: int) -> Dict[str, Any]:
+        return {column.name: column[index] for column in self.columns}
+
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        """Rows as dicts, built one at a time"""
+        names = self.names
+        for values in zip(*(column.to_list() for column in self.columns)):
+            yield dict(zip(names, values))
+
+    def rows(self) -> List[Dict[str, Any]]:
+        return list(self.iter_rows())
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Columnar JSON: {"format": "columnar", "length": n, "columns": [...]}"""
+        return {
+            "format": "columnar",
+            "length": len(self),
+            "columns": [column.to_json() for column in self.columns],
+        }
+
+    def to_arrow(self) -> "pa.Table":
+        """An Arrow table (requires pyarrow); dictionary columns stay dictionary-encoded"""
+        if pa is None:
+            raise RuntimeError("Arrow output requires pyarrow (pip install pyarrow)")
+        arrays = []
+        for column in self.columns:
+            if column.kind == "dictionary":
+                arrays.append(
+                    pa.DictionaryArray.from_arrays(
+                        pa.array(column.values, type=pa.int32()),
+                        pa.array(column.dictionary, type=pa.string()),
+                    )
+                )
+            elif column.kind == "object":
+                try:
+                    arrays.append(pa.array(column.values))
+                except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+                    # Mixed types, or ints beyond int64, have no Arrow type: send them as JSON text
+                    arrays.append(
+                        pa.array(
+                            [
+                                None if value is None else json.dumps(value, default=str)
+                                for value in column.values
+                            ],
+                            type=pa.string(),
+                        )
+                    )
+            else:
+                mask = None
+                if column.valid is not None:
+                    mask = pa.array([not ok for ok in column.valid])
+                arrays.append(
+                    pa.array(
+                        column.values,
+                        mask=mask,
+                        type=pa.int64() if column.kind == "int" else pa.float64(),
+                    )
+                )
+        return pa.Table.from_arrays(arrays, names=self.names)
+
+    def to_arrow_ipc(self) -> bytes:
+        """The result as an Arrow IPC stream"""
+        table = self.to_arrow()
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
@@ -1,55 +1,199 @@
 """Configuration management for MCP Orchestrator"""
 
+import json
 import os
 from dataclasses import dataclass
 from typing import List
 
+from .sources import DataSource, ReplicaSpec, SourceSpec, builtin_sources
+
 
 @dataclass
 class ServerConfig:
     """Configuration for an MCP server"""
+
     name: str
     command: List[str]
     env: dict = None
+    pool_size: int = 2
+    tool_cache_ttl: float = 300.0
+    query_timeout: float = 30.0
+    cache_ttl: float = 300.0
+    max_concurrency: int = 2
+    replicas: List[List[str]] = None
+    balance: str = "least_outstanding"
+    table: str = ""
 
 
 class OrchestratorConfig:
     """Main configuration for the orchestrator"""
-    
+
     def __init__(self):
         self.gcp_server = ServerConfig(
             name="GCP BigQuery",
             command=self._get_gcp_command(),
-            env=self._get_gcp_env()
+            env=self._get_gcp_env(),
+            pool_size=self._get_pool_size(),
+            tool_cache_ttl=self._get_tool_cache_ttl(),
+            query_timeout=float(os.getenv("GCP_QUERY_TIMEOUT", "30")),
+            cache_ttl=float(os.getenv("GCP_CACHE_TTL", "300")),
+            max_concurrency=self._get_max_concurrency("GCP"),
+            replicas=self._get_replicas("GCP"),
+            balance=os.getenv("GCP_LB_STRATEGY", "least_outstanding"),
+            table=os.getenv("GCP_EV_TABLE", ""),
         )
-        
+
         self.aws_server = ServerConfig(
             name="AWS S3 Tables",
             command=self._get_aws_command(),
-            env=self._get_aws_env()
+            env=self._get_aws_env(),
+            pool_size=self._get_pool_size(),
+            tool_cache_ttl=self._get_tool_cache_ttl(),
+            query_timeout=float(os.getenv("AWS_QUERY_TIMEOUT", "30")),
+            cache_ttl=float(os.getenv("AWS_CACHE_TTL", "21600")),
+            max_concurrency=self._get_max_concurrency("AWS"),
+            replicas=self._get_replicas("AWS"),
+            balance=os.getenv("AWS_LB_STRATEGY", "least_outstanding"),
+            table=os.getenv("AWS_TAX_TABLE", ""),
+        )
+
+        # Memory bound shared by all cached query results
+        self.cache_max_bytes = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+        # Optional SQLite tier under RESULT_CACHE_DIR shared by all workers and
+        # kept across restarts
+        self.cache_dir = os.getenv("RESULT_CACHE_DIR") or None
+        self.cache_disk_max_bytes = int(
+            os.getenv("RESULT_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024))
+        )
+
+        # Serve per-state tax lookups from an in-memory copy of state_local_tax
+        self.local_tax_table = os.getenv("LOCAL_TAX_TABLE", "false").lower() in ("1", "true", "yes")
+        self.tax_table_refresh = float(os.getenv("TAX_TABLE_REFRESH", "3600"))
+
+        # Admission control: queries waiting per source beyond max_concurrency,
+        # and the overall deadline for one request
+        self.max_queue = int(os.getenv("MAX_QUEUED_QUERIES", "64"))
+        self.request_timeout = float(os.getenv("REQUEST_TIMEOUT", "30"))
+
+        # Circuit breaker per source, and optional hedged requests
+        self.breaker_threshold = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+        self.breaker_reset = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+        self.hedge = os.getenv("HEDGE_REQUESTS", "false").lower() in ("1", "true", "yes")
+
+        # Replicas slower than this multiple of their peers' median latency
+        # are ejected from rotation for REPLICA_EJECT_TIME seconds
+        self.replica_eject_factor = float(os.getenv("REPLICA_EJECT_FACTOR", "3"))
+        self.replica_eject_time = float(os.getenv("REPLICA_EJECT_TIME", "30"))
+
+        # Optional trained routing classifier (.npz) and the probability it
+        # needs before its prediction overrides keyword routing
+        self.routing_model = os.getenv("ROUTING_MODEL") or None
+        self.routing_threshold = float(os.getenv("ROUTING_MIN_CONFIDENCE", "0.6"))
+
+        # Routing decisions memoized on normalized query text (0 disables)
+        self.route_cache_size = int(os.getenv("ROUTE_CACHE_SIZE", "4096"))
+
+        # Feedback from observed outcomes redirects routes below this
+        # confidence; below SPECULATIVE_ROUTING_BELOW the two likeliest
+        # sources are queried at once (0 disables)
+        self.adaptive_routing = os.getenv("ADAPTIVE_ROUTING", "true").lower() in (
+            "1",
+            "true",
+            "yes",
         )
-    
+        self.adaptive_below = float(os.getenv("ADAPTIVE_ROUTING_BELOW", "0.6"))
+        self.speculate_below = float(os.getenv("SPECULATIVE_ROUTING_BELOW", "0"))
+
+        # Send recognized questions as SQL templates to the built-in sources
+        # whose table is named by GCP_EV_TABLE / AWS_TAX_TABLE (no SQL is
+        # sent to a source whose table is not configured)
+        self.sql_pushdown = os.getenv("SQL_PUSHDOWN", "true").lower() in ("1", "true", "yes")
+
+        # Micro-batching: per-state lookups of the same shape arriving within
+        # BATCH_WINDOW_MS share one upstream query (0 disables)
+        self.batch_window = float(os.getenv("BATCH_WINDOW_MS", "0")) / 1000
+        self.batch_max_states = int(os.getenv("BATCH_MAX_STATES", "50"))
+
+        # Initialized standby sessions kept per pool to replace dead ones, and
+        # how long startup waits for warm-up before serving (warming carries
+        # on in the background; /api/health reports 503 until it is done)
+        self.warm_spares = int(os.getenv("MCP_WARM_SPARES", "1"))
+        self.startup_wait = float(os.getenv("STARTUP_WAIT", "10"))
+
+        # Seconds in-flight upstream calls get to finish on shutdown
+        self.drain_timeout = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", "10"))
+
+        # Every MCP backend to route over: the two built-ins plus any listed
+        # in the JSON file named by MCP_SOURCES_FILE
+        self.sources = self._get_sources()
+
+    def _get_sources(self) -> List[SourceSpec]:
+        """Build source specs from the server configs and MCP_SOURCES_FILE"""
+        servers = {
+            DataSource.GCP_BIGQUERY.value: self.gcp_server,
+            DataSource.AWS_S3_TABLES.value: self.aws_server,
+        }
+        sources = builtin_sources()
+        for spec in sources:
+            server = servers[spec.name]
+            spec.command = server.command
+            spec.env = {key: value for key, value in (server.env or {}).items() if value} or None
+            spec.pool_size = server.pool_size
+            spec.tool_cache_ttl = server.tool_cache_ttl
+            spec.query_timeout = server.query_timeout
+            spec.cache_ttl = server.cache_ttl
+            spec.max_concurrency = server.max_concurrency
+            spec.replicas = [ReplicaSpec(command=command) for command in server.replicas or []]
+            spec.balance = server.balance
+            if server.table:
+                spec.schema.table = server.table
+
+        path = os.getenv("MCP_SOURCES_FILE")
+        if path:
+            with open(path) as f:
+                sources.extend(SourceSpec.from_dict(entry) for entry in json.load(f))
+        return sources
+
     def _get_gcp_command(self) -> List[str]:
         """Get GCP server command from environment or default"""
-        cmd = os.getenv("GCP_MCP_COMMAND", "python -m mcp_bigquery_server")
+        cmd = os.getenv("GCP_MCP_COMMAND", "uvx --from mcp-server-bigquery mcp-server-bigquery")
         return cmd.split()
-    
+
     def _get_aws_command(self) -> List[str]:
         """Get AWS server command from environment or default"""
-        cmd = os.getenv("AWS_MCP_COMMAND", "python -m mcp_s3tables_server")
+        cmd = os.getenv("AWS_MCP_COMMAND", "awslabss3-tables-mcp-server")
         return cmd.split()
-    
+
+    def _get_max_concurrency(self, prefix: str) -> int:
+        """Get the upstream call limit, by default one per pooled session across replicas"""
+        sessions = self._get_pool_size() * max(1, len(self._get_replicas(prefix)))
+        return int(os.getenv(f"{prefix}_MAX_CONCURRENCY", str(sessions)))
+
+    def _get_replicas(self, prefix: str) -> List[List[str]]:
+        """Get replica commands from e.g. GCP_MCP_REPLICAS, separated by semicolons"""
+        value = os.getenv(f"{prefix}_MCP_REPLICAS", "")
+        return [command.split() for command in value.split(";") if command.strip()]
+
+    def _get_pool_size(self) -> int:
+        """Get the number of warm sessions kept per MCP server"""
+        return int(os.getenv("MCP_POOL_SIZE", "2"))
+
+    def _get_tool_cache_ttl(self) -> float:
+        """Get how long a server's tool listing is trusted, in seconds"""
+        return float(os.getenv("MCP_TOOL_CACHE_TTL", "300"))
+
     def _get_gcp_env(self) -> dict:
         """Get GCP environment variables"""
         return {
             "GOOGLE_APPLICATION_CREDENTIALS": os.getenv("GOOGLE_APPLICATION_CREDENTIALS", ""),
-            "GCP_PROJECT_ID": os.getenv("GCP_PROJECT_ID", "")
+            "GCP_PROJECT_ID": os.getenv("GCP_PROJECT_ID", ""),
         }
-    
+
     def _get_aws_env(self) -> dict:
         """Get AWS environment variables"""
         return {
             "AWS_ACCESS_KEY_ID": os.getenv("AWS_ACCESS_KEY_ID", ""),
             "AWS_SECRET_ACCESS_KEY": os.getenv("AWS_SECRET_ACCESS_KEY", ""),
-            "AWS_REGION": os.getenv("AWS_REGION", "us-east-1")
+            "AWS_REGION": os.getenv("AWS_REGION", "us-east-1"),
         }
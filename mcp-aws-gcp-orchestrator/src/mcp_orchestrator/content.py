@@ -0,0 +1,133 @@
+"""Helpers for MCP tool result content"""
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def rows_from_content(content: Iterable[Any]) -> List[Dict[str, Any]]:
+    """
+    Extract table rows from tool result content.
+
+    MCP query servers return rows as JSON text, either a list of objects or
+    an object wrapping that list under ``rows``/``data``/``results``. Text
+    blocks that are not JSON rows are skipped.
+    """
+    rows: List[Dict[str, Any]] = []
+    for item in content:
+        text = getattr(item, "text", None)
+        if text is None:
+            continue
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            continue
+        if isinstance(payload, dict):
+            for key in ("rows", "data", "results"):
+                if isinstance(payload.get(key), list):
+                    payload = payload[key]
+                    break
+            else:
+                payload = [payload]
+        if isinstance(payload, list):
+            rows.extend(row for row in payload if isinstance(row, dict))
+    return rows
+
+
+def error_text(content: Iterable[Any]) -> str:
+    """The message of an error result: its text blocks joined"""
+    texts = [item.text for item in content or () if getattr(item, "text", None)]
+    return "\n".join(texts) or "Tool call failed"
+
+
+def _skip_whitespace(text: str, index: int) -> int:
+    while index < len(text) and text[index] in _WHITESPACE:
+        index += 1
+    return index
+
+
+def is_json_array(text: str) -> bool:
+    """Cheap check for text that starts like a JSON array"""
+    index = _skip_whitespace(text, 0)
+    return index < len(text) and text[index] == "["
+
+
+def iter_json_rows(text: str, decoder: json.JSONDecoder = _decoder) -> Iterator[Any]:
+    """
+    Yield the elements of a JSON array one at a time.
+
+    Elements are decoded in place with ``raw_decode`` so the full list is
+    never built; only the source text and the current element are alive.
+    Raises ValueError if the text is not a well-formed JSON array.
+    """
+    index = _skip_whitespace(text, 0)
+    if index >= len(text) or text[index] != "[":
+        raise ValueError("Expected a JSON array")
+    index = _skip_whitespace(text, index + 1)
+    if index < len(text) and text[index] == "]":
+        return
+    while True:
+        element, index = decoder.raw_decode(text, index)
+        yield element
+        index = _skip_whitespace(text, index)
+        if index >= len(text):
+            raise ValueError("Unterminated JSON array")
+        if text[index] == "]":
+            return
+        if text[index] != ",":
+            raise ValueError(f"Expected ',' at position {index}")
+        index = _skip_whitespace(text, index + 1)
+
+
+def column_key(name: str) -> str:
+    """Column names compared case-insensitively, with spaces as underscores ("Model Year")"""
+    return name.lower().replace(" ", "_")
+
+
+def iter_column_batches(
+    content: Iterable[Any], columns: Sequence[str], batch_rows: int = 65536
+) -> Iterator[List[List[Any]]]:
+    """
+    Decode JSON rows straight into column batches.
+
+    Yields one list of values per requested column, at most ``batch_rows``
+    long, so memory beyond the response text stays bounded however many
+    rows there are. JSON arrays of objects are decoded with a hook that
+    keeps only the requested columns as tuples, so no per-row dict is
+    built; other JSON row payloads go through rows_from_content. Missing
+    columns are None.
+    """
+    wanted = {column_key(column): i for i, column in enumerate(columns)}
+    width = len(columns)
+    positions: Dict[str, Optional[int]] = {}
+
+    def select(pairs):
+        values = [None] * width
+        for key, value in pairs:
+            i = positions.get(key, -1)
+            if i == -1:
+                i = positions[key] = wanted.get(column_key(key))
+            if i is not None:
+                values[i] = value
+        return tuple(values)
+
+    decoder = json.JSONDecoder(object_pairs_hook=select)
+    batch: List[tuple] = []
+    for item in content:
+        text = getattr(item, "text", None)
+        if text is None:
+            continue
+        if is_json_array(text):
+            rows: Iterable[Any] = iter_json_rows(text, decoder)
+        else:
+            rows = (select(row.items()) for row in rows_from_content([item]))
+        for row in rows:
+            if isinstance(row, tuple):
+                batch.append(row)
+                if len(batch) >= batch_rows:
+                    yield [list(values) for values in zip(*batch)]
+                    batch = []
+    if batch:
+        yield [list(values) for values in zip(*batch)]
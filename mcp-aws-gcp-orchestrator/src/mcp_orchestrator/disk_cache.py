@@ -0,0 +1,235 @@
+"""On-disk result cache tier shared between worker processes"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from mcp import types
+
+logger = logging.getLogger(__name__)
+
+# Tags of the stored forms: the text of a single text block as raw UTF-8
+# (the common case of a JSON rows payload), or the full result as JSON
+_TEXT = b"T"
+_MODEL = b"J"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+"""
+
+
+def dump_result(result: Any) -> bytes:
+    """Compact stored form of a tool result"""
+    content = result.content
+    if (
+        not result.isError
+        and len(content) == 1
+        and isinstance(content[0], types.TextContent)
+        and result.structuredContent is None
+    ):
+        return _TEXT + content[0].text.encode("utf-8")
+    return _MODEL + result.model_dump_json(exclude_none=True).encode("utf-8")
+
+
+def load_result(blob: bytes) -> types.CallToolResult:
+    """Inverse of dump_result; text payloads are decoded straight from the stored buffer"""
+    view = memoryview(blob)
+    if view[:1] == _TEXT:
+        text = str(view[1:], "utf-8")
+        return types.CallToolResult(content=[types.TextContent(type="text", text=text)])
+    return types.CallToolResult.model_validate_json(bytes(view[1:]))
+
+
+def disk_key(key: Hashable) -> str:
+    """Text form of a result cache key, e.g. ('gcp_bigquery', 'query', 'select ...')"""
+    if isinstance(key, tuple):
+        return "\x1f".join(str(part) for part in key)
+    return str(key)
+
+
+class DiskCache:
+    """
+    SQLite-backed second cache tier.
+
+    Entries survive restarts and are shared by every worker process using
+    the same file: SQLite's WAL mode lets readers proceed while one process
+    writes, and a busy timeout makes concurrent writers wait rather than
+    fail. Expiry uses wall-clock time since entries outlive the process.
+    Once the stored bytes exceed ``max_bytes`` the least recently read
+    entries are deleted. Writes add to a running byte total, and the file
+    is only summed when that total passes ``max_bytes`` or every
+    ``recount_every`` writes, to account for other processes' writes.
+
+    Calls block on disk I/O, so the orchestrator runs them in an executor.
+    Any SQLite error is logged and treated as a miss; the disk tier never
+    fails a query.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        dumps: Callable[[Any], bytes] = dump_result,
+        loads: Callable[[bytes], Any] = load_result,
+        busy_timeout: float = 5.0,
+        recount_every: int = 100,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.recount_every = recount_every
+        self.dumps = dumps
+        self.loads = loads
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # One connection guarded by a lock: calls arrive from executor threads
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            path, timeout=busy_timeout, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._closed = False
+        # Bytes stored as of the last count plus those written since
+        self._total = self._stored_bytes()
+        self._unchecked_writes = 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """A fresh stored value and the seconds until it expires, or None"""
+        now = time.time()
+        try:
+            with self._lock:
+                if self._closed:
+                    return None
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM entries WHERE key = ? AND expires_at > ?",
+                    (disk_key(key), now),
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, disk_key(key))
+                    )
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning("Disk cache read failed: %s", e)
+            return None
+        if row is None:
+            self.misses += 1
+            return None
+        try:
+            value = self.loads(row[0])
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Disk cache entry unreadable, ignoring it: %s", e)
+            return None
+        self.hits += 1
+        return value, row[1] - now
+
+    def put(self, key: Hashable, value: Any, ttl: float) -> None:
+        """Store a value for ``ttl`` seconds, then evict to stay under max_bytes"""
+        if ttl <= 0:
+            return
+        try:
+            blob = self.dumps(value)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Disk cache cannot store %s: %s", type(value).__name__, e)
+            return
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                if self._closed:
+                    return
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (disk_key(key), sqlite3.Binary(blob), len(blob), now + ttl, now),
+                )
+                self.writes += 1
+                # Replacing an entry overcounts, which only brings the next count forward
+                self._total += len(blob)
+                self._unchecked_writes += 1
+                if self._total > self.max_bytes or self._unchecked_writes >= self.recount_every:
+                    self._evict(now)
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning("Disk cache write failed: %s", e)
+
+    def _stored_bytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _evict(self, now: float) -> None:
+        """Recount stored bytes; over max_bytes, drop expired then least recently read entries"""
+        self._unchecked_writes = 0
+        total = self._total = self._stored_bytes()
+        if total <= self.max_bytes:
+            return
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            expired = self._db.execute("DELETE FROM entries WHERE expires_at <= ?", (now,)).rowcount
+            self.evictions += expired
+            total = self._stored_bytes()
+            victims = []
+            for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+                if total <= self.max_bytes:
+                    break
+                victims.append((key,))
+                total -= size
+            self._db.executemany("DELETE FROM entries WHERE key = ?", victims)
+            self.evictions += len(victims)
+            self._db.execute("COMMIT")
+            self._total = total
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def delete(self, key: Optional[Hashable] = None) -> None:
+        """Drop one entry, or everything when no key is given"""
+        try:
+            with self._lock:
+                if self._closed:
+                    return
+                if key is None:
+                    self._db.execute("DELETE FROM entries")
+                else:
+                    self._db.execute("DELETE FROM entries WHERE key = ?", (disk_key(key),))
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning("Disk cache delete failed: %s", e)
+
+    def close(self) -> None:
+        """Close the database; later calls are misses and no-ops"""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._db.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for monitoring"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "errors": self.errors,
+        }
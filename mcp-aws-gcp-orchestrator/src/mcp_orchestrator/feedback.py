@@ -0,0 +1,186 @@
+"""Routing feedback from observed query outcomes"""
+
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .content import rows_from_content
+
+# Text bodies meaning "no rows"
+_EMPTY_TEXTS = frozenset(("", "[]", "{}", "null"))
+
+# JSON objects shorter than this are parsed to check for empty row lists
+_SMALL_OBJECT = 256
+
+OUTCOMES = ("data", "empty", "error")
+
+
+def has_data(content: Iterable[Any]) -> bool:
+    """
+    Whether tool result content carries an answer.
+
+    Empty JSON arrays and small objects wrapping no rows (``{"rows": []}``)
+    count as empty; any other text counts as data. Large payloads are not
+    parsed.
+    """
+    for item in content or ():
+        text = getattr(item, "text", None)
+        if text is None:
+            # Images, resources and the like
+            return True
+        stripped = text.strip()
+        if stripped in _EMPTY_TEXTS:
+            continue
+        if stripped[0] == "{" and len(stripped) < _SMALL_OBJECT:
+            try:
+                payload = json.loads(stripped)
+            except ValueError:
+                return True
+            if rows_from_content([item]) or not any(
+                isinstance(payload.get(key), list) for key in ("rows", "data", "results")
+            ):
+                return True
+            continue
+        return True
+    return False
+
+
+def outcome_of(result: Any) -> str:
+    """Feedback outcome of a tool result: "error" for tool errors, else "data"/"empty" by content"""
+    if getattr(result, "isError", False):
+        return "error"
+    return "data" if has_data(result.content) else "empty"
+
+
+@dataclass
+class _Outcomes:
+    """Decayed outcome counts and smoothed latency of one source for one fingerprint"""
+
+    data: float = 0.0
+    empty: float = 0.0
+    error: float = 0.0
+    latency: Optional[float] = None
+    seen: int = 0
+
+    @property
+    def usefulness(self) -> float:
+        """Smoothed share of answers with data; 0.5 before any observation"""
+        return (self.data + 1) / (self.data + self.empty + self.error + 2)
+
+
+class RoutingFeedback:
+    """
+    Per query fingerprint record of which sources actually answered.
+
+    Each outcome (data, empty or error, with its latency) is recorded
+    against the fingerprint (the router's normal form of the query) and
+    source. Counts decay by ``decay`` per new observation, so a source
+    that starts answering again recovers. ``prefer`` uses the record to
+    second-guess low-confidence routes: after ``min_samples`` poor answers
+    from the chosen source, another source whose smoothed usefulness is
+    at least ``margin`` higher is picked instead, faster first on ties.
+    At most ``maxsize`` fingerprints are kept, least recently used first
+    out.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        decay: float = 0.9,
+        min_samples: int = 2,
+        margin: float = 0.2,
+        latency_alpha: float = 0.3,
+    ):
+        self.maxsize = maxsize
+        self.decay = decay
+        self.min_samples = min_samples
+        self.margin = margin
+        self.latency_alpha = latency_alpha
+        self._entries: "OrderedDict[Hashable, Dict[str, _Outcomes]]" = OrderedDict()
+        self.recorded = 0
+        self.adjustments = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(self, fingerprint: Hashable, source: str, outcome: str, latency: float) -> None:
+        """Add one observed outcome ("data", "empty" or "error")"""
+        if outcome not in OUTCOMES:
+            raise ValueError(f"Unknown outcome: {outcome}")
+        sources = self._entries.get(fingerprint)
+        if sources is None:
+            sources = self._entries[fingerprint] = {}
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(fingerprint)
+        stats = sources.get(source)
+        if stats is None:
+            stats = sources[source] = _Outcomes()
+        stats.data *= self.decay
+        stats.empty *= self.decay
+        stats.error *= self.decay
+        setattr(stats, outcome, getattr(stats, outcome) + 1)
+        if stats.latency is None:
+            stats.latency = latency
+        else:
+            stats.latency += self.latency_alpha * (latency - stats.latency)
+        stats.seen += 1
+        self.recorded += 1
+
+    def stats(self, fingerprint: Hashable) -> Dict[str, Dict[str, Any]]:
+        """What has been observed for a fingerprint, per source"""
+        return {
+            source: {
+                "usefulness": round(stats.usefulness, 3),
+                "latency": stats.latency,
+                "seen": stats.seen,
+            }
+            for source, stats in self._entries.get(fingerprint, {}).items()
+        }
+
+    def rank(self, fingerprint: Hashable, candidates: Iterable[str]) -> List[str]:
+        """Candidates likeliest to have data first, then fastest; unobserved keep their order"""
+        sources = self._entries.get(fingerprint, {})
+        order = list(candidates)
+
+        def key(item: Tuple[int, str]) -> Tuple[float, float, int]:
+            index, source = item
+            stats = sources.get(source)
+            if stats is None:
+                return (-0.5, float("inf"), index)
+            return (-stats.usefulness, stats.latency, index)
+
+        return [source for _, source in sorted(enumerate(order), key=key)]
+
+    def prefer(
+        self, fingerprint: Hashable, chosen: str, candidates: Iterable[str]
+    ) -> Optional[Tuple[str, str]]:
+        """
+        A better source than ``chosen`` for this fingerprint, with the reason, or None.
+
+        Only once ``chosen`` has at least ``min_samples`` observations; an
+        unobserved alternative counts as even odds, so a source that keeps
+        coming back empty is eventually traded for one not tried yet.
+        """
+        sources = self._entries.get(fingerprint)
+        if sources is None:
+            return None
+        current = sources.get(chosen)
+        if current is None or current.seen < self.min_samples:
+            return None
+        best = self.rank(fingerprint, [source for source in candidates if source != chosen])
+        if not best:
+            return None
+        alternative = best[0]
+        other = sources.get(alternative)
+        usefulness = other.usefulness if other is not None else 0.5
+        if usefulness < current.usefulness + self.margin:
+            return None
+        self.adjustments += 1
+        reason = (
+            f"{chosen} rarely answered similar queries with data "
+            f"(usefulness {current.usefulness:.2f} vs {usefulness:.2f})"
+        )
+        return alternative, reason
@@ -0,0 +1,195 @@
+"""In-process join of EV registrations with state tax rates"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised without the fast extra
+    np = None
+
+from .content import column_key, iter_column_batches
+from .pushdown import TableSchema, sql_literal
+
+# Columns read from each side; the price is not one of the documented EV
+# columns, so the configured EV table has to provide it
+EV_PRICE_COLUMN = "base_msrp"
+EV_MAKE_COLUMN = "make"
+TAX_RATE_COLUMN = "combined_rate"
+TAX_NAME_COLUMN = "state_name"
+
+
+@dataclass
+class JoinPlan:
+    """The two pushed-down queries of an EV x tax question"""
+
+    ev_source: str
+    tax_source: str
+    ev_sql: str
+    tax_sql: str
+    ev_columns: Tuple[str, str]
+    states: Tuple[str, ...] = ()
+    makes: Tuple[str, ...] = ()
+
+
+def plan_join(
+    query: str,
+    states: Sequence[str],
+    ev_source: str,
+    ev_schema: TableSchema,
+    tax_source: str,
+    tax_schema: TableSchema,
+    normalize: Callable[[str], str],
+) -> JoinPlan:
+    """
+    Queries fetching only what a per-state EV x tax summary needs.
+
+    State and make filters in the question are pushed down to both sides;
+    the EV side selects just its state and price columns and the tax side
+    its state, name and combined rate.
+    """
+    known = ev_schema.filters.get(EV_MAKE_COLUMN, ())
+    makes: List[str] = []
+    for token in normalize(query).split():
+        # "Teslas" as well as "Tesla"
+        for value in (token, token[:-1] if token.endswith("s") else None):
+            if value in known and value not in makes:
+                makes.append(value)
+    states = tuple(states)
+
+    ev_state = ev_schema.state_column
+    conditions = []
+    if states:
+        conditions.append(f"{ev_state} IN ({', '.join(sql_literal(code) for code in states)})")
+    if makes:
+        conditions.append(
+            f"UPPER({EV_MAKE_COLUMN}) IN ({', '.join(sql_literal(make.upper()) for make in makes)})"
+        )
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    ev_sql = f"SELECT {ev_state}, {EV_PRICE_COLUMN} FROM {ev_schema.table}{where}"
+
+    tax_state = tax_schema.state_column
+    codes = ", ".join(sql_literal(code) for code in states)
+    tax_where = f" WHERE {tax_state} IN ({codes})" if states else ""
+    tax_sql = (
+        f"SELECT {tax_state}, {TAX_NAME_COLUMN}, {TAX_RATE_COLUMN} "
+        f"FROM {tax_schema.table}{tax_where} "
+        f"LIMIT {len(states) or tax_schema.default_limit}"
+    )
+    return JoinPlan(
+        ev_source, tax_source, ev_sql, tax_sql, (ev_state, EV_PRICE_COLUMN), states, tuple(makes)
+    )
+
+
+def _price(value: Any) -> float:
+    """A price as a float, 0.0 when missing or unparseable"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class StateTaxJoin:
+    """
+    Hash join of EV rows onto state tax rates, aggregated per state.
+
+    The tax rows are the build side: one slot per state, with its name and
+    combined rate. EV rows are the probe side and arrive as column batches
+    (see iter_column_batches): each batch's state column is dictionary-
+    encoded to slot numbers and its prices summed per slot, with NumPy's
+    bincount when available. Only per-state totals are kept, so memory is
+    independent of the number of EV rows. Rows whose state has no tax row
+    are counted as unmatched (an inner join).
+
+    Vehicles without a price (a missing or zero MSRP) count towards
+    ``vehicles`` but not towards the tax estimate.
+    """
+
+    def __init__(self, tax_rows: Iterable[Dict[str, Any]]):
+        self.states: List[str] = []
+        self.names: List[Optional[str]] = []
+        self.rates: List[float] = []
+        self.index: Dict[str, int] = {}
+        for row in tax_rows:
+            row = {column_key(str(key)): value for key, value in row.items()}
+            code = str(row.get("state") or "").upper()
+            if not code or code in self.index:
+                continue
+            self.index[code] = len(self.states)
+            self.states.append(code)
+            self.names.append(row.get(TAX_NAME_COLUMN))
+            self.rates.append(_price(row.get(TAX_RATE_COLUMN)))
+
+        # One extra slot collects unmatched rows
+        slots = len(self.states) + 1
+        self.vehicles = [0] * slots
+        self.priced = [0] * slots
+        self.price_sum = [0.0] * slots
+        self.rows = 0
+
+    @property
+    def unmatched(self) -> int:
+        return self.vehicles[-1]
+
+    def add_batch(self, states: Sequence[Any], prices: Sequence[Any]) -> None:
+        """Aggregate one column batch of EV rows"""
+        missing = len(self.states)
+        lookup = self.index.get
+        codes = [lookup(state, missing) for state in states]
+        values = [_price(price) for price in prices]
+        self.rows += len(codes)
+
+        if np is not None:
+            slots = missing + 1
+            codes_array = np.fromiter(codes, dtype=np.intp, count=len(codes))
+            values_array = np.fromiter(values, dtype=np.float64, count=len(values))
+            counts = np.bincount(codes_array, minlength=slots)
+            priced = np.bincount(codes_array, weights=values_array > 0, minlength=slots)
+            sums = np.bincount(codes_array, weights=values_array, minlength=slots)
+            for slot in np.flatnonzero(counts):
+                self.vehicles[slot] += int(counts[slot])
+                self.priced[slot] += int(priced[slot])
+                self.price_sum[slot] += float(sums[slot])
+            return
+
+        vehicles, priced, price_sum = self.vehicles, self.priced, self.price_sum
+        for slot, value in zip(codes, values):
+            vehicles[slot] += 1
+            if value > 0:
+                priced[slot] += 1
+                price_sum[slot] += value
+
+    def add_content(
+        self, content: Iterable[Any], columns: Sequence[str], batch_rows: int = 65536
+    ) -> None:
+        """Aggregate the EV rows of a tool result, ``columns`` naming its state and price columns"""
+        for states, prices in iter_column_batches(content, columns, batch_rows):
+            self.add_batch(states, prices)
+
+    def results(self) -> List[Dict[str, Any]]:
+        """One row per state with vehicles, highest estimated sales tax first"""
+        rows = []
+        for slot, code in enumerate(self.states):
+            vehicles = self.vehicles[slot]
+            if not vehicles:
+                continue
+            priced = self.priced[slot]
+            rate = self.rates[slot]
+            total = self.price_sum[slot]
+            tax = total * rate / 100
+            rows.append(
+                {
+                    "state": code,
+                    "state_name": self.names[slot],
+                    "vehicles": vehicles,
+                    "priced_vehicles": priced,
+                    "avg_msrp": round(total / priced, 2) if priced else None,
+                    "combined_rate": rate,
+                    "est_sales_tax": round(tax, 2),
+                    "avg_sales_tax": round(tax / priced, 2) if priced else None,
+                }
+            )
+        rows.sort(key=lambda row: (-row["est_sales_tax"], -row["vehicles"], row["state"]))
+        return rows
@@ -0,0 +1,146 @@
+"""Latency histograms and counters with Prometheus text output"""
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+# (metric name, metric type, help text, labels, value) reported at scrape time
+Sample = Tuple[str, str, str, Dict[str, str], float]
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding quantile q (0 when empty)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.buckets[-1]
+
+
+class Metrics:
+    """
+    In-process metrics for the orchestrator hot path.
+
+    Stage latencies (route, spawn, initialize, lease, list_tools, call_tool)
+    are recorded per data source in histograms, events are counted, and
+    collectors registered with ``add_collector`` contribute values computed
+    at scrape time (e.g. cache statistics). Recording is a bisect and a few
+    additions, so it is cheap enough for every request.
+    """
+
+    HISTOGRAM = "orchestrator_stage_duration_seconds"
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.histograms: Dict[Labels, Histogram] = {}
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def histogram(self, stage: str, source: str = "") -> Histogram:
+        """Histogram for a stage/source pair, created on first use"""
+        key = (("stage", stage), ("source", source))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(self.buckets)
+        return histogram
+
+    def observe(self, stage: str, seconds: float, source: str = "") -> None:
+        self.histogram(stage, source).observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str, source: str = "") -> Iterator[None]:
+        """Record the duration of the block, including when it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, source)
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        """Increment the counter orchestrator_<name>_total"""
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = [
+            f"# HELP {self.HISTOGRAM} Latency of each orchestrator stage.",
+            f"# TYPE {self.HISTOGRAM} histogram",
+        ]
+        for labels, histogram in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.HISTOGRAM}_bucket{_format_labels(labels, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.HISTOGRAM}_bucket{_format_labels(labels, le)} {histogram.count}")
+            lines.append(f"{self.HISTOGRAM}_sum{_format_labels(labels)} {histogram.sum}")
+            lines.append(f"{self.HISTOGRAM}_count{_format_labels(labels)} {histogram.count}")
+
+        declared = set()
+        for (name, labels), value in sorted(self.counters.items()):
+            metric = f"orchestrator_{name}_total"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+        for collector in self._collectors:
+            for name, kind, help_text, labels, value in collector():
+                if name not in declared:
+                    lines.append(f"# HELP {name} {help_text}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    declared.add(name)
+                lines.append(f"{name}{_format_labels(tuple(sorted(labels.items())))} {value}")
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,507 @@
+"""Natural-language to SQL pushdown templates"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .tax_table import TAX_COLUMNS
+
+# Words that carry no meaning for the translation
+STOPWORDS = frozenset(
+    {
+        "a",
+        "an",
+        "the",
+        "of",
+        "in",
+        "for",
+        "to",
+        "on",
+        "at",
+        "from",
+        "and",
+        "with",
+        "across",
+        "what",
+        "whats",
+        "is",
+        "are",
+        "was",
+        "were",
+        "which",
+        "where",
+        "there",
+        "their",
+        "its",
+        "show",
+        "me",
+        "list",
+        "give",
+        "get",
+        "find",
+        "tell",
+        "about",
+        "please",
+        "all",
+        "do",
+        "does",
+        "have",
+        "has",
+        "data",
+        "vs",
+        "versus",
+        "compare",
+        "each",
+    }
+)
+
+AVG_WORDS = frozenset({"average", "avg", "mean"})
+SUM_WORDS = frozenset({"total", "sum"})
+DESC_WORDS = frozenset({"top", "highest", "most", "largest", "biggest", "maximum"})
+ASC_WORDS = frozenset({"lowest", "bottom", "least", "smallest", "cheapest", "minimum"})
+GROUP_WORDS = frozenset({"by", "per"})
+COUNT_PHRASES = (("how", "many"), ("number", "of"), ("count", "of"), ("count",))
+
+
+def sql_literal(value: str) -> str:
+    """Single-quoted SQL string literal"""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _is_state(token: str) -> bool:
+    # The router's normal form uppercases state codes and nothing else
+    return len(token) == 2 and token.isupper()
+
+
+@dataclass
+class TableSchema:
+    """
+    The columns of one source table that questions can be translated onto.
+
+    ``terms`` maps phrases (lowercase words; a plural "s" is accepted) to
+    the columns they mean, the first being the one aggregated or sorted
+    on. ``numeric`` columns can be averaged and ranked. ``row_key`` is the
+    column rows are naturally identified by (e.g. the state for a per-state
+    table), ``state_column`` receives state filters, ``filters`` maps a
+    column to the values recognized as equality filters on it, and
+    ``filler`` lists words that are harmless for this table. An empty
+    ``table`` means the table's name is not known and nothing is sent to
+    it as SQL.
+    """
+
+    table: str
+    terms: Dict[str, Tuple[str, ...]]
+    numeric: Tuple[str, ...] = ()
+    default_columns: Tuple[str, ...] = ()
+    row_key: Optional[str] = None
+    state_column: Optional[str] = None
+    filters: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    filler: Tuple[str, ...] = ()
+    default_limit: int = 100
+
+    def __post_init__(self):
+        self.terms = {phrase: tuple(columns) for phrase, columns in self.terms.items()}
+        self.filters = {column: tuple(values) for column, values in self.filters.items()}
+        # First word -> (words, columns), longest phrase first
+        self._phrases: Dict[str, List[Tuple[Tuple[str, ...], Tuple[str, ...]]]] = {}
+        for phrase, columns in self.terms.items():
+            words = tuple(phrase.split())
+            for variant in (words, words[:-1] + (words[-1] + "s",)):
+                self._phrases.setdefault(variant[0], []).append((variant, columns))
+        for entries in self._phrases.values():
+            entries.sort(key=lambda entry: len(entry[0]), reverse=True)
+        self._filter_values: Dict[str, str] = {
+            value: column for column, values in self.filters.items() for value in values
+        }
+        self._filler = STOPWORDS | frozenset(self.filler)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TableSchema":
+        return cls(**data)
+
+
+@dataclass
+class SqlTemplate:
+    """A translated query shape; placeholders are filled from each query's literals"""
+
+    intent: str
+    sql: str
+    # One row per state filtered on only by state: lookups of the same
+    # shape can be combined into one query over the union of their states
+    per_state: bool = False
+
+    def render(
+        self, states: Sequence[str], limit: Optional[int], values: Dict[str, List[str]]
+    ) -> str:
+        params = {
+            "states": ", ".join(sql_literal(code) for code in states),
+            "state_count": len(states),
+            "limit": limit,
+        }
+        for column, column_values in values.items():
+            params[f"values_{column}"] = ", ".join(
+                sql_literal(value.upper()) for value in column_values
+            )
+        return self.sql.format(**params)
+
+
+@dataclass
+class Translation:
+    """SQL sent upstream in place of the natural-language question"""
+
+    intent: str
+    sql: str
+    states: Tuple[str, ...] = ()
+    # Set for per-state lookups, which may be batched with others (see MicroBatcher)
+    template: Optional[SqlTemplate] = None
+    state_column: Optional[str] = None
+
+
+class SqlTranslator:
+    """
+    Maps recognized questions onto parameterized SQL over known columns.
+
+    Recognized intents are counts, averages and totals (optionally grouped
+    by a column), top/bottom-N rankings and plain row lookups filtered by
+    state and by known column values. The SQL projects only the columns
+    the question needs and always carries a LIMIT. Translation is
+    deliberately conservative: a question with any word that is not a
+    schema term, an intent word, a state, a known filter value or filler
+    is sent upstream unchanged.
+
+    Questions are fingerprinted on the router's normal form with states,
+    numbers and filter values replaced by placeholders; the template (or
+    the fact that there is none) is cached per fingerprint, so repeated
+    question shapes skip parsing and only bind their literals.
+    """
+
+    def __init__(
+        self,
+        schemas: Dict[str, TableSchema],
+        normalize: Callable[[str], str],
+        max_limit: int = 1000,
+        cache_size: int = 4096,
+    ):
+        self.schemas = dict(schemas)
+        self.normalize = normalize
+        self.max_limit = max_limit
+        self.cache_size = cache_size
+        self._templates: Dict[Tuple[str, Tuple[str, ...]], Optional[SqlTemplate]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _fingerprint(self, schema: TableSchema, tokens: Sequence[str]) -> Tuple[str, ...]:
+        values = schema._filter_values
+        return tuple(
+            (
+                "<state>"
+                if _is_state(token)
+                else (
+                    "<n>" if token.isdigit() else f"<{values[token]}>" if token in values else token
+                )
+            )
+            for token in tokens
+        )
+
+    def translate(self, source: str, query: str) -> Optional[Translation]:
+        """SQL for a recognized question to this source, or None to send it as written"""
+        schema = self.schemas.get(source)
+        if schema is None or not schema.table:
+            return None
+        tokens = self.normalize(query).split()
+        key = (source, self._fingerprint(schema, tokens))
+        if key in self._templates:
+            self.hits += 1
+            template = self._templates[key]
+        else:
+            self.misses += 1
+            template = self._compile(schema, tokens)
+            if len(self._templates) >= self.cache_size:
+                self._templates.clear()
+            self._templates[key] = template
+        if template is None:
+            return None
+
+        states = [token for token in tokens if _is_state(token)]
+        numbers = [int(token) for token in tokens if token.isdigit()]
+        values: Dict[str, List[str]] = {}
+        for token in tokens:
+            column = schema._filter_values.get(token)
+            if column is not None:
+                values.setdefault(column, []).append(token)
+        limit = min(numbers[0], self.max_limit) if numbers else None
+        if limit is not None and limit < 1:
+            # "top 0 makes" asks for nothing; leave it to the server
+            return None
+        sql = template.render(states, limit, values)
+        if template.per_state:
+            return Translation(template.intent, sql, tuple(states), template, schema.state_column)
+        return Translation(template.intent, sql, tuple(states))
+
+    def _compile(self, schema: TableSchema, tokens: Sequence[str]) -> Optional[SqlTemplate]:
+        """Parse one question shape into a template, or None if any part is not understood"""
+        # Schema terms (longest match), each tagged with whether it follows "by"/"per"
+        terms: List[Tuple[Tuple[str, ...], bool]] = []
+        rest: List[str] = []
+        has_states = False
+        numbers = 0
+        filter_columns: List[str] = []
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            match = None
+            for words, columns in schema._phrases.get(token, ()):
+                if tuple(tokens[i : i + len(words)]) == words:
+                    match = (words, columns)
+                    break
+            if match is not None:
+                grouped = i > 0 and tokens[i - 1] in GROUP_WORDS
+                terms.append((match[1], grouped))
+                i += len(match[0])
+                continue
+            if _is_state(token):
+                has_states = True
+            elif token.isdigit():
+                numbers += 1
+            elif token in schema._filter_values:
+                column = schema._filter_values[token]
+                if column not in filter_columns:
+                    filter_columns.append(column)
+            else:
+                rest.append(token)
+            i += 1
+
+        counting = any(
+            tuple(rest[j : j + len(phrase)]) == phrase
+            for phrase in COUNT_PHRASES
+            for j in range(len(rest))
+        )
+        words = set(rest)
+        averaging = bool(words & AVG_WORDS)
+        summing = bool(words & SUM_WORDS)
+        descending = bool(words & DESC_WORDS)
+        ascending = bool(words & ASC_WORDS)
+        known = (
+            schema._filler
+            | AVG_WORDS
+            | SUM_WORDS
+            | DESC_WORDS
+            | ASC_WORDS
+            | GROUP_WORDS
+            | {"how", "many", "number", "count"}
+        )
+        if words - known or (has_states and not schema.state_column):
+            return None
+        # A number only means something as the N of a ranking
+        ranking = descending or ascending
+        if numbers > 1 or (numbers and not ranking):
+            return None
+
+        numeric = set(schema.numeric)
+        measures: List[str] = []
+        group: Optional[str] = None
+        mentioned: List[str] = []
+        for columns, grouped in terms:
+            if grouped and not (ranking and columns[0] in numeric and not measures and not group):
+                group = group or columns[0]
+            elif columns[0] in numeric:
+                measures.extend(column for column in columns if column not in measures)
+            else:
+                mentioned.append(columns[0])
+        if group is None and ranking:
+            # "top 5 makes", "which states have the highest ..."
+            group = next((column for column in mentioned if column != schema.row_key), None)
+        if group == schema.row_key:
+            group = None
+
+        conditions = []
+        if has_states:
+            conditions.append(f"{schema.state_column} IN ({{states}})")
+        for column in filter_columns:
+            conditions.append(f"UPPER({column}) IN ({{values_{column}}})")
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        limit = "{limit}" if numbers else str(schema.default_limit)
+        order = "ASC" if ascending and not descending else "DESC"
+        table = schema.table
+
+        if counting or averaging or summing:
+            if counting:
+                intent, expression, alias = "count", "COUNT(*)", "count"
+            elif not measures:
+                return None
+            elif averaging:
+                measure = measures[0]
+                intent, expression, alias = "average", f"AVG({measure})", f"avg_{measure.lower()}"
+            else:
+                measure = measures[0]
+                intent, expression, alias = "sum", f"SUM({measure})", f"total_{measure.lower()}"
+            if group is None:
+                return SqlTemplate(intent, f"SELECT {expression} AS {alias} FROM {table}{where}")
+            return SqlTemplate(
+                intent,
+                (
+                    f"SELECT {group}, {expression} AS {alias} FROM {table}{where} "
+                    f"GROUP BY {group} ORDER BY {alias} {order} LIMIT {limit}"
+                ),
+            )
+
+        if ranking:
+            if group is not None:
+                # Rank groups by size, or by their average measure
+                if measures:
+                    alias = f"avg_{measures[0].lower()}"
+                    expression = f"AVG({measures[0]})"
+                else:
+                    alias, expression = "count", "COUNT(*)"
+                return SqlTemplate(
+                    "top_n",
+                    (
+                        f"SELECT {group}, {expression} AS {alias} FROM {table}{where} "
+                        f"GROUP BY {group} ORDER BY {alias} {order} LIMIT {limit}"
+                    ),
+                )
+            if not measures:
+                return None
+            columns = self._projection(schema, measures)
+            return SqlTemplate(
+                "top_n",
+                (
+                    f"SELECT {', '.join(columns)} FROM {table}{where} "
+                    f"ORDER BY {measures[0]} {order} LIMIT {limit}"
+                ),
+            )
+
+        if not conditions or group is not None:
+            return None
+        columns = self._projection(schema, measures + [c for c in mentioned if c not in measures])
+        if has_states and not filter_columns and schema.row_key == schema.state_column:
+            # One row per state: the LIMIT is the number of states asked about
+            return SqlTemplate(
+                "lookup",
+                f"SELECT {', '.join(columns)} FROM {table}{where} LIMIT {{state_count}}",
+                per_state=True,
+            )
+        return SqlTemplate(
+            "lookup",
+            f"SELECT {', '.join(columns)} FROM {table}{where} LIMIT {schema.default_limit}",
+        )
+
+    @staticmethod
+    def _projection(schema: TableSchema, columns: List[str]) -> List[str]:
+        """Identifying columns plus the requested ones, or the defaults when none were named"""
+        if not columns:
+            return list(schema.default_columns)
+        keys = [column for column in schema.default_columns[:2] if column not in columns]
+        return keys + columns
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for monitoring"""
+        return {"templates": len(self._templates), "hits": self.hits, "misses": self.misses}
+
+
+EV_MAKES = (
+    "tesla",
+    "nissan",
+    "chevrolet",
+    "ford",
+    "kia",
+    "bmw",
+    "rivian",
+    "toyota",
+    "hyundai",
+    "volkswagen",
+    "audi",
+    "porsche",
+    "jeep",
+    "volvo",
+    "polestar",
+    "lucid",
+    "chrysler",
+    "jaguar",
+)
+
+
+def ev_schema(table: str = "") -> TableSchema:
+    """Schema of the EV data documented on MCPOrchestrator; the table name must be configured"""
+    return TableSchema(
+        table=table,
+        terms={
+            "electric range": ("range_miles",),
+            "range": ("range_miles",),
+            "range in miles": ("range_miles",),
+            "battery capacity": ("battery_capacity_kwh",),
+            "battery": ("battery_capacity_kwh",),
+            "kwh": ("battery_capacity_kwh",),
+            "model year": ("year",),
+            "year": ("year",),
+            "make": ("make",),
+            "manufacturer": ("make",),
+            "brand": ("make",),
+            "model": ("model",),
+            "state": ("state",),
+            "registration date": ("registration_date",),
+            "vehicle id": ("vehicle_id",),
+        },
+        numeric=("range_miles", "battery_capacity_kwh", "year"),
+        default_columns=("make", "model", "year", "range_miles", "battery_capacity_kwh", "state"),
+        state_column="state",
+        filters={"make": EV_MAKES},
+        filler=(
+            "ev",
+            "evs",
+            "vehicle",
+            "vehicles",
+            "car",
+            "cars",
+            "electric",
+            "registered",
+            "registrations",
+        ),
+    )
+
+
+def tax_schema(table: str = "") -> TableSchema:
+    """Schema of the state_local_tax table; the table name must be configured"""
+    rates = ("combined_rate", "state_tax_rate", "avg_local_tax_rate")
+    return TableSchema(
+        table=table,
+        terms={
+            "combined rate": ("combined_rate",),
+            "combined tax rate": ("combined_rate",),
+            "combined sales tax rate": ("combined_rate",),
+            "total tax rate": ("combined_rate",),
+            "state tax rate": ("state_tax_rate",),
+            "state rate": ("state_tax_rate",),
+            "state sales tax rate": ("state_tax_rate",),
+            "sales tax rate": rates,
+            "sales tax": rates,
+            "tax rate": rates,
+            "local tax rate": ("avg_local_tax_rate",),
+            "local rate": ("avg_local_tax_rate",),
+            "average local tax rate": ("avg_local_tax_rate",),
+            "max local tax rate": ("max_local_tax_rate",),
+            "maximum local tax rate": ("max_local_tax_rate",),
+            "max local rate": ("max_local_tax_rate",),
+            "state tax rank": ("state_tax_rank",),
+            "state rank": ("state_tax_rank",),
+            "combined rank": ("combined_rank",),
+            "tax rank": ("combined_rank",),
+            "rank": ("combined_rank",),
+            "ranking": ("combined_rank",),
+            "state name": ("state_name",),
+            "state": ("state",),
+        },
+        numeric=(
+            "state_tax_rate",
+            "state_tax_rank",
+            "avg_local_tax_rate",
+            "combined_rate",
+            "combined_rank",
+            "max_local_tax_rate",
+        ),
+        default_columns=tuple(TAX_COLUMNS),
+        row_key="state",
+        state_column="state",
+        filler=("tax", "taxes"),
+        # One row per state plus DC
+        default_limit=51,
+    )
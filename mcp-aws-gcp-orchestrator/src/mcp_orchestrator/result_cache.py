@@ -0,0 +1,179 @@
+"""Query result caching"""
+
+import asyncio
+import functools
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from .disk_cache import DiskCache
+
+
+def normalize_query(query: str) -> str:
+    """Cache key form of a query: lowercase with collapsed whitespace"""
+    return " ".join(query.lower().split())
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory held by a cached tool result, in bytes"""
+    content = getattr(value, "content", value)
+    if isinstance(content, (list, tuple)):
+        return sum(estimate_size(item) for item in content) + sys.getsizeof(content)
+    text = getattr(content, "text", None)
+    if isinstance(text, str):
+        return len(text) + sys.getsizeof(content)
+    return sys.getsizeof(content)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires_at: float
+
+
+class ResultCache:
+    """
+    TTL cache for query results with a memory bound and request coalescing.
+
+    Entries expire after a per-call TTL and the least recently used entries
+    are evicted once the estimated size exceeds ``max_bytes``. Concurrent
+    misses for the same key share a single upstream load (single-flight);
+    the load runs in its own task so a cancelled caller does not abort it
+    for the others. Once every caller waiting on a load has been cancelled
+    the load itself is cancelled.
+
+    With a ``disk`` tier, a miss first checks the disk (shared by every
+    worker and kept across restarts) before loading, and loaded values are
+    written there in the background. Disk calls run in the default
+    executor.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        sizeof: Callable[[Any], int] = estimate_size,
+        cacheable: Optional[Callable[[Any], bool]] = None,
+        disk: Optional[DiskCache] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.disk = disk
+        self.sizeof = sizeof
+        self.cacheable = cacheable or (lambda value: True)
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a fresh cached value, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def put(self, key: Hashable, value: Any, ttl: float) -> None:
+        """Store a value, evicting least recently used entries to fit"""
+        size = self.sizeof(value)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _Entry(value, size, time.monotonic() + ttl)
+        self.size += size
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one entry, or everything when no key is given"""
+        if key is None:
+            self._entries.clear()
+            self.size = 0
+        elif key in self._entries:
+            self._remove(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    async def get_or_load(
+        self, key: Hashable, ttl: float, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return the cached value for key, loading it at most once concurrently"""
+        if ttl <= 0:
+            return await loader()
+
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(key, ttl, loader))
+            # Mark the exception retrieved even if every waiter was cancelled
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        else:
+            self.coalesced += 1
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            remaining = self._waiters.pop(task) - 1
+            if remaining:
+                self._waiters[task] = remaining
+            elif not task.done():
+                # Nobody is left to use the result
+                task.cancel()
+
+    async def _load(self, key: Hashable, ttl: float, loader: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        try:
+            if self.disk is not None:
+                stored = await loop.run_in_executor(None, self.disk.get, key)
+                if stored is not None:
+                    value, remaining = stored
+                    self.put(key, value, min(ttl, remaining))
+                    return value
+            value = await loader()
+        finally:
+            self._inflight.pop(key, None)
+        if self.cacheable(value):
+            self.put(key, value, ttl)
+            if self.disk is not None:
+                # Not awaited: callers need not wait for the disk write
+                loop.run_in_executor(None, functools.partial(self.disk.put, key, value, ttl))
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for monitoring"""
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
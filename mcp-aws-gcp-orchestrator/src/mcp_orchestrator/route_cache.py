@@ -0,0 +1,77 @@
+"""Routing decision memo"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class RouteCache:
+    """
+    Bounded LRU memo of routing decisions keyed on normalized query text.
+
+    ``key`` maps a raw query to its cache key (the router's normal form);
+    its results are themselves memoized per raw string, so an exact repeat
+    skips normalization as well as scoring. Decisions only depend on the
+    router's vocabulary and classifier, so entries never expire; call
+    ``clear()`` when either changes.
+    """
+
+    def __init__(self, key: Callable[[str], Hashable], maxsize: int = 4096):
+        if maxsize < 1:
+            raise ValueError("Route cache size must be at least 1")
+        self.maxsize = maxsize
+        self._normalize = key
+        self._keys: Dict[str, Hashable] = {}
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, query: str) -> Hashable:
+        """Cache key of a query"""
+        key = self._keys.get(query)
+        if key is None:
+            if len(self._keys) >= self.maxsize:
+                self._keys.clear()
+            key = self._keys[query] = self._normalize(query)
+        return key
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """The cached decision for a key, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, route: Any) -> None:
+        """Store a decision, evicting the least recently used past maxsize"""
+        self._entries[key] = route
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """Counters for monitoring"""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
@@ -0,0 +1,436 @@
+"""Compiled keyword router"""
+
+import re
+from dataclasses import dataclass
+from itertools import compress, count
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+from .sources import DataSource, SourceSpec
+
+US_STATES: Dict[str, str] = {
+    "alabama": "AL",
+    "alaska": "AK",
+    "arizona": "AZ",
+    "arkansas": "AR",
+    "california": "CA",
+    "colorado": "CO",
+    "connecticut": "CT",
+    "delaware": "DE",
+    "district of columbia": "DC",
+    "florida": "FL",
+    "georgia": "GA",
+    "hawaii": "HI",
+    "idaho": "ID",
+    "illinois": "IL",
+    "indiana": "IN",
+    "iowa": "IA",
+    "kansas": "KS",
+    "kentucky": "KY",
+    "louisiana": "LA",
+    "maine": "ME",
+    "maryland": "MD",
+    "massachusetts": "MA",
+    "michigan": "MI",
+    "minnesota": "MN",
+    "mississippi": "MS",
+    "missouri": "MO",
+    "montana": "MT",
+    "nebraska": "NE",
+    "nevada": "NV",
+    "new hampshire": "NH",
+    "new jersey": "NJ",
+    "new mexico": "NM",
+    "new york": "NY",
+    "north carolina": "NC",
+    "north dakota": "ND",
+    "ohio": "OH",
+    "oklahoma": "OK",
+    "oregon": "OR",
+    "pennsylvania": "PA",
+    "rhode island": "RI",
+    "south carolina": "SC",
+    "south dakota": "SD",
+    "tennessee": "TN",
+    "texas": "TX",
+    "utah": "UT",
+    "vermont": "VT",
+    "virginia": "VA",
+    "washington": "WA",
+    "west virginia": "WV",
+    "wisconsin": "WI",
+    "wyoming": "WY",
+}
+
+# Codes that are also common English words only count when written in capitals
+AMBIGUOUS_STATE_CODES = frozenset(
+    {
+        "AL",
+        "DE",
+        "HI",
+        "ID",
+        "IN",
+        "LA",
+        "MA",
+        "ME",
+        "OH",
+        "OK",
+        "OR",
+    }
+)
+
+
+@dataclass
+class RouteScores:
+    """Raw routing signals extracted from a query"""
+
+    # Nonzero score per source name, in registry order
+    scores: Dict[str, int]
+    states: Tuple[str, ...]
+    # Sources with a keyword or state-term match, in registry order
+    matched: Tuple[str, ...] = ()
+
+    @property
+    def has_state(self) -> bool:
+        return bool(self.states)
+
+    # Shorthands for the built-in sources
+
+    @property
+    def ev_score(self) -> int:
+        return self.scores.get(DataSource.GCP_BIGQUERY.value, 0)
+
+    @property
+    def tax_score(self) -> int:
+        return self.scores.get(DataSource.AWS_S3_TABLES.value, 0)
+
+    @property
+    def has_ev(self) -> bool:
+        return DataSource.GCP_BIGQUERY.value in self.matched
+
+    @property
+    def has_tax(self) -> bool:
+        return DataSource.AWS_S3_TABLES.value in self.matched
+
+
+_WORD = re.compile(r"[A-Za-z0-9]+")
+
+
+def _words(text: str) -> Tuple[str, ...]:
+    return tuple(_WORD.findall(text.lower()))
+
+
+def _contains_words(text: str, term: str) -> bool:
+    """Whether term occurs in text as a run of whole words"""
+    haystack, needle = _words(text), _words(term)
+    return any(
+        haystack[i : i + len(needle)] == needle for i in range(len(haystack) - len(needle) + 1)
+    )
+
+
+def _popcount(value: int) -> int:
+    return bin(value).count("1")
+
+
+# int.bit_count is 3.10+
+_popcount = getattr(int, "bit_count", _popcount)
+
+# Lookup payload of a word that starts a multi-word phrase
+_PHRASE = object()
+
+
+class QueryRouter:
+    """
+    Scores queries against any number of sources in a single pass.
+
+    All keywords, phrases and state names/codes of every source are
+    compiled at construction into one word-level phrase automaton:
+    single-word terms are one dict lookup per token and only tokens that
+    start a known phrase compare the words that follow. Every (source,
+    keyword) pair owns one bit, so a match just ORs the precomputed mask
+    of keywords it implies, and scoring walks only the bits that are set.
+    Routing cost therefore depends on the query, not on the number of
+    sources times keywords. Every token is looked up in one C-level
+    ``map`` pass and the Python loop only visits the tokens that matched;
+    scores are memoized per distinct match mask, since queries hit a
+    small set of keyword combinations.
+
+    Matching works on whole words, so "ev" no longer matches "every" and
+    "car" no longer matches "carolina", and keywords accept a plural suffix
+    ("taxes", "EVs"). A phrase match also sets the bits of every shorter
+    keyword it contains, which keeps presence-count scoring for queries
+    like "tax rate".
+    """
+
+    # Distinct match masks whose scores are kept
+    SCORE_MEMO_SIZE = 4096
+
+    def __init__(self, sources: Iterable[SourceSpec]):
+        self.sources = tuple(sources)
+        self.names = tuple(spec.name for spec in self.sources)
+
+        # Bit layout: each source's keywords, then one state-term and one
+        # boost flag per source that declares them
+        self._bit_source: List[int] = []
+        self._keyword_bits: List[Tuple[int, str]] = []
+        self.keyword_masks: List[int] = []
+        for index, spec in enumerate(self.sources):
+            mask = 0
+            for keyword in spec.keywords:
+                bit = len(self._bit_source)
+                self._bit_source.append(index)
+                self._keyword_bits.append((bit, keyword))
+                mask |= 1 << bit
+            self.keyword_masks.append(mask)
+        self.keyword_mask = (1 << len(self._bit_source)) - 1
+
+        n_bits = len(self._bit_source)
+        self.trigger_bits: List[int] = []
+        self.boost_bits: List[int] = []
+        for spec in self.sources:
+            self.trigger_bits.append(1 << n_bits if spec.state_terms else 0)
+            n_bits += bool(spec.state_terms)
+            self.boost_bits.append(1 << n_bits if spec.boost_terms else 0)
+            n_bits += bool(spec.boost_terms)
+        self.n_features = n_bits
+        self._state_sources = [i for i, spec in enumerate(self.sources) if spec.state_terms]
+        self._boost_sources = [i for i, spec in enumerate(self.sources) if spec.boost_terms]
+
+        # Single-word terms (and their plurals) resolve in one lookup; words
+        # that start a longer phrase go through _match
+        self._single: Dict[str, Union[int, str]] = {}
+        self._phrases: Dict[str, List[Tuple[Tuple[str, ...], bool, Union[int, str]]]] = {}
+
+        vocabulary = set()
+        for spec in self.sources:
+            vocabulary.update(spec.keywords, spec.state_terms, spec.boost_terms)
+        for term in vocabulary:
+            self._add(_words(term), True, self._term_mask(term))
+        for name, code in US_STATES.items():
+            self._add(_words(name), False, code)
+            self._add((code.lower(),), False, code)
+
+        plurals = {
+            word + suffix: payload
+            for word, payload in self._single.items()
+            if isinstance(payload, int)
+            for suffix in ("s", "es")
+        }
+
+        for first, entries in self._phrases.items():
+            entries.sort(key=lambda entry: len(entry[0]), reverse=True)
+            if first in self._single:
+                entries.append(((first,), False, self._single.pop(first)))
+        # Matcher form of each phrase: (length, middle words, accepted last words, payload)
+        self._matchers: Dict[str, List[Tuple[int, List[str], frozenset, Union[int, str]]]] = {
+            first: [
+                (len(words), list(words[1:-1]), self._last_words(words[-1], allow_plural), payload)
+                for words, allow_plural, payload in entries
+            ]
+            for first, entries in self._phrases.items()
+        }
+
+        for plural, payload in plurals.items():
+            if plural not in self._phrases:
+                self._single.setdefault(plural, payload)
+
+        # One lookup per token: its payload, or _PHRASE when it starts a phrase
+        self._lookup: Dict[str, object] = dict(self._single)
+        self._lookup.update(dict.fromkeys(self._phrases, _PHRASE))
+        # (mask, has states) -> (scores by name, matched names)
+        self._score_memo: Dict[Tuple[int, bool], Tuple[Dict[str, int], Tuple[str, ...]]] = {}
+
+    def _term_mask(self, term: str) -> int:
+        """Bits of every keyword and flag implied by a vocabulary term"""
+        mask = 0
+        for bit, keyword in self._keyword_bits:
+            if _contains_words(term, keyword):
+                mask |= 1 << bit
+        for spec, trigger_bit, boost_bit in zip(self.sources, self.trigger_bits, self.boost_bits):
+            if any(_contains_words(term, t) for t in spec.state_terms):
+                mask |= trigger_bit
+            if any(_contains_words(term, t) for t in spec.boost_terms):
+                mask |= boost_bit
+        return mask
+
+    def _add(self, words: Tuple[str, ...], allow_plural: bool, payload: Union[int, str]) -> None:
+        if len(words) == 1:
+            self._single[words[0]] = payload
+        else:
+            self._phrases.setdefault(words[0], []).append((words, allow_plural, payload))
+
+    @staticmethod
+    def _last_words(word: str, allow_plural: bool) -> frozenset:
+        return frozenset((word, word + "s", word + "es") if allow_plural else (word,))
+
+    def _match(self, lowered: List[str], i: int) -> Tuple[int, Union[int, str, None]]:
+        """Longest phrase starting at token i, as (length, payload)"""
+        for n, middle, lasts, payload in self._matchers[lowered[i]]:
+            if n == 1:
+                return 1, payload
+            last = i + n - 1
+            if last >= len(lowered) or lowered[last] not in lasts:
+                continue
+            if n == 2 or lowered[i + 1 : last] == middle:
+                return n, payload
+        return 0, None
+
+    def scan(self, query: str) -> Tuple[int, Tuple[str, ...]]:
+        """Single pass over the query: (keyword bit mask, state codes)"""
+        lowered = _WORD.findall(query.lower())
+        payloads = list(map(self._lookup.get, lowered))
+        mask = 0
+        states: List[str] = []
+        covered_end = 0
+
+        # Only tokens with a payload (none is falsy) reach the loop body
+        for i in compress(count(), payloads):
+            payload = payloads[i]
+            if payload is _PHRASE:
+                length, payload = self._match(lowered, i)
+                if not length or i + length <= covered_end:
+                    continue
+            else:
+                # Nested inside a longer match that already accounted for it
+                if i < covered_end:
+                    continue
+                length = 1
+
+            if payload.__class__ is int:
+                mask |= payload
+            else:
+                if (
+                    payload in AMBIGUOUS_STATE_CODES
+                    and len(lowered[i]) == 2
+                    and not self._is_capitalized_code(query, i, payload)
+                ):
+                    continue
+                if payload not in states:
+                    states.append(payload)
+            covered_end = i + length
+
+        return mask, tuple(states)
+
+    def normalize(self, query: str) -> str:
+        """
+        Canonical form of a query for routing purposes.
+
+        Lowercase words joined by single spaces, with punctuation dropped
+        and every state the scan recognizes (by name or code) replaced by
+        its code, so "Texas sales tax?" and "tx sales TAX" are the same
+        string. Two queries with the same normal form score identically;
+        ambiguous codes keep their capitals, since "OR" is a state and
+        "or" is not.
+        """
+        lowered = _WORD.findall(query.lower())
+        single = self._single
+        phrases = self._phrases
+        parts: List[str] = []
+        i = 0
+        while i < len(lowered):
+            word = lowered[i]
+            payload = single.get(word)
+            length = 1
+            if payload is None and word in phrases:
+                length, payload = self._match(lowered, i)
+            if payload is None:
+                parts.append(word)
+                i += 1
+                continue
+            if payload.__class__ is int:
+                # Keyword phrases stay verbatim, states inside them included
+                parts.extend(lowered[i : i + length])
+                i += length
+                continue
+            if (
+                payload in AMBIGUOUS_STATE_CODES
+                and len(word) == 2
+                and not self._is_capitalized_code(query, i, payload)
+            ):
+                parts.append(word)
+                i += 1
+                continue
+            parts.append(payload)
+            i += length
+        return " ".join(parts)
+
+    @staticmethod
+    def _is_capitalized_code(query: str, i: int, code: str) -> bool:
+        # Common words like "in" and "me" rarely appear in capitals at all
+        if code not in query:
+            return False
+        tokens = _WORD.findall(query)
+        return i < len(tokens) and tokens[i] == code
+
+    def scores_from_scan(self, mask: int, states: Tuple[str, ...]) -> RouteScores:
+        """Turn the output of scan() into routing scores"""
+        if not mask and not states:
+            return RouteScores(scores={}, states=states)
+        key = (mask, bool(states))
+        memo = self._score_memo.get(key)
+        if memo is None:
+            if len(self._score_memo) >= self.SCORE_MEMO_SIZE:
+                self._score_memo.clear()
+            memo = self._score_memo[key] = self._score_mask(mask, bool(states))
+        scores, matched = memo
+        return RouteScores(scores=dict(scores), states=states, matched=matched)
+
+    def _score_mask(self, mask: int, has_state: bool) -> Tuple[Dict[str, int], Tuple[str, ...]]:
+        """Scores and matched sources implied by a match mask"""
+        # Walk only the set bits; sources without a match never appear
+        keyword_scores: Dict[int, int] = {}
+        bits = mask & self.keyword_mask
+        bit_source = self._bit_source
+        while bits:
+            low = bits & -bits
+            owner = bit_source[low.bit_length() - 1]
+            keyword_scores[owner] = keyword_scores.get(owner, 0) + 1
+            bits ^= low
+
+        scores = dict(keyword_scores)
+        matched = set(keyword_scores)
+        trigger_bits = self.trigger_bits
+        for i in self._state_sources:
+            if not mask & trigger_bits[i]:
+                if has_state and not any(j != i for j in keyword_scores):
+                    scores[i] = scores.get(i, 0) + 3
+                continue
+            matched.add(i)
+            # Strong preference for a per-state source ONLY when its terms appear
+            if has_state:
+                scores[i] = scores.get(i, 0) + 10
+        for i in self._boost_sources:
+            if mask & self.boost_bits[i]:
+                scores[i] = scores.get(i, 0) + 3
+
+        names = self.names
+        ordered = {names[i]: scores[i] for i in sorted(scores)}
+        return ordered, tuple(names[i] for i in sorted(matched))
+
+    def score(self, query: str) -> RouteScores:
+        """Extract per-source scores and state mentions from a query"""
+        mask, states = self.scan(query)
+        return self.scores_from_scan(mask, states)
+
+    def score_batch(self, queries: Sequence[str]) -> List[RouteScores]:
+        """
+        Score many queries at once.
+
+        Each distinct query is scanned once (replayed logs repeat a lot),
+        and scores come from the per-mask memo shared with score(). A batch
+        without repeats is scored query by query, since keeping every scan
+        around would only cost time.
+        """
+        if len(set(queries)) == len(queries):
+            score = self.score
+            return [score(query) for query in queries]
+        scans: Dict[str, Tuple[int, Tuple[str, ...]]] = {}
+        seen = scans.get
+        scan, scores_from_scan = self.scan, self.scores_from_scan
+        results: List[RouteScores] = []
+        append = results.append
+        for query in queries:
+            found = seen(query)
+            if found is None:
+                found = scans[query] = scan(query)
+            append(scores_from_scan(found[0], found[1]))
+        return results
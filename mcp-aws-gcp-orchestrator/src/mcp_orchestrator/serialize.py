@@ -0,0 +1,196 @@
+"""Low-overhead JSON encoding and compression of API responses"""
+
+import gzip
+import json
+import math
+import re
+import secrets
+from typing import Any, Iterable, List, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional
+    zstandard = None
+
+# orjson can splice pre-encoded JSON only from 3.9.15 on (orjson.Fragment)
+_orjson_fragments = orjson is not None and hasattr(orjson, "Fragment")
+
+# Placeholder a RawJSON value is encoded as before its bytes are spliced in;
+# the nonce is drawn per call so text in the value can never forge one
+_RAW_MARKER = "\x00raw{nonce}:{index}\x00"
+
+GZIP_LEVEL = 5
+ZSTD_LEVEL = 3
+
+
+class RawJSON:
+    """Already-encoded JSON embedded in a response without parsing or re-encoding"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"RawJSON({len(self.data)} bytes)"
+
+
+def _is_json(text: str) -> bool:
+    """Whether text is a well-formed JSON array or object; the parsed value is thrown away"""
+    stripped = text.strip()
+    if len(stripped) < 2 or (stripped[0], stripped[-1]) not in (("[", "]"), ("{", "}")):
+        return False
+    try:
+        if orjson is not None:
+            orjson.loads(stripped)
+        else:
+            json.loads(stripped)
+    except ValueError:
+        return False
+    return True
+
+
+def raw_payload(content: Any) -> Optional[RawJSON]:
+    """
+    The JSON text of tool result content as RawJSON, or None.
+
+    Only content made of one text block holding a well-formed JSON array
+    or object qualifies, and the text is passed on exactly as the server
+    sent it. The text is still parsed once, purely as a validation pass:
+    nothing is built from the parsed value, but malformed server text would
+    otherwise corrupt the whole response body.
+    """
+    if not isinstance(content, (list, tuple)) or len(content) != 1:
+        return None
+    text = getattr(content[0], "text", None)
+    if not isinstance(text, str) or not _is_json(text):
+        return None
+    return RawJSON(text.encode("utf-8"))
+
+
+def _to_builtin(value: Any) -> Any:
+    """Stand-ins for values the C encoder cannot handle itself"""
+    model_dump = getattr(value, "model_dump", None)
+    if model_dump is not None:
+        # Same form FastAPI's jsonable_encoder gives pydantic models
+        return model_dump(mode="json", by_alias=True)
+    to_json = getattr(value, "to_json", None)
+    if to_json is not None:
+        return to_json()
+    return str(value)
+
+
+def _finite(value: Any) -> Any:
+    """``value`` with NaN and infinities replaced by None, as orjson writes them"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def encode_json(value: Any) -> bytes:
+    """
+    ``value`` as compact UTF-8 JSON.
+
+    Encoding goes straight through orjson when it is installed (with
+    fragment support), otherwise through the stdlib C encoder; either way
+    there is no jsonable_encoder pass. RawJSON values are spliced into the
+    output unchanged, and the parts are joined into one buffer sized for
+    the whole body. NaN and infinities are written as null on both paths.
+    """
+    if _orjson_fragments:
+
+        def default(obj: Any) -> Any:
+            if isinstance(obj, RawJSON):
+                return orjson.Fragment(obj.data)
+            return _to_builtin(obj)
+
+        return orjson.dumps(value, default=default)
+
+    raw: List[bytes] = []
+    nonce = secrets.token_hex(8)
+    finite = False
+
+    def default(obj: Any) -> Any:
+        if isinstance(obj, RawJSON):
+            raw.append(obj.data)
+            return _RAW_MARKER.format(nonce=nonce, index=len(raw) - 1)
+        return _finite(_to_builtin(obj)) if finite else _to_builtin(obj)
+
+    encoder = json.JSONEncoder(
+        ensure_ascii=False, separators=(",", ":"), allow_nan=False, default=default
+    )
+    try:
+        text = encoder.encode(value)
+    except ValueError as e:
+        if not str(e).startswith("Out of range float"):
+            raise
+        # Only values holding NaN or an infinity pay for the extra pass
+        raw.clear()
+        finite = True
+        text = encoder.encode(_finite(value))
+    body = text.encode("utf-8")
+    if not raw:
+        return body
+    marker = re.compile(rb'"\\u0000raw' + nonce.encode("ascii") + rb':(\d+)\\u0000"')
+    parts: List[bytes] = []
+    start = 0
+    for match in marker.finditer(body):
+        parts.append(body[start : match.start()])
+        parts.append(raw[int(match.group(1))])
+        start = match.end()
+    parts.append(body[start:])
+    return b"".join(parts)
+
+
+def available_encodings() -> List[str]:
+    """Content codings this process can produce, preferred first"""
+    return (["zstd"] if zstandard is not None else []) + ["gzip"]
+
+
+def choose_encoding(
+    accept_encoding: Optional[str], available: Optional[Iterable[str]] = None
+) -> Optional[str]:
+    """
+    The content coding to use for an Accept-Encoding header, or None.
+
+    Codings with ``q=0`` are refused; among the rest the server's
+    preference order (zstd, then gzip) decides. ``*`` accepts any coding
+    not listed.
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, number = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(number)
+                except ValueError:
+                    q = 0.0
+        if name:
+            weights[name.strip().lower()] = q
+    for coding in available if available is not None else available_encodings():
+        if weights.get(coding, weights.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """``body`` compressed with a coding returned by choose_encoding"""
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported content coding: {encoding}")
@@ -0,0 +1,385 @@
+"""Warm, reusable MCP client sessions"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PooledSession:
+    """
+    A long-lived MCP server subprocess with an initialized ClientSession.
+
+    The stdio transport and session contexts are entered and exited inside a
+    dedicated task, so the session can be shared by any number of callers
+    while anyio's cancel scopes stay bound to the task that created them.
+    """
+
+    def __init__(
+        self,
+        params: StdioServerParameters,
+        message_handler: Optional[Callable[[Any], Awaitable[None]]] = None,
+        on_stage: Optional[Callable[[str, float], None]] = None,
+    ):
+        self.params = params
+        self.message_handler = message_handler
+        # Receives (stage, seconds) for the spawn and initialize stages
+        self.on_stage = on_stage
+        self.session: Optional[ClientSession] = None
+        self._task: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._closing: Optional[asyncio.Event] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def alive(self) -> bool:
+        """Whether the subprocess is running and the session is usable"""
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self, timeout: float) -> None:
+        """Spawn the server subprocess and run the MCP handshake"""
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except BaseException:
+            await self.close()
+            raise
+        if not self.alive:
+            raise ConnectionError(
+                f"MCP server {self.params.command!r} failed to start: {self._error}"
+            )
+
+    async def _run(self) -> None:
+        try:
+            start = time.perf_counter()
+            async with stdio_client(self.params) as (read, write):
+                async with ClientSession(
+                    read, write, message_handler=self.message_handler
+                ) as session:
+                    spawned = time.perf_counter()
+                    await session.initialize()
+                    if self.on_stage is not None:
+                        self.on_stage("spawn", spawned - start)
+                        self.on_stage("initialize", time.perf_counter() - spawned)
+                    self.session = session
+                    self._ready.set()
+                    await self._closing.wait()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def ping(self, timeout: float) -> bool:
+        """Check that the server still answers requests"""
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception:
+            return False
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Shut down the session and terminate the subprocess"""
+        if self._task is None:
+            return
+        self._closing.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            self._task.cancel()
+        self.session = None
+
+
+class SessionPool:
+    """
+    Pool of warm MCP sessions for a single data source.
+
+    Sessions are spawned once and leased to concurrent queries. Dead
+    subprocesses are detected on lease and by a periodic health check, and
+    are replaced in the background so the pool stays at its target size.
+    It also exposes ``call_tool``/``list_tools`` so it can stand in for a
+    single ClientSession.
+
+    ``spares`` extra sessions are spawned and initialized alongside the
+    pool but never leased: when a session dies a spare takes its place
+    at once, and the spare is replaced in the background, so no query
+    waits for a server to start.
+    """
+
+    def __init__(
+        self,
+        params: StdioServerParameters,
+        size: int = 2,
+        startup_timeout: float = 30.0,
+        health_check_interval: float = 30.0,
+        ping_timeout: float = 5.0,
+        message_handler: Optional[Callable[[Any], Awaitable[None]]] = None,
+        metrics: Optional[Metrics] = None,
+        name: str = "",
+        spares: int = 0,
+    ):
+        if size < 1:
+            raise ValueError("Session pool size must be at least 1")
+        self.params = params
+        self.size = size
+        self.startup_timeout = startup_timeout
+        self.health_check_interval = health_check_interval
+        self.ping_timeout = ping_timeout
+        self.message_handler = message_handler
+        self.metrics = metrics
+        self.name = name
+        self.spares = max(0, spares)
+
+        self._sessions: List[PooledSession] = []
+        self._spares: List[PooledSession] = []
+        self._spares_spawning = 0
+        self._idle: Optional[asyncio.Queue] = None
+        self._spawning = 0
+        self._health_task: Optional[asyncio.Task] = None
+        self._background: set = set()
+        self._closed = False
+
+    @property
+    def warm(self) -> int:
+        """Number of live sessions currently held by the pool"""
+        return sum(1 for pooled in self._sessions if pooled.alive)
+
+    @property
+    def spare(self) -> int:
+        """Number of live standby sessions"""
+        return sum(1 for pooled in self._spares if pooled.alive)
+
+    @property
+    def idle(self) -> int:
+        """Number of sessions waiting to be leased"""
+        return self._idle.qsize() if self._idle is not None else 0
+
+    def _ensure_queue(self) -> asyncio.Queue:
+        # Created lazily so the queue binds to the running loop
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        return self._idle
+
+    async def start(self) -> int:
+        """Spawn sessions up to the pool size plus spares, concurrently; returns how many came up"""
+        self._ensure_queue()
+        missing = self.size - len(self._sessions) - self._spawning
+        spares = self.spares - len(self._spares) - self._spares_spawning
+        results, _ = await asyncio.gather(
+            asyncio.gather(
+                *(self._spawn() for _ in range(max(missing, 0))), return_exceptions=True
+            ),
+            asyncio.gather(
+                *(self._spawn_spare() for _ in range(max(spares, 0))), return_exceptions=True
+            ),
+        )
+        for pooled in results:
+            if isinstance(pooled, PooledSession):
+                self._idle.put_nowait(pooled)
+
+        if self._health_task is None and self.health_check_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+        return self.warm
+
+    async def _launch(self) -> PooledSession:
+        pooled = PooledSession(self.params, self.message_handler, self._on_stage)
+        await pooled.start(self.startup_timeout)
+        if self._closed:
+            await pooled.close()
+            raise ConnectionError("Session pool is closed")
+        return pooled
+
+    async def _spawn(self) -> PooledSession:
+        self._spawning += 1
+        try:
+            pooled = await self._launch()
+        finally:
+            self._spawning -= 1
+        self._sessions.append(pooled)
+        return pooled
+
+    async def _spawn_spare(self) -> PooledSession:
+        self._spares_spawning += 1
+        try:
+            pooled = await self._launch()
+        finally:
+            self._spares_spawning -= 1
+        self._spares.append(pooled)
+        return pooled
+
+    async def _replenish_spares(self) -> None:
+        while not self._closed and len(self._spares) + self._spares_spawning < self.spares:
+            try:
+                await self._spawn_spare()
+            except Exception as e:
+                logger.warning(
+                    "Failed to spawn standby MCP session for %s: %s", self.params.command, e
+                )
+                if self.metrics is not None:
+                    self.metrics.inc("errors", source=self.name, stage="spawn")
+                return
+
+    def _promote_spare(self) -> bool:
+        """Put a live spare into service in place of a lost session"""
+        while self._spares:
+            spare = self._spares.pop(0)
+            if spare.alive:
+                self._sessions.append(spare)
+                self._ensure_queue().put_nowait(spare)
+                if self.metrics is not None:
+                    self.metrics.inc("spare_promotions", source=self.name)
+                self._run_background(self._replenish_spares())
+                return True
+            self._run_background(spare.close())
+        return False
+
+    def _on_stage(self, stage: str, seconds: float) -> None:
+        if self.metrics is not None:
+            self.metrics.observe(stage, seconds, self.name)
+
+    def _discard(self, pooled: PooledSession) -> None:
+        if pooled in self._sessions:
+            self._sessions.remove(pooled)
+        self._run_background(pooled.close())
+        if not self._closed and not self._promote_spare():
+            self._run_background(self._replenish())
+
+    async def _replenish(self) -> None:
+        if len(self._sessions) + self._spawning >= self.size:
+            return
+        try:
+            pooled = await self._spawn()
+        except Exception as e:
+            logger.warning("Failed to respawn MCP session for %s: %s", self.params.command, e)
+            if self.metrics is not None:
+                self.metrics.inc("errors", source=self.name, stage="spawn")
+            # Wake one waiter so it retries the spawn itself instead of
+            # blocking on a queue nothing will refill
+            pooled = None
+        self._ensure_queue().put_nowait(pooled)
+
+    def _run_background(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _checkout(self) -> PooledSession:
+        idle = self._ensure_queue()
+        while True:
+            if self._closed:
+                raise ConnectionError("Session pool is closed")
+            try:
+                pooled = idle.get_nowait()
+            except asyncio.QueueEmpty:
+                if len(self._sessions) + self._spawning < self.size:
+                    return await self._spawn()
+                pooled = await idle.get()
+            if pooled is None:
+                continue
+            if pooled.alive:
+                return pooled
+            self._discard(pooled)
+
+    def _checkin(self, pooled: PooledSession) -> None:
+        if pooled.alive and not self._closed:
+            self._ensure_queue().put_nowait(pooled)
+        else:
+            self._discard(pooled)
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[ClientSession]:
+        """Borrow a warm session for the duration of the block"""
+        start = time.perf_counter()
+        pooled = await self._checkout()
+        self._on_stage("lease", time.perf_counter() - start)
+        try:
+            yield pooled.session
+        finally:
+            self._checkin(pooled)
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+        """Call a tool on any available session; cancelling the call stops the server's work"""
+        start = time.perf_counter()
+        pooled = await self._checkout()
+        self._on_stage("lease", time.perf_counter() - start)
+        try:
+            result = await pooled.session.call_tool(name, arguments=arguments)
+        except asyncio.CancelledError:
+            # The SDK has no public way to cancel a single request, so the
+            # session and the server process working on it are dropped; a
+            # spare or a fresh spawn takes their place
+            self._discard(pooled)
+            raise
+        except BaseException:
+            self._checkin(pooled)
+            raise
+        self._checkin(pooled)
+        return result
+
+    async def list_tools(self) -> Any:
+        """List tools on any available session"""
+        async with self.lease() as session:
+            return await session.list_tools()
+
+    async def health_check(self) -> int:
+        """Ping idle sessions, replacing any that fail; returns the warm count"""
+        idle = self._ensure_queue()
+        # One session is out of the queue at a time, so leases meanwhile still
+        # find the others; wake markers go back for the waiters they are meant for
+        for _ in range(idle.qsize()):
+            try:
+                pooled = idle.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if pooled is None:
+                idle.put_nowait(None)
+            elif await pooled.ping(self.ping_timeout):
+                self._checkin(pooled)
+            else:
+                self._discard(pooled)
+
+        spares = list(self._spares)
+        healthy = await asyncio.gather(*(pooled.ping(self.ping_timeout) for pooled in spares))
+        for pooled, ok in zip(spares, healthy):
+            if not ok and pooled in self._spares:
+                self._spares.remove(pooled)
+                self._run_background(pooled.close())
+
+        # Top up if earlier spawns failed
+        for _ in range(self.size - len(self._sessions) - self._spawning):
+            if not self._promote_spare():
+                self._run_background(self._replenish())
+        self._run_background(self._replenish_spares())
+        return self.warm
+
+    async def _health_loop(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self.health_check()
+            except Exception as e:
+                logger.warning("MCP session health check failed for %s: %s", self.name, e)
+
+    async def close(self) -> None:
+        """Close every session and stop background tasks"""
+        self._closed = True
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        sessions, self._sessions = self._sessions + self._spares, []
+        self._spares = []
+        await asyncio.gather(*(pooled.close() for pooled in sessions), return_exceptions=True)
+        for task in list(self._background):
+            task.cancel()
@@ -0,0 +1,260 @@
+"""Data source registry"""
+
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from mcp import StdioServerParameters
+
+from .pushdown import TableSchema, ev_schema, tax_schema
+
+
+class DataSource(str, Enum):
+    """
+    Built-in data sources.
+
+    Members are also plain strings equal to their value, so they can be used
+    interchangeably with source names as registry and dict keys.
+    """
+
+    GCP_BIGQUERY = "gcp_bigquery"
+    AWS_S3_TABLES = "aws_s3_tables"
+
+
+# A built-in DataSource or the name of any registered source
+Source = Union[DataSource, str]
+
+
+def source_name(source: Source) -> str:
+    """Registry name of a source"""
+    return source.value if isinstance(source, DataSource) else source
+
+
+def as_source(name: str) -> Source:
+    """The DataSource member for a built-in name, otherwise the name itself"""
+    try:
+        return DataSource(name)
+    except ValueError:
+        return name
+
+
+# Routing vocabularies of the built-in sources
+EV_KEYWORDS = [
+    "ev",
+    "electric vehicle",
+    "charging",
+    "battery",
+    "tesla",
+    "vehicle",
+    "car",
+    "automotive",
+    "range",
+    "kwh",
+    "model",
+    "registration",
+    "charging station",
+]
+
+TAX_KEYWORDS = [
+    "tax",
+    "tax rate",
+    "sales tax",
+    "local tax",
+    "combined tax",
+    "tax rank",
+    "tax ranking",
+    "state tax",
+    "revenue",
+    "taxation",
+    "fiscal",
+    "state-wise",
+    "statewise",
+]
+
+# Terms that make a state mention a tax lookup, and phrases that are
+# unambiguously about tax rates
+TAX_TRIGGER_TERMS = ["tax", "rate", "ranking", "revenue"]
+TAX_BOOST_TERMS = ["tax rate", "sales tax", "combined rate", "tax rank"]
+
+
+@dataclass
+class ReplicaSpec:
+    """One replica of a source's server; unset fields fall back to the source's"""
+
+    name: str = ""
+    command: List[str] = field(default_factory=list)
+    env: Optional[Dict[str, str]] = None
+
+    @classmethod
+    def from_value(cls, value: Union["ReplicaSpec", Dict, str, List[str]]) -> "ReplicaSpec":
+        """Accept a spec, a JSON object, a command string or an argument list"""
+        if isinstance(value, ReplicaSpec):
+            return value
+        if isinstance(value, dict):
+            data = dict(value)
+            if isinstance(data.get("command"), str):
+                data["command"] = data["command"].split()
+            return cls(**data)
+        if isinstance(value, str):
+            return cls(command=value.split())
+        return cls(command=list(value))
+
+
+@dataclass
+class SourceSpec:
+    """
+    Everything the orchestrator needs to know about one MCP backend.
+
+    ``keywords`` are scored one point per distinct match. A source with
+    ``state_terms`` holds per-state data: a query naming a state and one of
+    those terms scores +10 for it, and a query naming a state that no other
+    source's keywords match scores +3. Each ``boost_terms`` phrase adds +3.
+
+    With ``replicas`` the source runs several copies of its server (e.g.
+    different service accounts or regions), each with its own pool of
+    ``pool_size`` sessions, and calls are balanced across them with the
+    ``balance`` strategy (``least_outstanding`` or ``ewma``).
+
+    A ``schema`` describing the source's table lets recognized questions be
+    sent to it as SQL instead of as written, once the schema names the table.
+    """
+
+    name: str
+    command: List[str] = field(default_factory=list)
+    env: Optional[Dict[str, str]] = None
+    title: str = ""
+    description: str = ""
+    keywords: List[str] = field(default_factory=list)
+    state_terms: List[str] = field(default_factory=list)
+    boost_terms: List[str] = field(default_factory=list)
+    pool_size: int = 2
+    tool_cache_ttl: float = 300.0
+    query_timeout: float = 30.0
+    cache_ttl: float = 300.0
+    max_concurrency: Optional[int] = None
+    replicas: List[ReplicaSpec] = field(default_factory=list)
+    balance: str = "least_outstanding"
+    schema: Optional[TableSchema] = None
+    # Receives queries no source scores higher than the others on
+    default: bool = False
+
+    def __post_init__(self):
+        self.title = self.title or self.name
+        self.description = self.description or self.title
+        self.replicas = [ReplicaSpec.from_value(replica) for replica in self.replicas]
+        if isinstance(self.schema, dict):
+            self.schema = TableSchema.from_dict(self.schema)
+        if self.max_concurrency is None:
+            self.max_concurrency = self.pool_size * max(1, len(self.replicas))
+
+    @property
+    def params(self) -> StdioServerParameters:
+        """stdio parameters for spawning the server"""
+        if not self.command:
+            raise ValueError(f"No command configured for source {self.name!r}")
+        return StdioServerParameters(
+            command=self.command[0], args=self.command[1:], env=self.env or None
+        )
+
+    @property
+    def replica_params(self) -> List[Tuple[str, StdioServerParameters]]:
+        """(replica name, stdio parameters) for each replica, or just the source's own"""
+        if not self.replicas:
+            return [(self.name, self.params)]
+        params = []
+        for i, replica in enumerate(self.replicas):
+            command = replica.command or self.command
+            if not command:
+                raise ValueError(f"No command configured for replica {i} of source {self.name!r}")
+            # Replica env entries override the source's
+            env = {**(self.env or {}), **(replica.env or {})}
+            params.append(
+                (
+                    replica.name or f"{self.name}-{i}",
+                    StdioServerParameters(command=command[0], args=command[1:], env=env or None),
+                )
+            )
+        return params
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SourceSpec":
+        """Build a spec from a JSON object; a string command is split on whitespace"""
+        data = dict(data)
+        if isinstance(data.get("command"), str):
+            data["command"] = data["command"].split()
+        return cls(**data)
+
+
+class SourceRegistry:
+    """Ordered collection of SourceSpecs keyed by name"""
+
+    def __init__(self, specs: Iterable[SourceSpec] = ()):
+        self._specs: Dict[str, SourceSpec] = {}
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec: SourceSpec) -> None:
+        if spec.name in self._specs:
+            raise ValueError(f"Source {spec.name!r} is already registered")
+        self._specs[spec.name] = spec
+
+    def __getitem__(self, source: Source) -> SourceSpec:
+        return self._specs[source_name(source)]
+
+    def get(self, source: Source) -> Optional[SourceSpec]:
+        return self._specs.get(source_name(source))
+
+    def __contains__(self, source: object) -> bool:
+        return isinstance(source, str) and source_name(source) in self._specs
+
+    def __iter__(self) -> Iterator[SourceSpec]:
+        return iter(self._specs.values())
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    @property
+    def default(self) -> SourceSpec:
+        """The fallback source for ambiguous queries (the first registered unless marked)"""
+        for spec in self._specs.values():
+            if spec.default:
+                return spec
+        return next(iter(self._specs.values()))
+
+
+def builtin_sources(
+    pool_size: int = 2, tool_cache_ttl: float = 300.0, ev_table: str = "", tax_table: str = ""
+) -> List[SourceSpec]:
+    """Specs for the BigQuery EV and S3 Tables tax servers; without table names no SQL is sent"""
+    return [
+        SourceSpec(
+            name=DataSource.GCP_BIGQUERY.value,
+            command=["uvx", "--from", "mcp-server-bigquery", "mcp-server-bigquery"],
+            title="GCP BigQuery",
+            description="EV-related",
+            keywords=list(EV_KEYWORDS),
+            pool_size=pool_size,
+            tool_cache_ttl=tool_cache_ttl,
+            cache_ttl=300.0,
+            schema=ev_schema(ev_table),
+            default=True,
+        ),
+        SourceSpec(
+            name=DataSource.AWS_S3_TABLES.value,
+            command=["awslabss3-tables-mcp-server"],
+            title="S3 Tables",
+            description="tax/state-related",
+            keywords=list(TAX_KEYWORDS),
+            state_terms=list(TAX_TRIGGER_TERMS),
+            boost_terms=list(TAX_BOOST_TERMS),
+            pool_size=pool_size,
+            tool_cache_ttl=tool_cache_ttl,
+            # Tax data changes rarely so it is kept for hours
+            cache_ttl=6 * 3600.0,
+            schema=tax_schema(tax_table),
+        ),
+    ]
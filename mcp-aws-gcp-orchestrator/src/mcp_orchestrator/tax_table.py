@@ -0,0 +1,150 @@
+"""In-process copy of the state_local_tax table"""
+
+import json
+import re
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from mcp import types
+
+from .content import rows_from_content
+
+
+class StateTaxRecord(NamedTuple):
+    """One row of state_local_tax"""
+
+    state: str
+    state_name: str
+    state_tax_rate: Optional[float]
+    state_tax_rank: Optional[int]
+    avg_local_tax_rate: Optional[float]
+    combined_rate: Optional[float]
+    combined_rank: Optional[int]
+    max_local_tax_rate: Optional[float]
+
+
+TAX_COLUMNS = StateTaxRecord._fields
+
+# The table the S3 Tables server is documented to serve, used when the tax
+# source's schema does not name one
+TAX_TABLE = "state_local_tax"
+
+_CONVERTERS = {
+    "state_tax_rate": float,
+    "state_tax_rank": int,
+    "avg_local_tax_rate": float,
+    "combined_rate": float,
+    "combined_rank": int,
+    "max_local_tax_rate": float,
+}
+
+# Words that make a question more than a per-state lookup
+_NON_LOOKUP_WORDS = frozenset(
+    {
+        "highest",
+        "lowest",
+        "top",
+        "bottom",
+        "average",
+        "avg",
+        "mean",
+        "most",
+        "least",
+        "higher",
+        "lower",
+        "greater",
+        "less",
+        "than",
+        "above",
+        "below",
+        "between",
+        "sum",
+        "total",
+    }
+)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _convert(column: str, value: Any) -> Any:
+    if value is None or value == "":
+        return None
+    converter = _CONVERTERS.get(column)
+    if converter is None:
+        return str(value)
+    try:
+        return converter(float(value)) if converter is int else converter(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class StateTaxTable:
+    """
+    Materialized copy of the S3 Tables ``state_local_tax`` table.
+
+    The whole table (one row per state plus DC) is loaded through the AWS
+    session into NamedTuple records indexed by state code, and refreshed
+    periodically. Simple per-state lookups ("tax rate in TX", "rank of
+    CO") are answered from memory; anything that needs ranking or
+    aggregation across states still goes to the server. ``table`` is the
+    name the table is queried under, the tax source's configured one.
+    """
+
+    def __init__(self, table: str = TAX_TABLE, refresh_interval: float = 3600.0):
+        self.table = table
+        self.load_query = f"SELECT {', '.join(TAX_COLUMNS)} FROM {table}"
+        self.refresh_interval = refresh_interval
+        self.by_state: Dict[str, StateTaxRecord] = {}
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    @property
+    def fresh(self) -> bool:
+        """Loaded and not past twice the refresh interval (a missed refresh is tolerated)"""
+        if self.loaded_at is None:
+            return False
+        return time.monotonic() - self.loaded_at < 2 * self.refresh_interval
+
+    def load_rows(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Replace the table contents; returns the number of states loaded"""
+        by_state = {}
+        for row in rows:
+            row = {str(key).lower(): value for key, value in row.items()}
+            code = str(row.get("state") or "").upper()
+            if not code:
+                continue
+            by_state[code] = StateTaxRecord(
+                *(_convert(column, row.get(column)) for column in TAX_COLUMNS)
+            )
+        # Swap in one assignment so readers never see a half-loaded table
+        self.by_state = by_state
+        self.loaded_at = time.monotonic()
+        return len(by_state)
+
+    async def refresh(self, session: Any, tool_name: str) -> int:
+        """Reload the table through an MCP session or pool"""
+        result = await session.call_tool(tool_name, arguments={"query": self.load_query})
+        if getattr(result, "isError", False):
+            raise RuntimeError(f"Loading {self.table} failed: {result.content}")
+        return self.load_rows(rows_from_content(result.content))
+
+    def lookup(self, query: str, states: Sequence[str]) -> Optional[List[Dict[str, Any]]]:
+        """Rows for the states a simple lookup asks about, or None to defer to the server"""
+        if not states or not self.fresh:
+            return None
+        if any(word in _NON_LOOKUP_WORDS for word in _WORD.findall(query.lower())):
+            return None
+        records = [self.by_state.get(code) for code in states]
+        if any(record is None for record in records):
+            return None
+        return [record._asdict() for record in records]
+
+    def lookup_result(self, query: str, states: Sequence[str]) -> Optional[types.CallToolResult]:
+        """lookup() wrapped as a tool result shaped like the server's answer"""
+        rows = self.lookup(query, states)
+        if rows is None:
+            return None
+        return types.CallToolResult(content=[types.TextContent(type="text", text=json.dumps(rows))])
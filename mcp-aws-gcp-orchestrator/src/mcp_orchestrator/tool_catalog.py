@@ -0,0 +1,68 @@
+"""Cached MCP tool discovery"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from mcp import types
+
+
+class ToolCatalog:
+    """
+    Cached tool listing for one MCP server.
+
+    The catalog is filled once at connect time and refreshed only when it
+    expires or when the server sends a ``notifications/tools/list_changed``
+    notification, so the query path never has to call ``list_tools()``.
+    The tool used for queries is resolved whenever the listing changes.
+    """
+
+    QUERY_TOOL_NAMES = ("query", "execute_query", "run_query", "sql_query")
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        # Updated in place so callers may hold on to the dict
+        self.tools: Dict[str, Any] = {}
+        self.query_tool: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def stale(self) -> bool:
+        """Whether the listing must be fetched before use"""
+        if self.loaded_at is None:
+            return True
+        return self.ttl > 0 and time.monotonic() - self.loaded_at > self.ttl
+
+    def update(self, tools: list) -> None:
+        """Replace the cached listing and resolve the query tool"""
+        self.tools.clear()
+        self.tools.update((tool.name, tool) for tool in tools)
+        self.query_tool = self._resolve_query_tool()
+        self.loaded_at = time.monotonic()
+
+    def _resolve_query_tool(self) -> Optional[str]:
+        for tool_name in self.QUERY_TOOL_NAMES:
+            if tool_name in self.tools:
+                return tool_name
+        return next(iter(self.tools), None)
+
+    def invalidate(self) -> None:
+        """Force a refresh before the next use"""
+        self.loaded_at = None
+
+    async def refresh(self, session: Any, force: bool = False) -> None:
+        """Fetch the tool listing if stale; concurrent callers share one fetch"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if force or self.stale:
+                result = await session.list_tools()
+                self.update(result.tools)
+
+    async def handle_message(self, message: Any) -> None:
+        """ClientSession message handler that tracks tool list changes"""
+        if isinstance(message, types.ServerNotification) and isinstance(
+            message.root, types.ToolListChangedNotification
+        ):
+            self.invalidate()
@@ -0,0 +1,142 @@
+"""Tests for per-source admission control"""
+
+import asyncio
+import time
+
+import pytest
+from mcp import types
+
+from mcp_orchestrator import MCPOrchestrator, DataSource
+from mcp_orchestrator.admission import AdmissionController, DeadlineExceeded, QueueFull
+
+
+class SlowPool:
+    """Answers call_tool after a delay and records cancellations"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = 0
+
+    async def call_tool(self, name, arguments=None):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=arguments["query"])]
+        )
+
+
+def make_orchestrator(pool, **kwargs):
+    orchestrator = MCPOrchestrator(**kwargs)
+    orchestrator.pools = {DataSource.GCP_BIGQUERY: pool, DataSource.AWS_S3_TABLES: pool}
+    for catalog in orchestrator.catalogs.values():
+        catalog.update([types.Tool(name="query", inputSchema={"type": "object"})])
+    return orchestrator
+
+
+async def test_limit_and_fifo_handoff():
+    """Test only limit holders run at once and waiters are served in order"""
+    controller = AdmissionController(limit=1, max_queue=5)
+    order = []
+
+    async def job(i):
+        async with controller.slot():
+            order.append(i)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(job(i) for i in range(4)))
+    assert order == [0, 1, 2, 3]
+    assert controller.active == 0
+    assert controller.admitted == 4
+
+
+async def test_queue_full_rejected():
+    """Test requests beyond the wait queue are rejected with a retry hint"""
+    controller = AdmissionController(limit=1, max_queue=1)
+    await controller.acquire()
+    waiter = asyncio.ensure_future(controller.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(QueueFull) as excinfo:
+        await controller.acquire()
+    assert excinfo.value.retry_after > 0
+    assert excinfo.value.retry_after_header == "1"
+
+    controller.release()
+    await waiter
+    controller.release()
+    assert controller.active == 0
+
+
+async def test_deadline_rejected_up_front_and_while_queued():
+    """Test deadline-aware rejection both before and during the wait"""
+    controller = AdmissionController(limit=1, max_queue=10)
+    controller.service_time = 1.0
+    await controller.acquire()
+
+    # Expected wait (1s) already overruns a 0.1s deadline
+    with pytest.raises(DeadlineExceeded):
+        await controller.acquire(deadline=time.monotonic() + 0.1)
+    assert controller.waiting == 0
+
+    controller.service_time = 0.01
+    with pytest.raises(DeadlineExceeded):
+        await controller.acquire(deadline=time.monotonic() + 0.05)
+    assert controller.waiting == 0
+    assert controller.timed_out == 1
+
+    controller.release()
+    assert controller.active == 0
+
+
+async def test_request_timeout_cancels_upstream_call():
+    """Test a request past its deadline cancels the in-flight tool call"""
+    pool = SlowPool(delay=5.0)
+    orchestrator = make_orchestrator(pool)
+    with pytest.raises(asyncio.TimeoutError):
+        await orchestrator.process_query("What is the range of Tesla Model 3?", timeout=0.05)
+    await asyncio.sleep(0)
+    assert pool.cancelled == 1
+    assert orchestrator.admission[DataSource.GCP_BIGQUERY].active == 0
+
+
+async def test_burst_rejected_beyond_queue():
+    """Test a burst larger than limit plus queue gets Overloaded errors"""
+    pool = SlowPool(delay=0.05)
+    orchestrator = make_orchestrator(
+        pool,
+        max_concurrency={DataSource.GCP_BIGQUERY: 2},
+        max_queue=3,
+        cache_ttls={DataSource.GCP_BIGQUERY: 0},
+    )
+    results = await asyncio.gather(
+        *(orchestrator.process_query(f"Tesla range {i}") for i in range(10)), return_exceptions=True
+    )
+    rejected = [r for r in results if isinstance(r, QueueFull)]
+    assert len(rejected) == 5
+    assert pool.calls == 5
+
+
+async def test_multi_source_raises_when_all_rejected():
+    """Test a multi-source query surfaces Overloaded when no source admitted it"""
+    orchestrator = make_orchestrator(SlowPool(delay=1.0), max_queue=0)
+    for controller in orchestrator.admission.values():
+        controller.active = controller.limit
+    with pytest.raises(QueueFull):
+        await orchestrator.process_multi_source("Tesla sales tax rate in Texas")
+
+
+def test_metric_families_are_contiguous():
+    """Test each admission gauge's samples are rendered together"""
+    orchestrator = MCPOrchestrator()
+    names = [
+        line.split("{")[0].split(" ")[0]
+        for line in orchestrator.metrics.render().splitlines()
+        if line.startswith("orchestrator_admission_")
+    ]
+    assert names == sorted(names, key=names.index)
+    assert len(names) == 2 * len(orchestrator.admission)
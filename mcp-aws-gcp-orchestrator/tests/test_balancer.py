@@ -0,0 +1,152 @@
+"""Tests for load balancing across server replicas"""
+
+import asyncio
+
+import pytest
+from mcp import types
+
+from mcp_orchestrator import MCPOrchestrator, SourceSpec
+from mcp_orchestrator.balancer import ReplicaPool
+from mcp_orchestrator.sources import ReplicaSpec
+
+
+class FakeReplica:
+    """A replica's session pool answering after a fixed delay"""
+
+    def __init__(self, delay=0.0, fail=False, hang=False):
+        self.delay = delay
+        self.fail = fail
+        self.hang = hang
+        self.calls = 0
+        self.size = 2
+        self.warm = 2
+        self.idle = 2
+
+    async def call_tool(self, name, arguments=None):
+        self.calls += 1
+        if self.hang:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("replica down")
+        return types.CallToolResult(content=[types.TextContent(type="text", text="ok")])
+
+
+def make_pool(*replicas, **kwargs):
+    return ReplicaPool([(f"r{i}", replica) for i, replica in enumerate(replicas)], **kwargs)
+
+
+async def test_least_outstanding_spreads_load():
+    """Test concurrent calls are spread evenly over equal replicas"""
+    replicas = [FakeReplica(delay=0.01) for _ in range(3)]
+    pool = make_pool(*replicas)
+    await asyncio.gather(*(pool.call_tool("query") for _ in range(9)))
+    assert [replica.calls for replica in replicas] == [3, 3, 3]
+    assert all(replica.outstanding == 0 for replica in pool.replicas)
+
+
+async def test_ewma_prefers_fast_replica():
+    """Test the latency-weighted strategy sends most calls to the faster replica"""
+    fast, slow = FakeReplica(delay=0.001), FakeReplica(delay=0.02)
+    pool = make_pool(fast, slow, strategy="ewma", eject_factor=1000)
+    for _ in range(20):
+        await pool.call_tool("query")
+    assert fast.calls > slow.calls
+
+
+async def test_slow_replica_ejected_and_reinstated():
+    """Test a replica far slower than its peers leaves rotation for eject_time"""
+    fast, slow = FakeReplica(delay=0.001), FakeReplica(delay=0.03)
+    pool = make_pool(fast, slow, min_samples=2, eject_time=0.1)
+    for _ in range(6):
+        await pool.call_tool("query")
+    assert pool.replicas[1].ejected
+    assert pool.replicas[1].ejections == 1
+
+    calls = slow.calls
+    for _ in range(4):
+        await pool.call_tool("query")
+    assert slow.calls == calls
+
+    await asyncio.sleep(0.1)
+    assert pool.replicas[1] in pool.in_rotation()
+    assert pool.replicas[1].latency is None
+
+
+async def test_failing_replica_ejected_but_never_the_last():
+    """Test consecutive errors eject a replica while one always stays in rotation"""
+    pool = make_pool(FakeReplica(fail=True), FakeReplica(fail=True), max_failures=2)
+    for _ in range(6):
+        with pytest.raises(ConnectionError):
+            await pool.call_tool("query")
+    ejected = [replica.ejected for replica in pool.replicas]
+    assert ejected.count(True) == 1
+
+
+async def test_hung_replica_ejected_after_timeouts():
+    """Test calls cut off by the caller's timeout count against a replica that never answers"""
+    healthy, hung = FakeReplica(), FakeReplica(hang=True)
+    pool = make_pool(healthy, hung, call_timeout=0.02)
+    timeouts = 0
+    for _ in range(40):
+        try:
+            await asyncio.wait_for(pool.call_tool("query"), 0.02)
+        except asyncio.TimeoutError:
+            timeouts += 1
+    replica = pool.replicas[1]
+    assert replica.ejections == 1 and replica.ejected
+    assert replica.samples > 0 and replica.outstanding == 0
+    assert timeouts == pool.max_failures
+    assert hung.calls == pool.max_failures
+
+
+async def test_cancelled_call_counts_latency_not_failure():
+    """Test a call cancelled before call_timeout only records its elapsed time"""
+    pool = make_pool(FakeReplica(hang=True), call_timeout=10.0)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(pool.call_tool("query"), 0.01)
+    replica = pool.replicas[0]
+    assert replica.samples == 1 and replica.latency >= 0.005
+    assert replica.failures == 0
+
+
+def test_replica_params_inherit_source_settings():
+    """Test replicas fall back to the source command and merge its env"""
+    spec = SourceSpec(
+        name="bq",
+        command=["bq-mcp"],
+        env={"REGION": "us"},
+        pool_size=2,
+        replicas=[{"env": {"REGION": "eu"}}, "bq-mcp --project other"],
+    )
+    (first, first_params), (second, second_params) = spec.replica_params
+    assert (first, second) == ("bq-0", "bq-1")
+    assert first_params.command == "bq-mcp" and first_params.env == {"REGION": "eu"}
+    assert second_params.args == ["--project", "other"] and second_params.env == {"REGION": "us"}
+    assert isinstance(spec.replicas[0], ReplicaSpec)
+    assert spec.max_concurrency == 4
+
+
+def test_replicated_source_gets_replica_pool():
+    """Test connect builds a balanced pool only for sources with replicas"""
+    spec = SourceSpec(name="bq", command=["bq-mcp"], replicas=["bq-mcp", "bq-mcp"], balance="ewma")
+    orchestrator = MCPOrchestrator(sources=[spec, SourceSpec(name="pg", command=["pg-mcp"])])
+    pool = orchestrator._make_pool(spec, spec.replica_params)
+    assert isinstance(pool, ReplicaPool)
+    assert pool.strategy == "ewma"
+    assert pool.size == 2 * spec.pool_size
+    single = orchestrator.sources["pg"]
+    assert not isinstance(orchestrator._make_pool(single, single.replica_params), ReplicaPool)
+
+
+def test_replica_metric_families_are_contiguous():
+    """Test each replica gauge's samples are rendered together"""
+    orchestrator = MCPOrchestrator(sources=[SourceSpec(name="bq", command=["bq-mcp"])])
+    orchestrator.pools = {"bq": make_pool(FakeReplica(), FakeReplica())}
+    names = [
+        line.split("{")[0]
+        for line in orchestrator.metrics.render().splitlines()
+        if line.startswith("orchestrator_replica_")
+    ]
+    assert names == sorted(names, key=names.index)
+    assert len(names) == 3 * 2
@@ -0,0 +1,144 @@
+"""Tests for micro-batching of per-state lookups"""
+
+import asyncio
+import json
+import re
+
+from mcp import types
+
+from mcp_orchestrator import MCPOrchestrator, DataSource
+from mcp_orchestrator.batcher import MicroBatcher, split_rows
+from mcp_orchestrator.sources import builtin_sources
+
+TAX = DataSource.AWS_S3_TABLES.value
+
+RATES = {"TX": 8.2, "CA": 8.85, "NY": 8.52, "WA": 9.38}
+
+
+class TaxPool:
+    """Answers state_local_tax SQL with a row per state in its IN list"""
+
+    def __init__(self):
+        self.queries = []
+
+    async def call_tool(self, name, arguments=None):
+        sql = arguments["query"]
+        self.queries.append(sql)
+        await asyncio.sleep(0.01)
+        states = re.findall(r"'([A-Z]{2})'", sql)
+        rows = [
+            {"state": code, "state_name": code, "combined_rate": RATES[code]} for code in states
+        ]
+        return types.CallToolResult(content=[types.TextContent(type="text", text=json.dumps(rows))])
+
+
+def make_orchestrator(**kwargs):
+    sources = builtin_sources(tax_table="state_local_tax")
+    orchestrator = MCPOrchestrator(sources=sources, **kwargs)
+    orchestrator.pools = {TAX: TaxPool()}
+    orchestrator.catalogs[TAX].update([types.Tool(name="query", inputSchema={"type": "object"})])
+    return orchestrator
+
+
+def result_states(result):
+    return [row["state"] for row in json.loads(result.content[0].text)]
+
+
+async def test_concurrent_lookups_share_one_call():
+    """Test lookups within the window go upstream once and each gets its own rows"""
+    orchestrator = make_orchestrator(batch_window=0.02)
+    queries = [
+        "Combined tax rate in Texas",
+        "combined tax rate in CA",
+        "Combined tax rate in California and New York",
+        "sales tax in Washington",
+    ]
+    results = await asyncio.gather(
+        *(orchestrator._call_query_tool(DataSource.AWS_S3_TABLES, query) for query in queries)
+    )
+    assert [result_states(result) for result in results] == [["TX"], ["CA"], ["CA", "NY"], ["WA"]]
+    # The combined-rate lookups batch together; the wider projection is another shape
+    assert orchestrator.pools[TAX].queries == [
+        "SELECT state, state_name, combined_rate FROM state_local_tax "
+        "WHERE state IN ('TX', 'CA', 'NY') LIMIT 3",
+        "SELECT state, state_name, combined_rate, state_tax_rate, avg_local_tax_rate "
+        "FROM state_local_tax WHERE state IN ('WA') LIMIT 1",
+    ]
+    assert orchestrator.batcher.stats() == {"queries": 4, "calls": 2, "pending": 0}
+
+
+async def test_batching_is_off_by_default():
+    """Test lookups are sent one by one without a batch window"""
+    orchestrator = make_orchestrator()
+    assert orchestrator.batcher is None
+    await asyncio.gather(
+        orchestrator._call_query_tool(DataSource.AWS_S3_TABLES, "Combined tax rate in Texas"),
+        orchestrator._call_query_tool(DataSource.AWS_S3_TABLES, "Combined tax rate in New York"),
+    )
+    assert len(orchestrator.pools[TAX].queries) == 2
+
+
+async def test_full_batch_is_sent_early():
+    """Test a batch reaching max_states goes without waiting out the window"""
+    batcher = MicroBatcher(window=10.0, max_states=2)
+    calls = []
+
+    async def call(states, deadline):
+        calls.append(states)
+        return states
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            batcher.submit("key", ["TX"], call),
+            batcher.submit("key", ["CA"], call),
+        ),
+        timeout=1.0,
+    )
+    assert calls == [["TX", "CA"]]
+    assert results == [["TX", "CA"], ["TX", "CA"]]
+
+
+async def test_batch_error_reaches_every_waiter():
+    """Test a failed combined call fails each lookup in it"""
+    batcher = MicroBatcher(window=0.01)
+
+    async def call(states, deadline):
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(
+        batcher.submit("key", ["TX"], call),
+        batcher.submit("key", ["CA"], call),
+        return_exceptions=True,
+    )
+    assert [str(result) for result in results] == ["upstream down", "upstream down"]
+
+
+async def test_close_cancels_batches():
+    """Test close() cancels sent and unsent batches and leaves no call running"""
+    batcher = MicroBatcher(window=0.01)
+    started = asyncio.Event()
+
+    async def call(states, deadline):
+        started.set()
+        await asyncio.sleep(10)
+
+    sent = asyncio.ensure_future(batcher.submit("sent", ["TX"], call))
+    await asyncio.wait_for(started.wait(), timeout=1.0)
+    unsent = asyncio.ensure_future(batcher.submit("unsent", ["CA"], call))
+    await asyncio.sleep(0)
+    assert len(batcher._tasks) == 1 and batcher.stats()["pending"] == 1
+
+    await batcher.close()
+    results = await asyncio.gather(sent, unsent, return_exceptions=True)
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert not batcher._tasks and batcher.stats()["pending"] == 0
+
+
+def test_split_rows():
+    """Test rows are matched on a loosely named state column and errors pass through"""
+    rows = [{"State": "tx", "rate": 1}, {"State": "CA", "rate": 2}]
+    result = types.CallToolResult(content=[types.TextContent(type="text", text=json.dumps(rows))])
+    assert json.loads(split_rows(result, "state", ["TX"]).content[0].text) == [rows[0]]
+    content = [types.TextContent(type="text", text="boom")]
+    error = types.CallToolResult(content=content, isError=True)
+    assert split_rows(error, "state", ["TX"]) is error
@@ -0,0 +1,116 @@
+"""Tests for circuit breaking and hedged requests"""
+
+import asyncio
+
+import pytest
+from mcp import types
+
+from mcp_orchestrator import MCPOrchestrator, DataSource
+from mcp_orchestrator.admission import QueueFull
+from mcp_orchestrator.circuit_breaker import CircuitBreaker, CircuitOpen, CircuitState
+
+
+class FlakyPool:
+    """call_tool that fails, hangs or answers; every call can be slow or fast"""
+
+    def __init__(self, delays=(0.0,), error=None, idle=1):
+        self.delays = list(delays)
+        self.error = error
+        self.idle = idle
+        self.calls = 0
+
+    async def call_tool(self, name, arguments=None):
+        delay = self.delays[min(self.calls, len(self.delays) - 1)]
+        self.calls += 1
+        await asyncio.sleep(delay)
+        if self.error:
+            raise self.error
+        return types.CallToolResult(content=[types.TextContent(type="text", text=str(self.calls))])
+
+
+def make_orchestrator(pool, **kwargs):
+    orchestrator = MCPOrchestrator(cache_ttls={source: 0 for source in DataSource}, **kwargs)
+    orchestrator.pools = {DataSource.GCP_BIGQUERY: pool, DataSource.AWS_S3_TABLES: pool}
+    for catalog in orchestrator.catalogs.values():
+        catalog.update([types.Tool(name="query", inputSchema={"type": "object"})])
+    return orchestrator
+
+
+def test_breaker_opens_and_half_opens():
+    """Test the breaker opens after the threshold and probes after the reset timeout"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    # Reset timeout elapsed: exactly one probe is let through
+    breaker.before_call()
+    assert breaker.state == CircuitState.HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.trips == 2
+
+
+def test_open_breaker_rejects_with_retry_after():
+    """Test an open circuit fails fast until the reset timeout"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0)
+    breaker.record_failure()
+    with pytest.raises(CircuitOpen) as excinfo:
+        breaker.before_call()
+    assert 9 < excinfo.value.retry_after <= 10
+
+
+async def test_failing_source_trips_breaker():
+    """Test repeated timeouts open the circuit so later queries skip the source"""
+    pool = FlakyPool(delays=[5.0])
+    orchestrator = make_orchestrator(
+        pool, breaker_threshold=2, source_timeouts={DataSource.GCP_BIGQUERY: 0.02}
+    )
+    for _ in range(2):
+        with pytest.raises(asyncio.TimeoutError):
+            await orchestrator.process_query("What is the range of Tesla Model 3?")
+
+    with pytest.raises(CircuitOpen):
+        await orchestrator.process_query("What is the range of Tesla Model 3?")
+    assert pool.calls == 2
+
+
+async def test_admission_rejections_do_not_trip_breaker():
+    """Test rejections by admission control are not counted as failures"""
+    orchestrator = make_orchestrator(FlakyPool(), breaker_threshold=1)
+    orchestrator.admission[DataSource.GCP_BIGQUERY].max_queue = 0
+    orchestrator.admission[DataSource.GCP_BIGQUERY].active = 2
+    with pytest.raises(QueueFull):
+        await orchestrator.process_query("What is the range of Tesla Model 3?")
+    assert orchestrator.breakers[DataSource.GCP_BIGQUERY].state == CircuitState.CLOSED
+
+
+async def test_hedged_request_wins_over_slow_attempt():
+    """Test a slow first attempt is hedged after the tail latency and the hedge wins"""
+    pool = FlakyPool(delays=[1.0, 0.0], idle=2)
+    orchestrator = make_orchestrator(pool, hedge=True)
+    for _ in range(20):
+        orchestrator.metrics.observe("call_tool", 0.01, DataSource.GCP_BIGQUERY.value)
+
+    result = await orchestrator.process_query("What is the range of Tesla Model 3?")
+    assert result["data"][0].text == "2"
+    assert pool.calls == 2
+    assert orchestrator.metrics.counters[("hedge_wins", (("source", "gcp_bigquery"),))] == 1
+
+
+async def test_no_hedge_without_idle_session():
+    """Test hedging is skipped when no spare session is idle"""
+    pool = FlakyPool(delays=[0.05], idle=1)
+    orchestrator = make_orchestrator(pool, hedge=True)
+    for _ in range(20):
+        orchestrator.metrics.observe("call_tool", 0.001, DataSource.GCP_BIGQUERY.value)
+
+    await orchestrator.process_query("What is the range of Tesla Model 3?")
+    assert pool.calls == 1
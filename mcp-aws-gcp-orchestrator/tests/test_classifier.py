@@ -0,0 +1,96 @@
+"""Tests for the learned routing classifier"""
+
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from mcp_orchestrator import MCPOrchestrator, DataSource
+from mcp_orchestrator.classifier import HashedNgramClassifier, main
+
+EV = DataSource.GCP_BIGQUERY.value
+TAX = DataSource.AWS_S3_TABLES.value
+
+# Queries the keyword router finds ambiguous but whose source is clear from logs
+LABELED = [
+    ("How many Leafs were sold in Seattle", EV),
+    ("Bolt EUV registrations last year", EV),
+    ("Average MSRP of plug-in hybrids", EV),
+    ("Which counties have the most Rivians", EV),
+    ("Mach-E counts by county", EV),
+    ("What do shoppers pay on purchases in Ohio", TAX),
+    ("Which places have the highest levies on purchases", TAX),
+    ("Compare levies on purchases for Ohio and Utah", TAX),
+    ("How much goes to the county on a purchase", TAX),
+    ("Levies on purchases by region", TAX),
+]
+
+
+@pytest.fixture(scope="module")
+def model():
+    queries, labels = zip(*(LABELED * 20))
+    return HashedNgramClassifier([EV, TAX], n_features=1 << 12).fit(queries, labels, epochs=5)
+
+
+def test_learns_labeled_queries(model):
+    """Test the trained model reproduces its labels with confidence"""
+    for query, label in LABELED:
+        predicted, probability = model.predict(query)
+        assert predicted == label
+        assert probability > 0.8
+
+
+def test_batch_matches_single(model):
+    """Test batch inference gives the same answers as per-query inference"""
+    queries = [query for query, _ in LABELED] + ["", "???"]
+    batch = model.predict_batch(queries)
+    for query, (label, probability) in zip(queries, batch):
+        single = model.predict(query)
+        assert label == single[0]
+        assert probability == pytest.approx(single[1], rel=1e-5)
+
+
+def test_save_and_load(model, tmp_path):
+    """Test a saved model loads with identical predictions"""
+    path = tmp_path / "router.npz"
+    model.save(str(path))
+    loaded = HashedNgramClassifier.load(str(path))
+    assert loaded.classes == model.classes
+    queries = ["Levies on purchases in Utah"]
+    assert loaded.predict_batch(queries) == model.predict_batch(queries)
+
+
+def test_orchestrator_uses_confident_predictions(model):
+    """Test confident predictions decide the route and say so in the reason"""
+    orchestrator = MCPOrchestrator(classifier=model)
+    route = orchestrator.analyze_query("Levies on purchases by region")
+    assert route.source == DataSource.AWS_S3_TABLES
+    assert route.router == "classifier"
+    assert route.reason.startswith("Classifier predicted S3 Tables")
+
+    batch = orchestrator.analyze_queries(["Levies on purchases by region"])
+    assert (batch[0].source, batch[0].router) == (route.source, route.router)
+
+
+def test_keyword_fallback_when_unsure(model):
+    """Test low-confidence predictions and cross-source queries use the keywords"""
+    orchestrator = MCPOrchestrator(classifier=model, classifier_threshold=1.01)
+    route = orchestrator.analyze_query("What is the range of Tesla Model 3?")
+    assert route.router == "keyword"
+    assert "keyword router" in route.reason
+
+    orchestrator = MCPOrchestrator(classifier=model)
+    route = orchestrator.analyze_query("Tesla sales tax rate in Texas")
+    assert route.router == "keyword"
+    assert route.is_multi_source
+
+
+def test_train_command(tmp_path, capsys):
+    """Test training from JSON-lines logs writes a loadable model"""
+    logs = tmp_path / "queries.jsonl"
+    logs.write_text("\n".join(json.dumps({"query": q, "source": s}) for q, s in LABELED * 10))
+    output = tmp_path / "model.npz"
+    main(["train", str(logs), "-o", str(output), "--features", "4096"])
+    main(["evaluate", str(output), str(logs)])
+    assert "accuracy: 1.0000" in capsys.readouterr().out
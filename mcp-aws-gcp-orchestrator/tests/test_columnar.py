@@ -0,0 +1,104 @@
+"""Tests for the columnar result representation"""
+
+import json
+
+import pytest
+from mcp import types
+
+from mcp_orchestrator import MCPOrchestrator, DataSource
+from mcp_orchestrator.columnar import ColumnarResult
+
+ROWS = [
+    {
+        "VIN": f"5YJ3E1EA{i:09d}",
+        "Make": ["TESLA", "NISSAN"][i % 2],
+        "Model_Year": 2018 + i % 3,
+        "Electric_Range": [220, None, 84.5][i % 3],
+        "Base_MSRP": None,
+    }
+    for i in range(40)
+]
+
+
+def test_types_and_round_trip():
+    """Test columns get typed storage and rows come back unchanged"""
+    table = ColumnarResult.from_rows(ROWS)
+    kinds = {column.name: column.kind for column in table.columns}
+    assert kinds == {
+        "VIN": "object",
+        "Make": "dictionary",
+        "Model_Year": "int",
+        "Electric_Range": "float",
+        "Base_MSRP": "object",
+    }
+    assert table.column("Make").dictionary == ["TESLA", "NISSAN"]
+    assert table.column("Make").values.typecode == "B"
+    assert len(table) == 40
+    assert table.rows() == ROWS
+    assert table.row(1) == ROWS[1]
+
+
+def test_missing_and_mixed_values():
+    """Test ragged rows are padded with nulls and mixed types fall back to objects"""
+    rows = [{"a": 1}, {"b": "x"}, {"a": "two", "b": None}, {"a": True}]
+    table = ColumnarResult.from_rows(rows)
+    assert table.column("a").kind == "object"
+    assert table.column("b").kind == "dictionary"
+    assert table.rows() == [
+        {"a": 1, "b": None},
+        {"a": None, "b": "x"},
+        {"a": "two", "b": None},
+        {"a": True, "b": None},
+    ]
+
+
+def test_from_content_and_json():
+    """Test tool content decodes to columns and the wire form sends names and strings once"""
+    content = [types.TextContent(type="text", text=json.dumps(ROWS))]
+    table = ColumnarResult.from_content(content)
+    wire = table.to_json()
+    assert wire["length"] == 40
+    make = next(column for column in wire["columns"] if column["name"] == "Make")
+    assert make == {
+        "name": "Make",
+        "type": "dictionary",
+        "dictionary": ["TESLA", "NISSAN"],
+        "codes": [0, 1] * 20,
+    }
+    assert len(json.dumps(wire)) < len(content[0].text)
+    assert ColumnarResult.from_content([types.TextContent(type="text", text="No rows")]) is None
+
+
+def test_arrow_ipc():
+    """Test the Arrow stream decodes to the same rows"""
+    pa = pytest.importorskip("pyarrow")
+    table = ColumnarResult.from_rows(ROWS)
+    decoded = pa.ipc.open_stream(table.to_arrow_ipc()).read_all()
+    assert decoded.to_pylist() == ROWS
+    assert pa.types.is_dictionary(decoded.schema.field("Make").type)
+
+
+def test_arrow_out_of_range_ints_sent_as_text():
+    """Test ints too large for int64 fall back to JSON text instead of failing"""
+    pa = pytest.importorskip("pyarrow")
+    table = ColumnarResult.from_rows([{"n": 10**20}, {"n": 1}, {"n": None}])
+    decoded = pa.ipc.open_stream(table.to_arrow_ipc()).read_all()
+    assert decoded.column("n").to_pylist() == ["100000000000000000000", "1", None]
+
+
+async def test_process_query_columnar():
+    """Test the orchestrator returns tabular results as columns when asked"""
+
+    class Pool:
+        async def call_tool(self, name, arguments=None):
+            text = json.dumps(ROWS)
+            return types.CallToolResult(content=[types.TextContent(type="text", text=text)])
+
+    orchestrator = MCPOrchestrator(sql_pushdown=False)
+    orchestrator.pools = {DataSource.GCP_BIGQUERY.value: Pool()}
+    orchestrator.catalogs[DataSource.GCP_BIGQUERY].update(
+        [types.Tool(name="query", inputSchema={"type": "object"})]
+    )
+    result = await orchestrator.process_query("Tesla electric range", columnar=True)
+    assert isinstance(result["data"], ColumnarResult)
+    assert result["data"].rows() == ROWS
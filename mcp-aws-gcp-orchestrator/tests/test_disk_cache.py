@@ -0,0 +1,117 @@
+"""Tests for the on-disk result cache tier"""
+
+import asyncio
+import json
+import time
+
+from mcp import types
+
+from mcp_orchestrator import MCPOrchestrator
+from mcp_orchestrator.disk_cache import DiskCache, dump_result, load_result
+from mcp_orchestrator.result_cache import ResultCache
+
+
+def text_result(text):
+    return types.CallToolResult(content=[types.TextContent(type="text", text=text)])
+
+
+async def wait_for_writes(disk, count):
+    for _ in range(100):
+        if disk.writes >= count:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("disk write did not happen")
+
+
+def test_stored_forms_round_trip():
+    """Test single text results are stored as raw text and anything else as JSON"""
+    rows = json.dumps([{"state": "TX", "combined_rate": 8.2}])
+    assert dump_result(text_result(rows)) == b"T" + rows.encode()
+    assert load_result(dump_result(text_result(rows))) == text_result(rows)
+
+    mixed = types.CallToolResult(
+        content=[
+            types.TextContent(type="text", text="a"),
+            types.TextContent(type="text", text="b"),
+        ],
+        isError=True,
+    )
+    assert dump_result(mixed)[:1] == b"J"
+    assert load_result(dump_result(mixed)) == mixed
+
+
+async def test_shared_between_caches(tmp_path):
+    """Test a result loaded by one worker is served to another without reloading"""
+    path = str(tmp_path / "results.sqlite3")
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        return text_result("[]")
+
+    first = ResultCache(disk=DiskCache(path))
+    await first.get_or_load(("gcp_bigquery", "query", "select 1"), 60, loader)
+    await wait_for_writes(first.disk, 1)
+
+    # A second process, or this one after a restart
+    second = ResultCache(disk=DiskCache(path))
+    result = await second.get_or_load(("gcp_bigquery", "query", "select 1"), 60, loader)
+    assert result == text_result("[]")
+    assert len(loads) == 1
+    assert second.disk.stats()["hits"] == 1
+    assert len(second) == 1
+
+
+def test_expiry_and_size_bound(tmp_path):
+    """Test expired entries are misses and the least recently read are evicted first"""
+    disk = DiskCache(str(tmp_path / "cache" / "results.sqlite3"), max_bytes=250)
+    disk.put("old", text_result("x" * 100), 60)
+    disk.put("expired", text_result("y"), 0.01)
+    time.sleep(0.02)
+    assert disk.get("expired") is None
+
+    disk.put("newer", text_result("z" * 100), 60)
+    assert disk.get("old")[0] == text_result("x" * 100)
+    disk.put("newest", text_result("w" * 100), 60)
+    assert disk.get("newer") is None
+    assert disk.get("old") is not None and disk.get("newest") is not None
+    assert disk.evictions == 2
+
+
+def test_stored_bytes_counted_only_when_needed(tmp_path):
+    """Test writes under the bound do not rescan the table, and a recount catches other writers"""
+    path = str(tmp_path / "results.sqlite3")
+    disk = DiskCache(path, max_bytes=1000, recount_every=5)
+    scans = []
+    disk._db.set_trace_callback(lambda sql: scans.append(sql) if "SUM(size)" in sql else None)
+    for i in range(4):
+        disk.put(f"k{i}", text_result("x" * 10), 60)
+    assert scans == []
+
+    # Another process fills the file; the periodic recount sees it and evicts
+    other = DiskCache(path, max_bytes=10**6)
+    other.put("big", text_result("y" * 990), 60)
+    disk.put("k4", text_result("x" * 10), 60)
+    assert scans and disk.evictions > 0
+    assert disk._total <= disk.max_bytes
+    other.close()
+    disk.close()
+
+
+async def test_closed_on_disconnect(tmp_path):
+    """Test disconnect closes the disk tier, after which it is a silent miss"""
+    orchestrator = MCPOrchestrator(cache_dir=str(tmp_path))
+    disk = orchestrator.result_cache.disk
+    await orchestrator.disconnect()
+    assert disk._closed
+    assert disk.get("k") is None
+    disk.put("k", text_result("[]"), 60)
+    assert disk.errors == 0
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    """Test a corrupt entry is ignored rather than failing the query"""
+    disk = DiskCache(str(tmp_path / "results.sqlite3"), loads=lambda blob: json.loads(b"{"))
+    disk.put("k", text_result("[]"), 60)
+    assert disk.get("k") is None
+    assert disk.errors == 1
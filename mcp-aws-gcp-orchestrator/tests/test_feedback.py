@@ -0,0 +1,156 @@
+"""Tests for routing feedback and speculative routing"""
+
+import asyncio
+import json
+
+from mcp import types
+
+from mcp_orchestrator import MCPOrchestrator, DataSource
+from mcp_orchestrator.feedback import RoutingFeedback, has_data, outcome_of
+
+EV = DataSource.GCP_BIGQUERY.value
+TAX = DataSource.AWS_S3_TABLES.value
+
+
+def text_content(text):
+    return [types.TextContent(type="text", text=text)]
+
+
+class AnswerPool:
+    """Answers every query with fixed text after a delay"""
+
+    def __init__(self, text, delay=0.0, error=False):
+        self.text = text
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+
+    async def call_tool(self, name, arguments=None):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return types.CallToolResult(content=text_content(self.text), isError=self.error)
+
+
+def make_orchestrator(ev_pool, tax_pool, **kwargs):
+    orchestrator = MCPOrchestrator(sql_pushdown=False, cache_ttls={EV: 0, TAX: 0}, **kwargs)
+    orchestrator.pools = {EV: ev_pool, TAX: tax_pool}
+    for catalog in orchestrator.catalogs.values():
+        catalog.update([types.Tool(name="query", inputSchema={"type": "object"})])
+    return orchestrator
+
+
+def test_has_data():
+    """Test empty arrays and empty row wrappers are told apart from answers"""
+    assert not has_data([])
+    assert not has_data(text_content(" [] "))
+    assert not has_data(text_content('{"rows": []}'))
+    assert has_data(text_content('[{"state": "TX"}]'))
+    assert has_data(text_content('{"count": 0}'))
+    assert has_data(text_content("No matching rows"))
+
+
+def test_tool_errors_are_error_outcomes():
+    """Test an isError result counts as an error whatever its text"""
+    error = types.CallToolResult(content=text_content("Error: table not found"), isError=True)
+    assert outcome_of(error) == "error"
+    assert outcome_of(types.CallToolResult(content=text_content("[]"))) == "empty"
+
+
+def test_prefer_after_repeated_empty_answers():
+    """Test a source that keeps coming back empty is traded for a better one"""
+    feedback = RoutingFeedback()
+    feedback.record("show me data", EV, "empty", 0.2)
+    assert feedback.prefer("show me data", EV, [EV, TAX]) is None
+    feedback.record("show me data", EV, "empty", 0.2)
+    assert feedback.prefer("show me data", EV, [EV, TAX])[0] == TAX
+
+    # A source that mostly answers is kept
+    feedback.record("ev range", EV, "data", 0.2)
+    feedback.record("ev range", EV, "empty", 0.2)
+    assert feedback.prefer("ev range", EV, [EV, TAX]) is None
+
+
+def test_rank_by_usefulness_then_latency():
+    """Test observed sources rank by data rate, then speed"""
+    feedback = RoutingFeedback()
+    feedback.record("q", "a", "data", 2.0)
+    feedback.record("q", "b", "data", 0.5)
+    feedback.record("q", "c", "error", 0.1)
+    assert feedback.rank("q", ["c", "d", "a", "b"]) == ["b", "a", "d", "c"]
+
+
+async def test_low_confidence_route_adapts():
+    """Test an ambiguous query moves to the source that answers it once the default keeps failing"""
+    ev_pool, tax_pool = AnswerPool("[]"), AnswerPool('[{"state": "TX"}]')
+    orchestrator = make_orchestrator(ev_pool, tax_pool)
+    assert orchestrator.analyze_query("Show me data").source_name == EV
+
+    for _ in range(2):
+        result = await orchestrator.process_query("Show me data")
+        assert result["source"] == EV
+    route = orchestrator.analyze_query("show me DATA!")
+    assert (route.source_name, route.router) == (TAX, "feedback")
+    result = await orchestrator.process_query("Show me data")
+    assert result["source"] == TAX
+    assert "instead" in result["reason"]
+
+    # Confident routes are left alone
+    assert orchestrator.analyze_query("Tesla electric vehicle range in miles").source_name == EV
+
+
+async def test_speculation_keeps_first_answer_with_data():
+    """Test both sources are queried below the threshold and the first with data wins"""
+    ev_pool, tax_pool = AnswerPool("[]"), AnswerPool('[{"state": "TX"}]', delay=0.01)
+    orchestrator = make_orchestrator(ev_pool, tax_pool, speculate_below=0.6)
+    result = await orchestrator.process_query("Show me data")
+    assert result["source"] == TAX
+    assert (ev_pool.calls, tax_pool.calls) == (1, 1)
+    assert orchestrator.feedback.stats(orchestrator._fingerprint("Show me data"))[EV]["seen"] == 1
+
+    # The slower source is cancelled once the other answers with data
+    ev_pool.text, ev_pool.delay = '[{"Make": "TESLA"}]', 0.0
+    tax_pool.delay = 1.0
+    result = await orchestrator.process_query("Show me data")
+    assert result["source"] == EV
+    await asyncio.sleep(0.05)
+    assert tax_pool.cancelled == 1
+
+
+async def test_speculation_with_no_data_returns_routed_answer():
+    """Test the routed source's empty answer is kept when no source has data"""
+    ev_pool, tax_pool = AnswerPool("[]"), AnswerPool("[]")
+    orchestrator = make_orchestrator(ev_pool, tax_pool, speculate_below=0.6)
+    result = await orchestrator.process_query("Show me data")
+    assert result["source"] == EV
+    assert json.loads(result["data"][0].text) == []
+
+
+async def test_speculation_never_picks_tool_error():
+    """Test a fast tool error loses to the slower source with rows, and is recorded as an error"""
+    ev_pool = AnswerPool("Error: table not found", error=True)
+    tax_pool = AnswerPool('[{"state": "TX"}]', delay=0.01)
+    orchestrator = make_orchestrator(ev_pool, tax_pool, speculate_below=0.6)
+    result = await orchestrator.process_query("Show me data")
+    assert result["source"] == TAX
+    entry = orchestrator.feedback._entries[orchestrator._fingerprint("Show me data")][EV]
+    assert (entry.error, entry.data) == (1, 0)
+
+    # With no rows anywhere an empty answer is still preferred to the error
+    tax_pool.text = "[]"
+    result = await orchestrator.process_query("Show me data")
+    assert result["source"] == TAX
+
+
+async def test_adapt_only_to_connected_sources():
+    """Test a route is never moved to a registered source that has no pool"""
+    orchestrator = make_orchestrator(AnswerPool("[]"), AnswerPool('[{"state": "TX"}]'))
+    del orchestrator.pools[TAX]
+    for _ in range(3):
+        result = await orchestrator.process_query("Show me data")
+        assert result["source"] == EV
+    assert orchestrator.analyze_query("Show me data").router != "feedback"
@@ -0,0 +1,148 @@
+"""Tests for the EV x tax join"""
+
+import json
+
+from mcp import types
+
+from mcp_orchestrator import MCPOrchestrator, DataSource
+from mcp_orchestrator import join as join_module
+from mcp_orchestrator.content import iter_column_batches
+from mcp_orchestrator.join import StateTaxJoin
+from mcp_orchestrator.sources import builtin_sources
+
+EV = DataSource.GCP_BIGQUERY.value
+TAX = DataSource.AWS_S3_TABLES.value
+
+TAX_ROWS = [
+    {"state": "TX", "state_name": "Texas", "combined_rate": 8.0},
+    {"state": "CA", "state_name": "California", "combined_rate": 10.0},
+]
+EV_ROWS = [
+    {"State": "TX", "Base_MSRP": 50000},
+    {"State": "TX", "Base_MSRP": 0},
+    {"State": "CA", "Base_MSRP": "40000"},
+    {"State": "CA", "Base_MSRP": 60000},
+    {"State": "WA", "Base_MSRP": 45000},
+]
+
+
+def text_content(rows):
+    return [types.TextContent(type="text", text=json.dumps(rows))]
+
+
+class SqlPool:
+    """Answers each side of the join and records the SQL it was sent"""
+
+    def __init__(self, rows, error=None):
+        self.rows = rows
+        self.error = error
+        self.queries = []
+
+    async def call_tool(self, name, arguments=None):
+        self.queries.append(arguments["query"])
+        if self.error is not None:
+            content = [types.TextContent(type="text", text=self.error)]
+            return types.CallToolResult(content=content, isError=True)
+        return types.CallToolResult(content=text_content(self.rows))
+
+
+def configured_orchestrator():
+    sources = builtin_sources(ev_table="ev_registrations", tax_table="state_local_tax")
+    return MCPOrchestrator(sources=sources)
+
+
+def make_orchestrator(ev_pool, tax_pool):
+    orchestrator = configured_orchestrator()
+    orchestrator.pools = {EV: ev_pool, TAX: tax_pool}
+    for catalog in orchestrator.catalogs.values():
+        catalog.update([types.Tool(name="query", inputSchema={"type": "object"})])
+    return orchestrator
+
+
+def test_plan_pushes_filters_down():
+    """Test states and makes (plural or not) filter both sides"""
+    orchestrator = configured_orchestrator()
+    route = orchestrator.analyze_query(
+        "Effective sales tax paid on Teslas registered in Texas and California"
+    )
+    plan = orchestrator.plan_join(route)
+    assert plan.ev_sql == (
+        "SELECT state, base_msrp FROM ev_registrations "
+        "WHERE state IN ('TX', 'CA') AND UPPER(make) IN ('TESLA')"
+    )
+    assert plan.tax_sql == (
+        "SELECT state, state_name, combined_rate FROM state_local_tax "
+        "WHERE state IN ('TX', 'CA') LIMIT 2"
+    )
+    assert orchestrator.plan_join(orchestrator.analyze_query("Texas sales tax")) is None
+
+
+def test_join_aggregates_per_state(monkeypatch):
+    """Test the hash join with and without NumPy gives the same per-state totals"""
+    expected = [
+        {
+            "state": "CA",
+            "state_name": "California",
+            "vehicles": 2,
+            "priced_vehicles": 2,
+            "avg_msrp": 50000.0,
+            "combined_rate": 10.0,
+            "est_sales_tax": 10000.0,
+            "avg_sales_tax": 5000.0,
+        },
+        {
+            "state": "TX",
+            "state_name": "Texas",
+            "vehicles": 2,
+            "priced_vehicles": 1,
+            "avg_msrp": 50000.0,
+            "combined_rate": 8.0,
+            "est_sales_tax": 4000.0,
+            "avg_sales_tax": 4000.0,
+        },
+    ]
+    for numpy in (join_module.np, None):
+        monkeypatch.setattr(join_module, "np", numpy)
+        join = StateTaxJoin(TAX_ROWS)
+        join.add_content(text_content(EV_ROWS), ("State", "Base_MSRP"), batch_rows=2)
+        assert join.results() == expected
+        assert (join.rows, join.unmatched) == (5, 1)
+
+
+def test_column_batches():
+    """Test rows decode into bounded column batches with loose column names"""
+    content = text_content(
+        [{"State": "WA", "Base MSRP": 1}, {"state": "OR"}, {"STATE": "CA", "x": {"y": 1}}]
+    )
+    batches = list(iter_column_batches(content, ("State", "Base_MSRP"), batch_rows=2))
+    assert batches == [[["WA", "OR"], [1, None]], [["CA"], [None]]]
+
+    text = json.dumps({"rows": [{"State": "TX", "Base_MSRP": 5}]})
+    wrapped = [types.TextContent(type="text", text=text)]
+    assert list(iter_column_batches(wrapped, ("State", "Base_MSRP"))) == [[["TX"], [5]]]
+
+
+async def test_process_join():
+    """Test both sides are fetched with the pushed-down SQL and joined"""
+    ev_pool, tax_pool = SqlPool(EV_ROWS), SqlPool(TAX_ROWS)
+    orchestrator = make_orchestrator(ev_pool, tax_pool)
+
+    result = await orchestrator.process_join("Sales tax paid on electric vehicles in each state")
+    assert result["status"] == "success"
+    assert [row["state"] for row in result["data"]] == ["CA", "TX"]
+    assert (result["rows"], result["unmatched"]) == (5, 1)
+    assert ev_pool.queries == ["SELECT state, base_msrp FROM ev_registrations"]
+    assert tax_pool.queries == [
+        "SELECT state, state_name, combined_rate FROM state_local_tax LIMIT 51"
+    ]
+
+
+async def test_process_join_reports_tool_errors():
+    """Test an error result from either side fails the join with the server's message"""
+    query = "Sales tax paid on electric vehicles in each state"
+    for ev_error, tax_error in (("Error: table not found", None), (None, "Error: access denied")):
+        orchestrator = make_orchestrator(SqlPool(EV_ROWS, ev_error), SqlPool(TAX_ROWS, tax_error))
+        result = await orchestrator.process_join(query)
+        assert result["status"] == "error" and result["data"] == []
+        failed = EV if ev_error else TAX
+        assert result["errors"] == {failed: ev_error or tax_error}
@@ -0,0 +1,45 @@
+"""Tests for stage latency metrics"""
+
+import pytest
+
+from mcp_orchestrator.metrics import Histogram, Metrics
+
+
+def test_histogram_quantile():
+    """Test quantiles resolve to bucket upper bounds"""
+    histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+    for value in (0.005, 0.005, 0.05, 0.5):
+        histogram.observe(value)
+    assert histogram.count == 4
+    assert histogram.quantile(0.5) == 0.01
+    assert histogram.quantile(0.75) == 0.1
+    assert histogram.quantile(1.0) == 1.0
+    assert Histogram().quantile(0.95) == 0.0
+
+
+def test_timer_records_on_error():
+    """Test the timer observes a duration even when the block raises"""
+    metrics = Metrics()
+    with pytest.raises(ValueError):
+        with metrics.timer("call_tool", "gcp_bigquery"):
+            raise ValueError("boom")
+    assert metrics.histogram("call_tool", "gcp_bigquery").count == 1
+
+
+def test_render_prometheus_text():
+    """Test histograms, counters and collectors render in exposition format"""
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.observe("route", 0.05)
+    metrics.observe("route", 2.0)
+    metrics.inc("queries", source="aws_s3_tables")
+    metrics.inc("queries", source="aws_s3_tables")
+    metrics.add_collector(lambda: [("orchestrator_result_cache_bytes", "gauge", "Bytes.", {}, 42)])
+
+    text = metrics.render()
+    assert 'orchestrator_stage_duration_seconds_bucket{stage="route",source="",le="0.1"} 1' in text
+    assert 'orchestrator_stage_duration_seconds_bucket{stage="route",source="",le="+Inf"} 2' in text
+    assert 'orchestrator_stage_duration_seconds_count{stage="route",source=""} 2' in text
+    assert "# TYPE orchestrator_queries_total counter" in text
+    assert 'orchestrator_queries_total{source="aws_s3_tables"} 2' in text
+    assert "# TYPE orchestrator_result_cache_bytes gauge" in text
+    assert "orchestrator_result_cache_bytes 42" in text
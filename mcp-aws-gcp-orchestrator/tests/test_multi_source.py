@@ -0,0 +1,75 @@
+"""Tests for concurrent multi-source execution"""
+
+import asyncio
+
+from mcp import types
+
+from mcp_orchestrator import MCPOrchestrator, DataSource
+
+
+class FakePool:
+    """Answers call_tool after a delay, or raises"""
+
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+
+    async def call_tool(self, name, arguments=None):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=arguments["query"])]
+        )
+
+
+def make_orchestrator(gcp_pool, aws_pool, **kwargs):
+    orchestrator = MCPOrchestrator(**kwargs)
+    orchestrator.pools = {DataSource.GCP_BIGQUERY: gcp_pool, DataSource.AWS_S3_TABLES: aws_pool}
+    for catalog in orchestrator.catalogs.values():
+        catalog.update([types.Tool(name="query", inputSchema={"type": "object"})])
+    return orchestrator
+
+
+def test_ev_and_tax_query_targets_both_sources():
+    """Test routing returns both targets for cross-source questions"""
+    route = MCPOrchestrator().analyze_query("Tesla sales tax rate in Texas")
+    assert route.is_multi_source
+    assert set(route.targets) == {DataSource.GCP_BIGQUERY, DataSource.AWS_S3_TABLES}
+
+    route = MCPOrchestrator().analyze_query("What is the range of Tesla Model 3?")
+    assert route.targets == [DataSource.GCP_BIGQUERY]
+
+
+async def test_sources_run_concurrently():
+    """Test both sources are in flight at once rather than one after the other"""
+    arrived = []
+    both = asyncio.Event()
+
+    class MeetingPool(FakePool):
+        """Holds each call until the other source's call has started too"""
+
+        async def call_tool(self, name, arguments=None):
+            arrived.append(self)
+            if len(arrived) == 2:
+                both.set()
+            await both.wait()
+            return await super().call_tool(name, arguments)
+
+    orchestrator = make_orchestrator(MeetingPool(), MeetingPool())
+    result = await asyncio.wait_for(
+        orchestrator.process_multi_source("Tesla sales tax rate in Texas"), timeout=1.0
+    )
+    assert result["status"] == "success"
+    assert set(result["data"]) == {"gcp_bigquery", "aws_s3_tables"}
+
+
+async def test_partial_result_on_timeout():
+    """Test a slow source times out without failing the other"""
+    orchestrator = make_orchestrator(
+        FakePool(delay=5.0), FakePool(), source_timeouts={DataSource.GCP_BIGQUERY: 0.05}
+    )
+    result = await orchestrator.process_multi_source("Tesla sales tax rate in Texas")
+    assert result["status"] == "partial"
+    assert "aws_s3_tables" in result["data"]
+    assert "gcp_bigquery" in result["errors"]
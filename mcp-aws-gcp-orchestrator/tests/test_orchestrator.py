@@ -1,6 +1,11 @@
 """Tests for MCP Orchestrator"""
 
+import asyncio
+import time
+
 import pytest
+from mcp import types
+
 from mcp_orchestrator import MCPOrchestrator, DataSource
 
 
@@ -9,6 +14,18 @@ def test_orchestrator_initialization():
     orchestrator = MCPOrchestrator()
     assert orchestrator.gcp_session is None
     assert orchestrator.aws_session is None
+    assert dict(orchestrator.gcp_tools) == {} and dict(orchestrator.aws_tools) == {}
+
+
+def test_tool_maps_are_read_only_views():
+    """Test gcp_tools and aws_tools follow the discovered tools and cannot be modified"""
+    orchestrator = MCPOrchestrator()
+    tool = types.Tool(name="query", inputSchema={"type": "object"})
+    orchestrator.catalogs[DataSource.AWS_S3_TABLES].update([tool])
+    assert orchestrator.aws_tools == {"query": tool}
+    assert not orchestrator.gcp_tools
+    with pytest.raises(TypeError):
+        orchestrator.aws_tools["other"] = tool
 
 
 def test_ev_query_routing():
@@ -30,3 +47,107 @@ def test_ambiguous_query():
     orchestrator = MCPOrchestrator()
     route = orchestrator.analyze_query("Show me data")
     assert route.confidence == 0.5
+
+
+class ClosablePool:
+    """Records whether the orchestrator closed it"""
+
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+async def test_disconnect_drains_then_closes_pools():
+    """Test disconnect waits for in-flight calls, closes every pool and is repeatable"""
+    orchestrator = MCPOrchestrator()
+    pools = {
+        DataSource.GCP_BIGQUERY.value: ClosablePool(),
+        DataSource.AWS_S3_TABLES.value: ClosablePool(),
+    }
+    orchestrator.pools = dict(pools)
+    controller = orchestrator.admission[DataSource.GCP_BIGQUERY]
+    await controller.acquire()
+
+    async def finish_call():
+        await asyncio.sleep(0.1)
+        assert not any(pool.closed for pool in pools.values())
+        controller.release()
+
+    await asyncio.gather(orchestrator.disconnect(drain_timeout=2.0), finish_call())
+    assert all(pool.closed for pool in pools.values())
+    assert orchestrator.pools == {}
+    await orchestrator.disconnect()
+
+
+class WarmingPool:
+    """A pool whose warm session count the test controls"""
+
+    def __init__(self, warm):
+        self.warm = warm
+        self.size = 2
+        self.spare = 0
+
+    async def call_tool(self, name, arguments=None):
+        return types.CallToolResult(content=[types.TextContent(type="text", text="[]")])
+
+
+async def test_readiness_and_cold_start_timings():
+    """Test readiness waits for every source to be warm and first answers are timed"""
+    orchestrator = MCPOrchestrator(sql_pushdown=False)
+    gcp, aws = WarmingPool(2), WarmingPool(0)
+    orchestrator.pools = {DataSource.GCP_BIGQUERY.value: gcp, DataSource.AWS_S3_TABLES.value: aws}
+    orchestrator.catalogs[DataSource.GCP_BIGQUERY].update(
+        [types.Tool(name="query", inputSchema={"type": "object"})]
+    )
+    assert not orchestrator.ready
+
+    orchestrator.connected = True
+    orchestrator.started_at = time.monotonic()
+    readiness = orchestrator.readiness()
+    assert not readiness["ready"]
+    assert readiness["sources"][DataSource.AWS_S3_TABLES.value] == {
+        "warm": 0,
+        "size": 2,
+        "spare": 0,
+    }
+    assert readiness["cold_start"]["warm_seconds"] is None
+
+    aws.warm = 1
+    await orchestrator._call_query_tool(DataSource.GCP_BIGQUERY, "Tesla electric range")
+    readiness = orchestrator.readiness()
+    assert readiness["ready"]
+    assert readiness["cold_start"]["warm_seconds"] >= 0
+    assert list(readiness["cold_start"]["first_answer_seconds"]) == [DataSource.GCP_BIGQUERY.value]
+    text = orchestrator.metrics.render()
+    assert 'orchestrator_cold_start_seconds{stage="warm"}' in text
+    # Each family's samples are contiguous, as the exposition format requires
+    samples = [line for line in text.splitlines() if not line.startswith("#")]
+    names = [line.split("{")[0].split(" ")[0] for line in samples]
+    names = [name for name in names if name.endswith(("_sessions", "_cold_start_seconds"))]
+    assert names == sorted(names, key=names.index)
+
+
+class ErrorPool:
+    """Answers every call with a tool error"""
+
+    async def call_tool(self, name, arguments=None):
+        content = [types.TextContent(type="text", text="Error: access denied")]
+        return types.CallToolResult(content=content, isError=True)
+
+
+async def test_process_query_reports_tool_errors_on_the_given_route(monkeypatch):
+    """Test a tool error gives status "error" and a route passed in is not computed again"""
+    orchestrator = MCPOrchestrator()
+    orchestrator.pools = {DataSource.GCP_BIGQUERY.value: ErrorPool()}
+    orchestrator.catalogs[DataSource.GCP_BIGQUERY].update(
+        [types.Tool(name="query", inputSchema={"type": "object"})]
+    )
+    query = "What is the range of Tesla Model 3?"
+    route = orchestrator.analyze_query(query)
+    monkeypatch.setattr(orchestrator, "analyze_query", None)
+    result = await orchestrator.process_query(query, route=route)
+    assert (result["status"], result["data"]) == ("error", [])
+    assert result["error"] == "Error: access denied"
+    assert result["source"] == DataSource.GCP_BIGQUERY.value
@@ -0,0 +1,152 @@
+"""Tests for SQL pushdown templates"""
+
+from mcp import types
+
+from mcp_orchestrator import MCPOrchestrator, DataSource
+from mcp_orchestrator.pushdown import SqlTranslator, ev_schema, tax_schema
+from mcp_orchestrator.sources import builtin_sources
+
+EV = DataSource.GCP_BIGQUERY.value
+TAX = DataSource.AWS_S3_TABLES.value
+
+
+def make_translator():
+    router = MCPOrchestrator().router
+    schemas = {EV: ev_schema("ev_registrations"), TAX: tax_schema("state_local_tax")}
+    return SqlTranslator(schemas, router.normalize)
+
+
+def make_orchestrator(**kwargs):
+    sources = builtin_sources(ev_table="ev_registrations", tax_table="state_local_tax")
+    return MCPOrchestrator(sources=sources, **kwargs)
+
+
+class RecordingPool:
+    """Records the arguments of each call_tool"""
+
+    def __init__(self):
+        self.queries = []
+
+    async def call_tool(self, name, arguments=None):
+        self.queries.append(arguments["query"])
+        return types.CallToolResult(content=[types.TextContent(type="text", text="[]")])
+
+
+def test_recognized_intents():
+    """Test counts, averages, rankings and lookups become projected, limited SQL"""
+    translator = make_translator()
+    cases = [
+        (
+            EV,
+            "How many Tesla vehicles in Washington?",
+            "count",
+            "SELECT COUNT(*) AS count FROM ev_registrations "
+            "WHERE state IN ('WA') AND UPPER(make) IN ('TESLA')",
+        ),
+        (
+            EV,
+            "Average electric range by make",
+            "average",
+            "SELECT make, AVG(range_miles) AS avg_range_miles FROM ev_registrations "
+            "GROUP BY make ORDER BY avg_range_miles DESC LIMIT 100",
+        ),
+        (
+            EV,
+            "Top 10 makes",
+            "top_n",
+            "SELECT make, COUNT(*) AS count FROM ev_registrations "
+            "GROUP BY make ORDER BY count DESC LIMIT 10",
+        ),
+        (
+            EV,
+            "Average battery capacity by model year",
+            "average",
+            "SELECT year, AVG(battery_capacity_kwh) AS avg_battery_capacity_kwh "
+            "FROM ev_registrations GROUP BY year ORDER BY avg_battery_capacity_kwh DESC LIMIT 100",
+        ),
+        (
+            TAX,
+            "Top 5 states by combined rate",
+            "top_n",
+            "SELECT state, state_name, combined_rate FROM state_local_tax "
+            "ORDER BY combined_rate DESC LIMIT 5",
+        ),
+        (
+            TAX,
+            "What is the combined tax rate in California and Texas?",
+            "lookup",
+            "SELECT state, state_name, combined_rate FROM state_local_tax "
+            "WHERE state IN ('CA', 'TX') LIMIT 2",
+        ),
+    ]
+    for source, query, intent, sql in cases:
+        translation = translator.translate(source, query)
+        assert (translation.intent, translation.sql) == (intent, sql), query
+
+
+def test_unrecognized_queries_fall_through():
+    """Test anything not fully understood is left for the server"""
+    translator = make_translator()
+    assert translator.translate(EV, "What is the range of Tesla Model 3?") is None
+    assert translator.translate(TAX, "top 5 states by tax revenue") is None
+    assert translator.translate(EV, "Show me data") is None
+    assert translator.translate("other", "How many Tesla vehicles") is None
+    # A ranking of nothing is not sent as LIMIT 0
+    assert translator.translate(EV, "Top 0 makes") is None
+    assert translator.translate(EV, "Top 1 makes").sql.endswith("LIMIT 1")
+
+
+def test_no_sql_without_a_configured_table():
+    """Test sources whose table is not configured only get natural-language queries"""
+    orchestrator = MCPOrchestrator()
+    assert orchestrator.translator is None
+    assert (
+        orchestrator.plan_join(
+            orchestrator.analyze_query("Sales tax paid on electric vehicles in each state")
+        )
+        is None
+    )
+    translator = SqlTranslator({EV: ev_schema()}, orchestrator.router.normalize)
+    assert translator.translate(EV, "Top 10 makes") is None
+
+
+def test_templates_cached_by_fingerprint():
+    """Test questions differing only in literals share one template"""
+    translator = make_translator()
+    first = translator.translate(TAX, "Top 5 states by combined rate")
+    second = translator.translate(TAX, "top 3 STATES by combined rate!")
+    assert second.sql == first.sql.replace("LIMIT 5", "LIMIT 3")
+    assert translator.translate(EV, "How many Nissan vehicles in OR").sql.endswith(
+        "WHERE state IN ('OR') AND UPPER(make) IN ('NISSAN')"
+    )
+    translator.translate(EV, "How many Ford vehicles in Ohio")
+    translator.translate(EV, "Show me data")
+    translator.translate(EV, "show me data")
+    assert translator.stats() == {"templates": 3, "hits": 3, "misses": 3}
+
+
+def test_limit_is_capped():
+    """Test a requested N never exceeds the translator's maximum"""
+    translator = make_translator()
+    assert translator.translate(EV, "top 100000 models by range").sql.endswith("LIMIT 1000")
+
+
+async def test_orchestrator_sends_sql_and_shares_cache():
+    """Test the pushed-down SQL goes upstream and equivalent questions share a result"""
+    pool = RecordingPool()
+    orchestrator = make_orchestrator()
+    orchestrator.pools = {TAX: pool}
+    orchestrator.catalogs[TAX].update([types.Tool(name="query", inputSchema={"type": "object"})])
+
+    await orchestrator._call_query_tool(DataSource.AWS_S3_TABLES, "sales tax in Texas")
+    await orchestrator._call_query_tool(DataSource.AWS_S3_TABLES, "SALES TAX in TX?")
+    assert pool.queries == [
+        "SELECT state, state_name, combined_rate, state_tax_rate, avg_local_tax_rate "
+        "FROM state_local_tax WHERE state IN ('TX') LIMIT 1"
+    ]
+
+    orchestrator = make_orchestrator(sql_pushdown=False)
+    orchestrator.pools = {TAX: pool}
+    orchestrator.catalogs[TAX].update([types.Tool(name="query", inputSchema={"type": "object"})])
+    await orchestrator._call_query_tool(DataSource.AWS_S3_TABLES, "sales tax in Texas")
+    assert pool.queries[-1] == "sales tax in Texas"
@@ -0,0 +1,67 @@
+"""Tests for the query result cache"""
+
+import asyncio
+
+from mcp_orchestrator.result_cache import ResultCache, normalize_query
+
+
+class Loader:
+    """Counts upstream loads"""
+
+    def __init__(self, value="rows", delay=0.0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+def test_normalize_query():
+    """Test case and whitespace do not change the cache key"""
+    assert normalize_query("  Average  Range\tof EVs ") == normalize_query("average range of evs")
+
+
+async def test_hit_after_load():
+    """Test a cached value is served without reloading"""
+    cache = ResultCache()
+    loader = Loader()
+    assert await cache.get_or_load("k", 60, loader) == "rows"
+    assert await cache.get_or_load("k", 60, loader) == "rows"
+    assert loader.calls == 1
+    assert cache.hits == 1
+
+
+async def test_expired_entry_reloads():
+    """Test entries expire after their TTL"""
+    cache = ResultCache()
+    loader = Loader()
+    await cache.get_or_load("k", 0.01, loader)
+    await asyncio.sleep(0.02)
+    await cache.get_or_load("k", 0.01, loader)
+    assert loader.calls == 2
+
+
+async def test_concurrent_requests_coalesce():
+    """Test identical in-flight requests share one upstream call"""
+    cache = ResultCache()
+    loader = Loader(delay=0.05)
+    results = await asyncio.gather(*(cache.get_or_load("k", 60, loader) for _ in range(10)))
+    assert results == ["rows"] * 10
+    assert loader.calls == 1
+    assert cache.coalesced == 9
+
+
+def test_lru_eviction_respects_memory_bound():
+    """Test least recently used entries are evicted to stay under max_bytes"""
+    cache = ResultCache(max_bytes=30, sizeof=lambda value: 10)
+    for key in "abc":
+        cache.put(key, key, 60)
+    cache.get("a")
+    cache.put("d", "d", 60)
+    assert cache.get("b") is None
+    assert cache.get("a") == "a"
+    assert cache.size == 30
+    assert cache.evictions == 1
@@ -0,0 +1,76 @@
+"""Tests for the routing decision memo"""
+
+from mcp_orchestrator import MCPOrchestrator, DataSource
+from mcp_orchestrator.route_cache import RouteCache
+
+QUERIES = [
+    "What is the combined tax rate in California?",
+    "Texas sales tax",
+    "tax rate in OR",
+    "apples or oranges",
+    "Tesla registrations in North Carolina and West Virginia",
+    "Every charging station in new york",
+    "Show me data",
+]
+
+
+def test_normal_form_folds_case_punctuation_and_states():
+    """Test near-identical queries share a normal form"""
+    router = MCPOrchestrator().router
+    assert router.normalize("Texas sales tax?") == "TX sales tax"
+    assert router.normalize("  tx SALES   tax") == "TX sales tax"
+    assert router.normalize("EVs in West Virginia!") == "evs in WV"
+    # Lowercase ambiguous codes are ordinary words
+    assert router.normalize("tax rate in OR") != router.normalize("tax rate in or")
+
+
+def test_normal_form_scores_like_the_query():
+    """Test routing the normal form gives the same scores as the original"""
+    router = MCPOrchestrator().router
+    for query in QUERIES:
+        assert router.score(router.normalize(query)) == router.score(query)
+
+
+def test_equivalent_queries_share_a_decision():
+    """Test a state name and its code hit the same memo entry"""
+    orchestrator = MCPOrchestrator()
+    first = orchestrator.analyze_query("What is the sales tax in Texas?")
+    second = orchestrator.analyze_query("what is the SALES tax in TX")
+    assert orchestrator.route_cache.stats()["hits"] == 1
+    assert second.source == first.source == DataSource.AWS_S3_TABLES
+    assert second.query == "what is the SALES tax in TX"
+    assert second.scores.states == ("TX",)
+
+
+def test_batch_uses_and_fills_the_memo():
+    """Test batch routing matches single routing and scores each key once"""
+    orchestrator = MCPOrchestrator()
+    orchestrator.analyze_query(QUERIES[0])
+    batch = orchestrator.analyze_queries(QUERIES + ["TEXAS sales tax", "Texas sales tax"])
+    stats = orchestrator.route_cache.stats()
+    assert stats["entries"] == len(QUERIES)
+    assert stats["hits"] == 1
+
+    uncached = MCPOrchestrator(route_cache_size=0)
+    assert orchestrator.route_cache is not None and uncached.route_cache is None
+    for route in batch:
+        expected = uncached.analyze_query(route.query)
+        assert (route.query, route.source, route.targets, route.reason) == (
+            expected.query,
+            expected.source,
+            expected.targets,
+            expected.reason,
+        )
+
+
+def test_lru_eviction_and_hit_rate():
+    """Test the memo stays bounded and reports its hit rate"""
+    cache = RouteCache(str.lower, maxsize=2)
+    for key in ("a", "b"):
+        cache.put(cache.key(key), key)
+    assert cache.get("a") == "a"
+    cache.put("c", "c")
+    assert cache.get("b") is None
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.hit_rate == 0.5
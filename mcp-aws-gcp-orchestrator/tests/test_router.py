@@ -0,0 +1,78 @@
+"""Tests for the compiled query router"""
+
+from mcp_orchestrator import MCPOrchestrator
+from mcp_orchestrator.router import US_STATES
+
+
+def make_router():
+    return MCPOrchestrator().router
+
+
+def test_no_substring_false_positives():
+    """Test keywords only match whole words"""
+    router = make_router()
+    scores = router.score("Every carolina orange")
+    assert scores.ev_score == 0
+    assert not scores.has_ev
+
+
+def test_all_states_detected():
+    """Test every state name and DC is recognized"""
+    router = make_router()
+    for name, code in US_STATES.items():
+        assert router.score(f"tax rate in {name.title()}").states == (code,)
+    assert len(set(US_STATES.values())) == 51
+
+
+def test_nested_state_names():
+    """Test West Virginia is not also reported as Virginia"""
+    router = make_router()
+    assert router.score("tax in West Virginia").states == ("WV",)
+
+
+def test_ambiguous_codes_need_capitals():
+    """Test state codes that are English words only match in capitals"""
+    router = make_router()
+    assert router.score("what is in me").states == ()
+    assert router.score("tax rate in OR").states == ("OR",)
+    assert router.score("tax rate in tx").states == ("TX",)
+
+
+def test_phrases_and_plurals():
+    """Test phrases count their component keywords and plurals match"""
+    router = make_router()
+    plural = router.score("combined tax rates")
+    assert plural.tax_score == router.score("combined tax rate").tax_score
+    assert router.score("EVs").has_ev
+    assert router.score("state-wise taxes").tax_score == 2
+
+
+def test_scores_memoized_per_mask():
+    """Test queries with the same matches share memoized scores without sharing dicts"""
+    router = make_router()
+    first = router.score("sales tax in Texas")
+    first.scores.clear()
+    second = router.score("Sales taxes for CA")
+    assert second.scores and second.states == ("CA",)
+    assert len(router._score_memo) == 1
+    # Whether a state was named changes the scores for the same mask
+    assert router.score("sales tax").scores != second.scores
+
+
+def test_batch_matches_single_routing():
+    """Test analyze_queries and its streaming variant agree with analyze_query"""
+    orchestrator = MCPOrchestrator()
+    queries = [
+        "What is the range of Tesla Model 3?",
+        "Show California state tax data",
+        "Show me data",
+        "sales tax rate in TX",
+        "EVs registered in Texas",
+    ] * 3
+    expected = [orchestrator.analyze_query(query) for query in queries]
+    assert orchestrator.analyze_queries(queries) == expected
+    assert list(orchestrator.iter_analyze_queries(iter(queries), batch_size=4)) == expected
+    # With and without repeats the batch scores match one-by-one scoring
+    router = orchestrator.router
+    for batch in (queries, queries[:5]):
+        assert router.score_batch(batch) == [router.score(query) for query in batch]
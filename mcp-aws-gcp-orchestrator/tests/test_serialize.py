@@ -0,0 +1,95 @@
+"""Tests for response serialization"""
+
+import gzip
+import json
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from mcp import types
+
+from mcp_orchestrator import serialize
+from mcp_orchestrator.columnar import ColumnarResult
+from mcp_orchestrator.serialize import RawJSON, choose_encoding, compress, encode_json, raw_payload
+
+ROWS = [
+    {"Make": "TESLA", "City": "Zürich", "Electric_Range": 220},
+    {"Make": "NISSAN", "City": None},
+]
+
+
+def text_content(text):
+    return [types.TextContent(type="text", text=text)]
+
+
+@pytest.fixture(params=["stdlib", "orjson"])
+def encoder(request, monkeypatch):
+    """encode_json with and without orjson fragments"""
+    if request.param == "orjson":
+        if not serialize._orjson_fragments:
+            pytest.skip("orjson with Fragment support not installed")
+    else:
+        monkeypatch.setattr(serialize, "_orjson_fragments", False)
+    return encode_json
+
+
+def test_matches_fastapi_encoding(encoder):
+    """Test content models and columnar results encode as FastAPI would encode them"""
+    content = text_content(json.dumps(ROWS))
+    table = ColumnarResult.from_rows(ROWS)
+    value = {"status": "success", "data": content, "table": table, "confidence": 0.5}
+    expected = jsonable_encoder({**value, "table": table.to_json()})
+    assert json.loads(encoder(value)) == expected
+
+
+def test_raw_payload_is_spliced_unchanged(encoder):
+    """Test server JSON is embedded byte for byte without re-encoding"""
+    text = json.dumps(ROWS, ensure_ascii=False)
+    payload = raw_payload(text_content(text))
+    body = encoder({"data": payload, "other": [payload, "\x00raw0\x00?"]})
+    assert text.encode() in body
+    assert json.loads(body) == {"data": ROWS, "other": [ROWS, "\x00raw0\x00?"]}
+
+
+def test_raw_marker_in_user_text_is_not_spliced(encoder):
+    """Test strings shaped like the splice placeholder stay plain strings"""
+    payload = raw_payload(text_content(json.dumps(ROWS)))
+    for query in ("\x00raw0\x00", "\x00raw5\x00", "\x00raw0:0\x00"):
+        body = encoder({"query": query, "data": payload})
+        assert json.loads(body) == {"query": query, "data": ROWS}
+
+
+def test_non_finite_floats_encode_as_null(encoder):
+    """Test NaN and infinities become null with and without orjson"""
+    table = ColumnarResult.from_rows([{"x": float("nan")}])
+    payload = raw_payload(text_content("[1]"))
+    value = {"x": float("nan"), "y": [float("inf"), -float("inf"), 1.5], "data": payload}
+    assert json.loads(encoder(value)) == {"x": None, "y": [None, None, 1.5], "data": [1]}
+    assert json.loads(encoder({"table": table}))["table"]["columns"][0]["values"] == [None]
+
+
+def test_raw_payload_only_for_json_text():
+    """Test non-JSON, malformed or multi-block content is not passed through raw"""
+    assert raw_payload(text_content("No rows found")) is None
+    assert raw_payload(text_content("[not json]")) is None
+    assert raw_payload(text_content('{"rows": [1,}')) is None
+    assert raw_payload(text_content("[]") + text_content("[]")) is None
+    assert isinstance(raw_payload(text_content(' {"rows": []}\n')), RawJSON)
+
+
+def test_choose_encoding():
+    """Test Accept-Encoding negotiation honours q values and the server's preference"""
+    both = ["zstd", "gzip"]
+    assert choose_encoding("gzip, deflate, br, zstd", both) == "zstd"
+    assert choose_encoding("zstd;q=0, gzip;q=0.5", both) == "gzip"
+    assert choose_encoding("*", ["gzip"]) == "gzip"
+    assert choose_encoding("identity", both) is None
+    assert choose_encoding("", both) is None
+
+
+def test_compress_round_trip():
+    """Test compressed bodies decode back to the original"""
+    body = encode_json({"data": ROWS * 100})
+    assert gzip.decompress(compress(body, "gzip")) == body
+    if serialize.zstandard is not None:
+        decompressor = serialize.zstandard.ZstdDecompressor()
+        assert decompressor.decompress(compress(body, "zstd")) == body
@@ -0,0 +1,160 @@
+"""Tests for the warm MCP session pool"""
+
+import asyncio
+
+import pytest
+from mcp import StdioServerParameters
+
+from mcp_orchestrator import session_pool
+from mcp_orchestrator.session_pool import SessionPool
+
+
+class FakePooledSession:
+    """Stands in for a server subprocess without spawning anything"""
+
+    spawned = 0
+
+    def __init__(self, params, message_handler=None, on_stage=None):
+        self.params = params
+        self.session = object()
+        FakePooledSession.spawned += 1
+
+    @property
+    def alive(self):
+        return self.session is not None
+
+    async def start(self, timeout):
+        await asyncio.sleep(0)
+
+    async def ping(self, timeout):
+        return self.alive
+
+    async def close(self, timeout=5.0):
+        self.session = None
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(session_pool, "PooledSession", FakePooledSession)
+    FakePooledSession.spawned = 0
+    params = StdioServerParameters(command="fake-server", args=[])
+    return SessionPool(params, size=2, health_check_interval=0)
+
+
+async def test_start_warms_pool(pool):
+    """Test pool spawns sessions up front"""
+    assert await pool.start() == 2
+    assert FakePooledSession.spawned == 2
+
+
+async def test_sessions_are_reused(pool):
+    """Test leases do not spawn new subprocesses"""
+    await pool.start()
+    for _ in range(5):
+        async with pool.lease() as session:
+            assert session is not None
+    assert FakePooledSession.spawned == 2
+
+
+async def test_concurrent_leases_wait_for_capacity(pool):
+    """Test leases beyond pool size wait for a session to be returned"""
+    await pool.start()
+    active = 0
+    peak = 0
+
+    async def work():
+        nonlocal active, peak
+        async with pool.lease():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(work() for _ in range(6)))
+    assert peak == 2
+
+
+async def test_dead_session_is_replaced(pool):
+    """Test health check respawns dead subprocesses"""
+    await pool.start()
+    await pool._sessions[0].close()
+    await pool.health_check()
+    await asyncio.sleep(0.01)
+    assert pool.warm == 2
+    assert FakePooledSession.spawned == 3
+
+
+async def test_health_check_leaves_other_sessions_leasable(pool):
+    """Test a slow ping holds only the session being pinged and wake markers are kept"""
+    await pool.start()
+    pinged = asyncio.Event()
+    slow = pool._sessions[0]
+
+    async def slow_ping(timeout):
+        pinged.set()
+        await asyncio.sleep(0.05)
+        return True
+
+    slow.ping = slow_ping
+    pool._idle.put_nowait(None)
+    check = asyncio.create_task(pool.health_check())
+    await pinged.wait()
+    lease = pool.lease()
+    session = await asyncio.wait_for(lease.__aenter__(), 0.01)
+    assert session is pool._sessions[1].session
+    await lease.__aexit__(None, None, None)
+    await check
+    queued = [pool._idle.get_nowait() for _ in range(pool._idle.qsize())]
+    assert queued.count(None) == 1 and slow in queued
+
+
+async def test_spare_replaces_dead_session(monkeypatch):
+    """Test a warm spare takes a dead session's place and is itself replenished"""
+    monkeypatch.setattr(session_pool, "PooledSession", FakePooledSession)
+    FakePooledSession.spawned = 0
+    params = StdioServerParameters(command="fake-server", args=[])
+    pool = SessionPool(params, size=2, health_check_interval=0, spares=1)
+    assert await pool.start() == 2
+    assert (pool.spare, FakePooledSession.spawned) == (1, 3)
+
+    spare = pool._spares[0]
+    await pool._sessions[0].close()
+    await pool.health_check()
+    assert spare in pool._sessions
+    assert pool.warm == 2
+    await asyncio.sleep(0.01)
+    assert (pool.spare, FakePooledSession.spawned) == (1, 4)
+    await pool.close()
+
+
+class ToolSession:
+    """Answers tool calls after a delay"""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def call_tool(self, name, arguments=None):
+        await asyncio.sleep(self.delay)
+        return name
+
+
+async def test_cancelled_call_drops_its_session(pool):
+    """Test a cancelled call closes the session working on it, and a new one replaces it"""
+    await pool.start()
+    for pooled in pool._sessions:
+        pooled.session = ToolSession(0)
+    assert await pool.call_tool("query") == "query"
+    assert FakePooledSession.spawned == 2
+
+    for pooled in pool._sessions:
+        pooled.session = ToolSession(10)
+    leased = list(pool._sessions)
+    call = asyncio.create_task(pool.call_tool("query"))
+    await asyncio.sleep(0)
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+    await asyncio.sleep(0.01)
+    assert sum(pooled.session is None for pooled in leased) == 1
+    assert (pool.warm, FakePooledSession.spawned) == (2, 3)
+    await pool.close()
@@ -0,0 +1,115 @@
+"""Tests for the source registry and N-source routing"""
+
+import json
+
+import pytest
+from mcp import types
+
+from mcp_orchestrator import MCPOrchestrator, DataSource, SourceRegistry, SourceSpec
+from mcp_orchestrator.config import OrchestratorConfig
+from mcp_orchestrator.sources import builtin_sources
+
+POSTGRES = SourceSpec(
+    name="postgres_orders",
+    command=["postgres-mcp"],
+    title="Postgres",
+    description="order-related",
+    keywords=["order", "orders", "customer", "invoice"],
+)
+
+
+class EchoPool:
+    """Answers call_tool with the query it was sent"""
+
+    async def call_tool(self, name, arguments=None):
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=arguments["query"])]
+        )
+
+
+def make_orchestrator():
+    return MCPOrchestrator(sources=builtin_sources() + [POSTGRES])
+
+
+def test_registry_lookup_and_duplicates():
+    """Test specs are found by name or DataSource and names stay unique"""
+    registry = SourceRegistry(builtin_sources() + [POSTGRES])
+    assert registry.names == ["gcp_bigquery", "aws_s3_tables", "postgres_orders"]
+    assert registry[DataSource.GCP_BIGQUERY] is registry["gcp_bigquery"]
+    assert "postgres_orders" in registry
+    assert registry.default.name == "gcp_bigquery"
+    with pytest.raises(ValueError):
+        registry.register(SourceSpec(name="postgres_orders"))
+
+
+def test_spec_from_dict():
+    """Test a JSON source definition splits its command and fills defaults"""
+    spec = SourceSpec.from_dict(
+        {"name": "snowflake", "command": "uvx snowflake-mcp", "pool_size": 4}
+    )
+    assert spec.command == ["uvx", "snowflake-mcp"]
+    assert spec.max_concurrency == 4
+    assert spec.title == "snowflake"
+    assert spec.params.command == "uvx"
+    with pytest.raises(ValueError):
+        SourceSpec(name="nothing").params
+
+
+def test_config_loads_sources_file(tmp_path, monkeypatch):
+    """Test MCP_SOURCES_FILE adds sources after the built-ins"""
+    path = tmp_path / "sources.json"
+    path.write_text(
+        json.dumps([{"name": "postgres_orders", "command": "postgres-mcp", "keywords": ["order"]}])
+    )
+    monkeypatch.setenv("MCP_SOURCES_FILE", str(path))
+    monkeypatch.setenv("AWS_CACHE_TTL", "60")
+    config = OrchestratorConfig()
+    names = [spec.name for spec in config.sources]
+    assert names == ["gcp_bigquery", "aws_s3_tables", "postgres_orders"]
+    assert config.sources[1].cache_ttl == 60
+
+
+def test_third_source_routing():
+    """Test a registered source receives queries matching its vocabulary"""
+    orchestrator = make_orchestrator()
+    route = orchestrator.analyze_query("List every customer invoice")
+    assert route.source == "postgres_orders"
+    assert route.source_name == "postgres_orders"
+    assert "order-related" in route.reason
+
+    # Built-in routing is unchanged by the extra source
+    assert orchestrator.analyze_query("Tesla range").source == DataSource.GCP_BIGQUERY
+    assert orchestrator.analyze_query("Show me data").source == DataSource.GCP_BIGQUERY
+
+
+async def test_multi_source_across_custom_source():
+    """Test a query needing a built-in and a custom source queries both"""
+    orchestrator = make_orchestrator()
+    orchestrator.pools = {name: EchoPool() for name in orchestrator.sources.names}
+    for catalog in orchestrator.catalogs.values():
+        catalog.update([types.Tool(name="query", inputSchema={"type": "object"})])
+
+    route = orchestrator.analyze_query("Tesla orders by customer")
+    assert set(route.targets) == {DataSource.GCP_BIGQUERY, "postgres_orders"}
+    result = await orchestrator.process_multi_source("Tesla orders by customer", route)
+    assert result["sources"] == ["gcp_bigquery", "postgres_orders"]
+    assert set(result["data"]) == {"gcp_bigquery", "postgres_orders"}
+
+
+def test_batch_matches_single_with_many_sources():
+    """Test batch routing agrees with per-query routing beyond the built-ins"""
+    extra = [SourceSpec(name=f"source_{i}", keywords=[f"term{i}", f"alt{i}"]) for i in range(80)]
+    orchestrator = MCPOrchestrator(sources=builtin_sources() + [POSTGRES] + extra)
+    queries = [
+        "term3 and alt3 data",
+        "term7 with Tesla",
+        "customer tax rate in TX",
+        "alt79",
+        "Show me data",
+    ]
+    batch = orchestrator.analyze_queries(queries)
+    for query, route in zip(queries, batch):
+        single = orchestrator.analyze_query(query)
+        assert (route.source, route.targets) == (single.source, single.targets)
+        assert route.confidence == single.confidence
+    assert batch[0].source == "source_3"
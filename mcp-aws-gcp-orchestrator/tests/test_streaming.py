@@ -0,0 +1,45 @@
+"""Tests for streaming query results"""
+
+import json
+
+from mcp import types
+
+from mcp_orchestrator import MCPOrchestrator, DataSource
+from mcp_orchestrator.content import iter_json_rows
+
+
+class RowsPool:
+    """Returns a JSON array of n rows"""
+
+    def __init__(self, n):
+        self.n = n
+
+    async def call_tool(self, name, arguments=None):
+        rows = [{"VIN": str(i), "Make": "Tesla"} for i in range(self.n)]
+        return types.CallToolResult(content=[types.TextContent(type="text", text=json.dumps(rows))])
+
+
+def make_orchestrator(pool):
+    orchestrator = MCPOrchestrator()
+    orchestrator.pools = {source: pool for source in DataSource}
+    for catalog in orchestrator.catalogs.values():
+        catalog.update([types.Tool(name="query", inputSchema={"type": "object"})])
+    return orchestrator
+
+
+def test_iter_json_rows_matches_json_loads():
+    """Test incremental decoding yields the same elements as json.loads"""
+    text = json.dumps([{"a": 1}, [1, 2], "x", None, {"b": {"c": [3]}}], indent=2)
+    assert list(iter_json_rows(text)) == json.loads(text)
+
+
+async def test_rows_are_streamed_in_chunks():
+    """Test a large result arrives as bounded row chunks between route and end"""
+    orchestrator = make_orchestrator(RowsPool(1234))
+    events = [event async for event in orchestrator.stream_query("Tesla range", chunk_size=500)]
+
+    assert events[0]["type"] == "route"
+    assert events[-1] == {"type": "end", "rows": 1234}
+    chunks = [event["rows"] for event in events if event["type"] == "rows"]
+    assert [len(chunk) for chunk in chunks] == [500, 500, 234]
+    assert chunks[2][-1]["VIN"] == "1233"
@@ -0,0 +1,95 @@
+"""Tests for the in-memory state_local_tax table"""
+
+import json
+
+from mcp import types
+
+from mcp_orchestrator import MCPOrchestrator, DataSource
+from mcp_orchestrator.sources import builtin_sources
+from mcp_orchestrator.tax_table import TAX_COLUMNS, StateTaxTable
+
+ROWS = [
+    {
+        "state": "TX",
+        "state_name": "Texas",
+        "state_tax_rate": "0.0625",
+        "state_tax_rank": "13",
+        "avg_local_tax_rate": "0.0194",
+        "combined_rate": "0.0819",
+        "combined_rank": "14",
+        "max_local_tax_rate": "0.02",
+    },
+    {
+        "state": "CO",
+        "state_name": "Colorado",
+        "state_tax_rate": "0.029",
+        "state_tax_rank": "49",
+        "avg_local_tax_rate": "0.0488",
+        "combined_rate": "0.0778",
+        "combined_rank": "16",
+        "max_local_tax_rate": "0.083",
+    },
+]
+
+
+class CountingPool:
+    """Serves the table and counts tool calls"""
+
+    def __init__(self):
+        self.calls = 0
+        self.queries = []
+
+    async def call_tool(self, name, arguments=None):
+        self.calls += 1
+        self.queries.append(arguments["query"])
+        return types.CallToolResult(content=[types.TextContent(type="text", text=json.dumps(ROWS))])
+
+
+def test_load_rows_types_columns():
+    """Test rows are indexed by state with numeric columns converted"""
+    table = StateTaxTable()
+    assert table.load_rows(ROWS) == 2
+    assert table.by_state["TX"].state_tax_rate == 0.0625
+    assert table.by_state["CO"].combined_rank == 16
+
+
+def test_lookup_defers_non_lookups():
+    """Test ranking/aggregate questions and unknown states go to the server"""
+    table = StateTaxTable()
+    assert table.lookup("tax rate in TX", ["TX"]) is None
+    table.load_rows(ROWS)
+    assert table.lookup("tax rate in TX", ["TX"])[0]["state_name"] == "Texas"
+    assert table.lookup("states with tax higher than TX", ["TX"]) is None
+    assert table.lookup("tax rate in CA", ["CA"]) is None
+
+
+async def test_lookups_skip_the_server():
+    """Test per-state tax lookups are answered locally once loaded"""
+    orchestrator = MCPOrchestrator(local_tax_table=True)
+    pool = CountingPool()
+    orchestrator.pools = {DataSource.AWS_S3_TABLES: pool}
+    orchestrator.catalogs[DataSource.AWS_S3_TABLES].update(
+        [types.Tool(name="query", inputSchema={"type": "object"})]
+    )
+    await orchestrator._refresh_tax_table()
+    assert pool.calls == 1
+
+    result = await orchestrator.process_query("What is the tax rank of CO?")
+    assert json.loads(result["data"][0].text)[0]["state_tax_rank"] == 49
+    assert pool.calls == 1
+
+
+async def test_loads_from_the_configured_table():
+    """Test the local copy is read from the table the tax schema names"""
+    sources = builtin_sources(tax_table="tax_data.state_rates")
+    orchestrator = MCPOrchestrator(sources=sources, local_tax_table=True)
+    pool = CountingPool()
+    orchestrator.pools = {DataSource.AWS_S3_TABLES: pool}
+    orchestrator.catalogs[DataSource.AWS_S3_TABLES].update(
+        [types.Tool(name="query", inputSchema={"type": "object"})]
+    )
+    await orchestrator._refresh_tax_table()
+    assert pool.queries == [f"SELECT {', '.join(TAX_COLUMNS)} FROM tax_data.state_rates"]
+
+    # Without a configured name the documented table is read
+    assert MCPOrchestrator(local_tax_table=True).tax_table.table == "state_local_tax"
@@ -0,0 +1,62 @@
+"""Tests for cached tool discovery"""
+
+import asyncio
+
+from mcp import types
+
+from mcp_orchestrator.tool_catalog import ToolCatalog
+
+
+def make_tool(name):
+    return types.Tool(name=name, inputSchema={"type": "object"})
+
+
+class FakeSession:
+    """Counts list_tools round-trips"""
+
+    def __init__(self, names):
+        self.names = names
+        self.calls = 0
+
+    async def list_tools(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return types.ListToolsResult(tools=[make_tool(name) for name in self.names])
+
+
+def test_query_tool_resolution():
+    """Test preferred query tool names win over listing order"""
+    catalog = ToolCatalog()
+    catalog.update([make_tool("describe_table"), make_tool("execute_query")])
+    assert catalog.query_tool == "execute_query"
+
+    catalog.update([make_tool("describe_table")])
+    assert catalog.query_tool == "describe_table"
+
+
+async def test_refresh_is_cached():
+    """Test concurrent refreshes share a single list_tools call"""
+    catalog = ToolCatalog(ttl=300.0)
+    session = FakeSession(["query"])
+    await asyncio.gather(*(catalog.refresh(session) for _ in range(5)))
+    await catalog.refresh(session)
+    assert session.calls == 1
+    assert catalog.query_tool == "query"
+
+
+async def test_list_changed_notification_invalidates():
+    """Test tools/list_changed forces a refresh"""
+    catalog = ToolCatalog(ttl=300.0)
+    session = FakeSession(["query"])
+    await catalog.refresh(session)
+
+    notification = types.ServerNotification(
+        types.ToolListChangedNotification(method="notifications/tools/list_changed")
+    )
+    await catalog.handle_message(notification)
+    assert catalog.stale
+
+    session.names = ["run_query"]
+    await catalog.refresh(session)
+    assert session.calls == 2
+    assert catalog.query_tool == "run_query"